@@ -3,7 +3,8 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
-import httpx, os
+import httpx
+from ....core.http_clients import get_upstream_client
 
 router = APIRouter()
 
@@ -71,17 +72,15 @@ class AIAnalysisRequest(BaseModel):
 @router.post("/chat")
 async def chat_with_ai(chat_request: dict):
     """Proxy chat to AI agent microservice"""
-    #AI_AGENT_SERVICE_URL = os.getenv("AI_AGENT_SERVICE_URL", "http://ai_agent:8002")
-    AI_AGENT_SERVICE_URL = os.getenv("AI_AGENT_SERVICE_URL", "http://localhost:8003")  
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(f"{AI_AGENT_SERVICE_URL}/api/v1/ai_agent/chat", json=chat_request)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    client = get_upstream_client("ai_agent")
+    try:
+        resp = await client.post("/api/v1/ai_agent/chat", json=chat_request)
+        resp.raise_for_status()
+        return resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/chat/history/{user_id}")
 async def get_chat_history(user_id: int, limit: int = 20):
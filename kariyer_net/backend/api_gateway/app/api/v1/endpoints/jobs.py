@@ -3,8 +3,11 @@ from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime
 from ...dependencies import get_current_user
+from ....core.config import settings
+from ....core.deadline import request_deadline
+from ....core.http_clients import get_upstream_client
+from ....core.proxy import cached_proxy, proxy_stream
 import httpx
-import os
 
 router = APIRouter()
 
@@ -21,7 +24,8 @@ class JobSearchRequest(BaseModel):
     remote: Optional[bool] = None
     page: int = 1
     limit: int = 10
-    sort_by: str = "relevance"  # relevance, date, salary, title
+    sort_by: str = "relevance"  # relevance, date, salary
+    cursor: Optional[str] = None  # next_cursor of the previous page; replaces page
 
 class JobResponse(BaseModel):
     id: int
@@ -56,92 +60,89 @@ class SearchAnalyticsResponse(BaseModel):
 # Enhanced job search endpoints
 @router.get("/", response_model=dict)
 async def search_jobs(request: Request):
-    """Proxy job search to job search microservice with pagination and filtering"""
-    JOB_SEARCH_SERVICE_URL = os.getenv("JOB_SEARCH_SERVICE_URL", "http://job_search_service:8001")
+    """Proxy job search to job search microservice with pagination and filtering.
+
+    The search gets SEARCH_DEADLINE seconds (or the client's X-Deadline-Ms
+    if shorter); results cut short to meet it come back with partial true.
+    """
     params = dict(request.query_params)
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(f"{JOB_SEARCH_SERVICE_URL}/api/v1/search", params=params)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-
-@router.post("/search", response_model=List[JobResponse])
-async def advanced_search(search_request: JobSearchRequest):
-    """Advanced job search with structured request"""
-    return [
-        {
-            "id": 1,
-            "title": "Senior Python Developer",
-            "company": "Tech Corp",
-            "location": search_request.location or "Istanbul",
-            "salary_min": search_request.salary_min or 50000,
-            "salary_max": search_request.salary_max or 100000,
-            "job_type": search_request.job_type or "full-time",
-            "experience_level": search_request.experience_level or "senior",
-            "description": "We are looking for a skilled Python developer...",
-            "requirements": search_request.skills or ["Python", "Django"],
-            "benefits": ["Health insurance", "Remote work"],
-            "posted_date": datetime.now(),
-            "is_active": True
-        }
-    ]
+    deadline = request_deadline(request, settings.SEARCH_DEADLINE)
+    return await cached_proxy(request, "search", "job_search", "/api/v1/search", params=params, deadline=deadline)
+
+@router.post("/search")
+async def advanced_search(search_request: JobSearchRequest, request: Request):
+    """Advanced job search with structured request, run by the job search microservice under SEARCH_DEADLINE"""
+    params = {
+        "query": search_request.query or "",
+        "page": search_request.page,
+        "limit": search_request.limit,
+        "sort_by": search_request.sort_by,
+    }
+    if search_request.location:
+        params["location"] = search_request.location
+    if search_request.salary_min is not None:
+        params["salary_min"] = search_request.salary_min
+    if search_request.salary_max is not None:
+        params["salary_max"] = search_request.salary_max
+    if search_request.remote:
+        params["work_mode"] = "Remote"
+    if search_request.company:
+        params["company"] = search_request.company
+    if search_request.cursor:
+        params["cursor"] = search_request.cursor
+    deadline = request_deadline(request, settings.SEARCH_DEADLINE)
+    return await proxy_stream("job_search", "/api/v1/search", params=params, deadline=deadline)
 
 @router.get("/search/history", response_model=List[SearchHistoryResponse])
 async def get_search_history(user_id: int, limit: int = 10):
     """Proxy user's search history to job_search_service and transform to match SearchHistoryResponse model."""
-    JOB_SEARCH_SERVICE_URL = os.getenv("JOB_SEARCH_SERVICE_URL", "http://job_search_service:8001")
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(f"{JOB_SEARCH_SERVICE_URL}/api/v1/search/history", params={"user_id": user_id, "limit": limit})
-            resp.raise_for_status()
-            data = resp.json()
-            # Transform the data to match SearchHistoryResponse
-            transformed = []
-            for item in data:
-                transformed.append({
-                    "id": item.get("_id", ""),
-                    "user_id": item.get("user_id"),
-                    "query": item.get("job_name", ""),
-                    "filters": {"location": item.get("location", "")},
-                    "results_count": item.get("results_count", 0),
-                    "search_date": item.get("created_at", item.get("search_date", "")),
-                })
-            return transformed
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    client = get_upstream_client("job_search")
+    try:
+        resp = await client.get("/api/v1/search/history", params={"user_id": user_id, "limit": limit})
+        resp.raise_for_status()
+        data = resp.json()
+        # Transform the data to match SearchHistoryResponse
+        transformed = []
+        for item in data:
+            transformed.append({
+                "id": item.get("_id", ""),
+                "user_id": item.get("user_id"),
+                "query": item.get("job_name", ""),
+                "filters": {"location": item.get("location", "")},
+                "results_count": item.get("results_count", 0),
+                "search_date": item.get("created_at", item.get("search_date", "")),
+            })
+        return transformed
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/search/analytics", response_model=SearchAnalyticsResponse)
-async def get_search_analytics():
-    """Get search analytics and trends"""
-    return {
-        "total_searches": 1250,
-        "popular_keywords": ["python", "developer", "software engineer", "data scientist"],
-        "popular_locations": ["Istanbul", "Ankara", "Izmir", "Bursa"],
-        "average_results": 12.5,
-        "search_trends": {
-            "python": 150,
-            "javascript": 120,
-            "java": 80
-        }
-    }
+async def get_search_analytics(window: str = "day", limit: int = 10):
+    """Proxy search analytics and trends for the last hour, day or week to job_search_service"""
+    client = get_upstream_client("job_search")
+    try:
+        resp = await client.get("/api/v1/search/analytics", params={"window": window, "limit": limit})
+        resp.raise_for_status()
+        return resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/search/suggestions")
 async def get_search_suggestions(query: str, limit: int = 5):
-    """Get search suggestions based on partial query"""
-    suggestions = [
-        f"{query} developer",
-        f"{query} engineer",
-        f"senior {query}",
-        f"{query} specialist",
-        f"{query} manager"
-    ]
-    return {"suggestions": suggestions[:limit]}
+    """Proxy autocomplete for a partial query to job_search_service"""
+    client = get_upstream_client("job_search")
+    try:
+        resp = await client.get("/api/v1/search/suggestions", params={"query": query, "limit": limit})
+        resp.raise_for_status()
+        return {"suggestions": resp.json()}
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Job CRUD operations (existing functionality)
 @router.post("/")
@@ -149,46 +150,41 @@ async def create_job(job_data: dict, current_user=Depends(get_current_user)):
     """Proxy job creation to job posting microservice"""
     if not (current_user.get('is_admin', False) or current_user.get('is_company', False)):
         raise HTTPException(status_code=403, detail="Not authorized to create jobs.")
-    JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting_service:8000")
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(f"{JOB_POSTING_SERVICE_URL}/api/v1/jobs/", json=job_data)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    client = get_upstream_client("job_posting")
+    try:
+        resp = await client.post("/api/v1/jobs/", json=job_data)
+        resp.raise_for_status()
+        return resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/batch")
+async def get_jobs_batch(ids: str):
+    """Route bulk job retrieval (comma-separated ids) to job-posting-service in one call"""
+    return await proxy_stream("job_posting", "/api/v1/jobs/batch", params={"ids": ids})
 
 @router.get("/{job_id}")
-async def get_job(job_id: int):
+async def get_job(job_id: int, request: Request):
     """Route job retrieval requests to job-posting-service"""
-    JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting_service:8000")
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(f"{JOB_POSTING_SERVICE_URL}/api/v1/jobs/{job_id}")
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    # No query params in the key, so job events can delete the entry directly
+    return await cached_proxy(request, "job", "job_posting", f"/api/v1/jobs/{job_id}")
 
 @router.put("/{job_id}")
 async def update_job(job_id: int, job_data: dict, current_user=Depends(get_current_user)):
     """Route job update requests to job-posting-service"""
     if not (current_user.get('is_admin', False) or current_user.get('is_company', False)):
         raise HTTPException(status_code=403, detail="Not authorized to update jobs.")
-    JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting_service:8000")
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.put(f"{JOB_POSTING_SERVICE_URL}/api/v1/jobs/{job_id}", json=job_data)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    client = get_upstream_client("job_posting")
+    try:
+        resp = await client.put(f"/api/v1/jobs/{job_id}", json=job_data)
+        resp.raise_for_status()
+        return resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{job_id}")
 async def delete_job(job_id: int, current_user=Depends(get_current_user)):
@@ -199,18 +195,27 @@ async def delete_job(job_id: int, current_user=Depends(get_current_user)):
 
 # Additional search features
 @router.get("/search/filters")
-async def get_available_filters():
-    """Get available search filters and options"""
+async def get_available_filters(request: Request):
+    """Get search filter options, with locations, companies, work modes and salary ranges counted for the current search.
+
+    Takes the /search filters as query parameters; the counts come from
+    the job search microservice's facets.
+    """
+    client = get_upstream_client("job_search")
+    try:
+        resp = await client.get("/api/v1/filters/", params=dict(request.query_params))
+        resp.raise_for_status()
+        facets = resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
     return {
         "job_types": ["full-time", "part-time", "contract", "internship"],
         "experience_levels": ["entry", "mid", "senior", "executive"],
-        "locations": ["Istanbul", "Ankara", "Izmir", "Bursa", "Antalya"],
-        "salary_ranges": [
-            {"min": 0, "max": 25000, "label": "0-25K"},
-            {"min": 25000, "max": 50000, "label": "25K-50K"},
-            {"min": 50000, "max": 100000, "label": "50K-100K"},
-            {"min": 100000, "max": None, "label": "100K+"}
-        ]
+        "locations": [city["value"] for city in facets["cities"]],
+        "salary_ranges": facets["salary_ranges"],
+        "facets": facets
     }
 
 @router.post("/search/save")
@@ -225,28 +230,17 @@ async def save_search(user_id: int, search_request: JobSearchRequest):
 @router.post("/{job_id}/apply")
 async def apply_to_job(job_id: int, apply_data: dict):
     """Proxy job application to job posting microservice"""
-    #JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting:8000")
-    JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting_service:8000")
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(f"{JOB_POSTING_SERVICE_URL}/api/v1/jobs/{job_id}/apply", json=apply_data)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    client = get_upstream_client("job_posting")
+    try:
+        resp = await client.post(f"/api/v1/jobs/{job_id}/apply", json=apply_data)
+        resp.raise_for_status()
+        return resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{job_id}/related")
-async def get_related_jobs(job_id: int, skip: int = 0, limit: int = 3):
+async def get_related_jobs(job_id: int, request: Request, skip: int = 0, limit: int = 3):
     """Proxy related jobs to job posting microservice with pagination support."""
-    JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting_service:8000")
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(f"{JOB_POSTING_SERVICE_URL}/api/v1/jobs/{job_id}/related", params={"skip": skip, "limit": limit})
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+    return await cached_proxy(request, "related", "job_posting", f"/api/v1/jobs/{job_id}/related", params={"skip": skip, "limit": limit})
\ No newline at end of file
@@ -2,7 +2,9 @@ from fastapi import APIRouter, HTTPException, status, Request
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from datetime import datetime
-import httpx, os
+import httpx
+from ....core.http_clients import get_upstream_client
+from ....core.proxy import proxy_stream
 
 router = APIRouter()
 
@@ -53,8 +55,6 @@ class JobAlertResponse(BaseModel):
 # Job Alerts endpoints
 @router.post("/alerts", response_model=JobAlertResponse)
 async def create_job_alert(alert_data: JobAlertCreate):
-    NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://notification_service:8002")
-    
     # Convert to dict and ensure safe access
     data = alert_data.dict()
 
@@ -78,33 +78,19 @@ async def create_job_alert(alert_data: JobAlertCreate):
 
     print("Sending to notification service:", filtered_data)
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{NOTIFICATION_SERVICE_URL}/api/v1/alerts/",
-            json=filtered_data,
-            headers={"Content-Type": "application/json"}
-        )
-        resp.raise_for_status()
-        return resp.json()
+    client = get_upstream_client("notification")
+    resp = await client.post(
+        "/api/v1/alerts/",
+        json=filtered_data,
+        headers={"Content-Type": "application/json"}
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 
 @router.get("/alerts", response_model=List[JobAlertResponse])
 async def get_user_alerts(user_id: int):
-    NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://notification_service:8002")
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(f"{NOTIFICATION_SERVICE_URL}/api/v1/alerts", params={"user_id": user_id})
-            resp.raise_for_status()
-            data = resp.json()
-            print("DEBUG downstream data:", data)
-            return data
-        except httpx.HTTPStatusError as e:
-            print("HTTP error from downstream:", e.response.status_code, e.response.text)
-            raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
-        except Exception as e:
-            import traceback
-            print("Unexpected error:", traceback.format_exc())
-            raise HTTPException(status_code=500, detail=str(e))
+    return await proxy_stream("notification", "/api/v1/alerts", params={"user_id": user_id})
 
 
 @router.put("/alerts/{alert_id}", response_model=JobAlertResponse)
@@ -144,18 +130,8 @@ async def create_notification(notification_data: NotificationCreate):
 
 @router.get("/")
 async def get_notifications(request: Request):
-    #NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://notification_service:8003")
-    NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://notification_service:8002")
     params = dict(request.query_params)
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(f"{NOTIFICATION_SERVICE_URL}/api/v1/notifications/", params=params)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    return await proxy_stream("notification", "/api/v1/notifications/", params=params)
 
 @router.put("/notifications/{notification_id}/read")
 async def mark_notification_read(notification_id: int):
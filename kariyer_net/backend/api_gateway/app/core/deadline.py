@@ -0,0 +1,60 @@
+import time
+from fastapi import HTTPException, Request
+from .config import settings
+
+# Remaining budget of a request in milliseconds, from the client to the
+# gateway and from the gateway on to the upstream
+DEADLINE_HEADER = "X-Deadline-Ms"
+# Set by job_search_service on partial results: the stages it skipped
+PARTIAL_HEADER = "X-Partial-Results"
+
+class DeadlineExceededError(HTTPException):
+    """504 for a request whose deadline ran out before the upstream answered"""
+
+    def __init__(self):
+        super().__init__(status_code=504, detail="Upstream did not answer within the request deadline")
+
+class Deadline:
+    """End-to-end time budget of one gateway request"""
+
+    def __init__(self, budget: float):
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def upstream_budget(self) -> float:
+        """What the upstream may spend: the rest less DEADLINE_MARGIN for the way back"""
+        return max(self.remaining() - settings.DEADLINE_MARGIN, 0.0)
+
+    def headers(self) -> dict:
+        return {DEADLINE_HEADER: str(int(self.upstream_budget() * 1000))}
+
+def request_deadline(request: Request, budget: float) -> Deadline:
+    """budget seconds from now, or less when the client sent a tighter X-Deadline-Ms"""
+    try:
+        budget = min(budget, max(int(request.headers[DEADLINE_HEADER]), 0) / 1000)
+    except (KeyError, ValueError):
+        pass
+    return Deadline(budget)
+
+class DeadlineMetrics:
+    """Upstream calls made under a deadline: answered in full, partially, or not in time"""
+
+    def __init__(self):
+        self.requests = 0
+        self.partial = 0
+        self.timeouts = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "partial": self.partial,
+            "timeouts": self.timeouts,
+            "partial_ratio": round(self.partial / self.requests, 4) if self.requests else 0.0,
+        }
+
+deadline_metrics = DeadlineMetrics()
+
+def get_deadline_metrics() -> DeadlineMetrics:
+    return deadline_metrics
@@ -0,0 +1,87 @@
+import httpx
+from typing import Dict
+from .config import settings
+
+# Upstream name -> Settings attribute holding its base URL
+UPSTREAMS = {
+    "job_posting": "JOB_POSTING_SERVICE_URL",
+    "job_search": "JOB_SEARCH_SERVICE_URL",
+    "notification": "NOTIFICATION_SERVICE_URL",
+    "ai_agent": "AI_AGENT_SERVICE_URL",
+}
+
+class UpstreamMetrics:
+    """Request and connection counters for one upstream pool"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": max(self.requests - self.connections_opened, 0),
+        }
+
+class UpstreamClients:
+    """App-lifetime httpx clients, one keep-alive connection pool per upstream service.
+
+    Clients are created from the Settings URLs at startup (or lazily on
+    first use) and closed on shutdown, so proxied requests reuse open
+    connections instead of dialing the upstream on every call.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._metrics: Dict[str, UpstreamMetrics] = {name: UpstreamMetrics() for name in UPSTREAMS}
+
+    def start(self):
+        for name in UPSTREAMS:
+            self.get(name)
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._create(name)
+        return client
+
+    def metrics(self) -> dict:
+        return {name: metrics.to_dict() for name, metrics in self._metrics.items()}
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        metrics = self._metrics[name]
+
+        async def trace(event_name: str, info: dict):
+            # httpcore only dials (connect_tcp) when no pooled connection is free
+            if event_name == "connection.connect_tcp.complete":
+                metrics.connections_opened += 1
+
+        async def on_request(request: httpx.Request):
+            metrics.requests += 1
+            request.extensions["trace"] = trace
+
+        return httpx.AsyncClient(
+            base_url=getattr(settings, UPSTREAMS[name]),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT,
+                connect=settings.HTTP_CONNECT_TIMEOUT,
+                pool=settings.HTTP_POOL_TIMEOUT,
+            ),
+            event_hooks={"request": [on_request]},
+        )
+
+upstream_clients = UpstreamClients()
+
+def get_upstream_client(name: str) -> httpx.AsyncClient:
+    return upstream_clients.get(name)
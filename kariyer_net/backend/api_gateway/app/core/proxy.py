@@ -0,0 +1,132 @@
+import asyncio
+import httpx
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Optional
+from urllib.parse import urlencode
+from .config import settings
+from .deadline import PARTIAL_HEADER, Deadline, DeadlineExceededError, get_deadline_metrics
+from .http_clients import get_upstream_client
+from .response_cache import CachedResponse, get_response_cache
+
+# Connection-level headers that must not be forwarded (RFC 9110 section 7.6.1),
+# plus the ones uvicorn sets on its own
+EXCLUDED_RESPONSE_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "trailers", "transfer-encoding", "upgrade",
+    "date", "server",
+}
+
+async def send_upstream(client: httpx.AsyncClient, request: httpx.Request, deadline: Optional[Deadline] = None,
+                        stream: bool = False) -> httpx.Response:
+    """Send a request, answering 504 if a deadline runs out before the upstream responds.
+
+    The upstream is told its share of the budget in X-Deadline-Ms, so it
+    can return partial results in time instead of being cut off.
+    """
+    if deadline is None:
+        return await client.send(request, stream=stream)
+    metrics = get_deadline_metrics()
+    metrics.requests += 1
+    request.headers.update(deadline.headers())
+    try:
+        resp = await asyncio.wait_for(client.send(request, stream=stream), deadline.remaining())
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        metrics.timeouts += 1
+        raise DeadlineExceededError()
+    if PARTIAL_HEADER in resp.headers:
+        metrics.partial += 1
+    return resp
+
+async def proxy_stream(upstream: str, path: str, params: Optional[dict] = None,
+                       deadline: Optional[Deadline] = None) -> StreamingResponse:
+    """Forward a read-only GET to an upstream service without decoding the body.
+
+    Status, headers and body bytes are passed through chunk by chunk, so
+    the gateway never parses or re-serializes the JSON payload and never
+    holds the whole body in memory.
+    """
+    client = get_upstream_client(upstream)
+    request = client.build_request("GET", path, params=params)
+    try:
+        resp = await send_upstream(client, request, deadline, stream=True)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    headers = {
+        name: value for name, value in resp.headers.items()
+        if name.lower() not in EXCLUDED_RESPONSE_HEADERS
+    }
+    return StreamingResponse(
+        resp.aiter_raw(),
+        status_code=resp.status_code,
+        headers=headers,
+        background=BackgroundTask(resp.aclose)
+    )
+
+async def fetch_upstream(upstream: str, path: str, params: Optional[dict] = None,
+                         deadline: Optional[Deadline] = None) -> CachedResponse:
+    """GET an upstream path and buffer the whole response"""
+    client = get_upstream_client(upstream)
+    try:
+        resp = await send_upstream(client, client.build_request("GET", path, params=params), deadline)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return CachedResponse(
+        resp.status_code, resp.content, resp.headers.get("content-type", "application/json"),
+        partial=resp.headers.get(PARTIAL_HEADER),
+    )
+
+def is_anonymous(request: Request) -> bool:
+    """Only requests carrying no user context may share cached responses"""
+    return (
+        "authorization" not in request.headers
+        and "x-user-info" not in request.headers
+        and "user_id" not in request.query_params
+    )
+
+async def cached_proxy(request: Request, route: str, upstream: str, path: str, params: Optional[dict] = None,
+                       deadline: Optional[Deadline] = None) -> Response:
+    """Serve an anonymous read from the response cache, loading it from upstream on a miss.
+
+    The key is the route, its current generation, the path and the query
+    params in sorted order, so ?a=1&b=2 and ?b=2&a=1 share an entry.
+    Requests with user context are streamed straight through instead.
+    Partial results (see send_upstream) are passed on but never cached.
+    """
+    if not is_anonymous(request):
+        return await proxy_stream(upstream, path, params=params, deadline=deadline)
+
+    cache = get_response_cache()
+    query = urlencode(sorted((params or {}).items()))
+    key = cache.key(route, path, query)
+    try:
+        entry, hit = await cache.get_or_load(
+            key, settings.RESPONSE_CACHE_TTLS[route], lambda: fetch_upstream(upstream, path, params, deadline), deadline
+        )
+    except asyncio.TimeoutError:
+        # Gave up waiting on another request's load of the same key
+        get_deadline_metrics().timeouts += 1
+        raise DeadlineExceededError()
+    headers = {"X-Cache": "HIT" if hit else "MISS"}
+    if entry.partial:
+        headers[PARTIAL_HEADER] = entry.partial
+        headers["Cache-Control"] = "no-store"
+    if entry.status_code != 200 or entry.partial:
+        return Response(entry.body, status_code=entry.status_code, media_type=entry.media_type, headers=headers)
+
+    headers["ETag"] = entry.etag
+    headers["Cache-Control"] = f"public, max-age={settings.RESPONSE_CACHE_TTLS[route]}"
+    if etag_matches(request.headers.get("if-none-match", ""), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, status_code=200, media_type=entry.media_type, headers=headers)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match comparison, which is weak: W/"x" matches "x" (RFC 9110 section 13.1.2)"""
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque_tag(etag) in {_opaque_tag(tag) for tag in if_none_match.split(",")}
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+import redis.asyncio as redis
+from .config import settings
+from .deadline import Deadline, DeadlineExceededError
+
+# Routes whose keys are versioned by a generation number; bumping the
+# generation drops every cached page of that route at once
+GENERATION_ROUTES = ("search", "related")
+REDIS_RETRY_SECONDS = 30
+# How long an instance's claim on a job event is remembered
+EVENT_CLAIM_SECONDS = 3600
+
+class CachedResponse:
+    """A fully buffered upstream response; partial names what the upstream skipped, if anything"""
+
+    def __init__(self, status_code: int, body: bytes, media_type: str, etag: Optional[str] = None,
+                 partial: Optional[str] = None):
+        self.status_code = status_code
+        self.body = body
+        self.media_type = media_type
+        self.etag = etag or '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.partial = partial
+
+class ResponseCache:
+    """Two-tier cache for anonymous gateway reads.
+
+    An in-process LRU sits in front of Redis. Concurrent misses for the
+    same key share a single upstream call. Job events invalidate the
+    detail entry of the changed job and bump the search and related
+    generations, so their old pages are never read again and expire.
+    A detail load still in flight when its job changes is not stored,
+    as it may have read the job before the change.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # In-flight keys invalidated since their load started
+        self._stale: Set[str] = set()
+        self._generations: Dict[str, int] = {route: 0 for route in GENERATION_ROUTES}
+        self._redis: Optional[redis.Redis] = None
+        self._redis_down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    async def start(self):
+        """Pick up the shared generation numbers written by other gateway instances"""
+        client = self._redis_client()
+        if client is None:
+            return
+        try:
+            values = await client.mget([_generation_key(route) for route in GENERATION_ROUTES])
+            for route, value in zip(GENERATION_ROUTES, values):
+                self._generations[route] = int(value or 0)
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def key(self, route: str, path: str, query: str = "") -> str:
+        generation = self._generations.get(route, 0)
+        return f"gw:cache:{route}:{generation}:{path}?{query}"
+
+    async def get_or_load(self, key: str, ttl: int, loader: Callable[[], Awaitable[CachedResponse]],
+                          deadline: Optional[Deadline] = None) -> Tuple[CachedResponse, bool]:
+        """Return (response, hit). Misses call loader once per key, however many requests wait on it.
+
+        A request waiting on another's load keeps its own deadline: it
+        raises asyncio.TimeoutError once that passes, and loads the key
+        itself if the shared load ran out of a shorter budget (timed out
+        or came back partial) while it still has time left.
+        """
+        entry = self._lru_get(key)
+        if entry is None:
+            entry = await self._redis_get(key)
+            if entry is not None:
+                self._lru_set(key, entry, ttl)
+        if entry is not None:
+            self.hits += 1
+            return entry, True
+
+        self.misses += 1
+        while key in self._inflight:
+            timeout = deadline.remaining() if deadline is not None else None
+            try:
+                entry = await asyncio.wait_for(asyncio.shield(self._inflight[key]), timeout)
+            except DeadlineExceededError:
+                if deadline is None or not deadline.remaining():
+                    raise
+                continue
+            if entry.partial and deadline is not None and deadline.remaining():
+                continue
+            return entry, False
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await loader()
+            # Partial results stand in for this request only
+            if entry.status_code == 200 and not entry.partial and key not in self._stale:
+                self._lru_set(key, entry, ttl)
+                await self._redis_set(key, entry, ttl)
+            future.set_result(entry)
+            return entry, False
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+            self._stale.discard(key)
+
+    async def invalidate_job(self, job_id: int, event_id: Optional[str] = None):
+        """Drop everything a change to job_id can make stale.
+
+        Every gateway instance sees every event, so only the one claiming
+        event_id bumps the shared generations; the others read them.
+        """
+        detail_key = self.key("job", f"/api/v1/jobs/{job_id}")
+        self._lru.pop(detail_key, None)
+        if detail_key in self._inflight:
+            self._stale.add(detail_key)
+        for route in GENERATION_ROUTES:
+            self._generations[route] += 1
+        client = self._redis_client()
+        if client is None:
+            return
+        try:
+            claimed = event_id is None or await client.set(_event_key(event_id), 1, nx=True, ex=EVENT_CLAIM_SECONDS)
+            pipe = client.pipeline(transaction=False)
+            pipe.delete(detail_key)
+            for route in GENERATION_ROUTES:
+                if claimed:
+                    pipe.incr(_generation_key(route))
+                else:
+                    pipe.get(_generation_key(route))
+            results = await pipe.execute()
+            for route, value in zip(GENERATION_ROUTES, results[1:]):
+                self._generations[route] = max(self._generations[route], int(value or 0))
+        except Exception as e:
+            self._redis_failed(e)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "generations": dict(self._generations),
+        }
+
+    def _lru_get(self, key: str) -> Optional[CachedResponse]:
+        item = self._lru.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return entry
+
+    def _lru_set(self, key: str, entry: CachedResponse, ttl: int):
+        self._lru[key] = (time.monotonic() + ttl, entry)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def _redis_get(self, key: str) -> Optional[CachedResponse]:
+        client = self._redis_client()
+        if client is None:
+            return None
+        try:
+            fields = await client.hgetall(key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if not fields:
+            return None
+        return CachedResponse(
+            int(fields[b"status"]), fields[b"body"], fields[b"media_type"].decode(), fields[b"etag"].decode()
+        )
+
+    async def _redis_set(self, key: str, entry: CachedResponse, ttl: int):
+        client = self._redis_client()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=True)
+            pipe.hset(key, mapping={
+                "status": entry.status_code,
+                "body": entry.body,
+                "media_type": entry.media_type,
+                "etag": entry.etag,
+            })
+            pipe.expire(key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+
+    def _redis_client(self) -> Optional[redis.Redis]:
+        """The Redis tier, or None while it is disabled or backing off after an error"""
+        if not settings.RESPONSE_CACHE_REDIS_ENABLED or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5
+            )
+        return self._redis
+
+    def _redis_failed(self, error: Exception):
+        print(f"[ResponseCache] Redis tier unavailable, using in-process cache only: {error}")
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+def _generation_key(route: str) -> str:
+    return f"gw:cache:gen:{route}"
+
+def _event_key(event_id: str) -> str:
+    return f"gw:cache:event:{event_id}"
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+def get_response_cache() -> ResponseCache:
+    return response_cache
@@ -1,6 +1,11 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api.v1.router import api_router
+from .core.deadline import get_deadline_metrics
+from .core.http_clients import upstream_clients
+from .core.response_cache import response_cache
+from .workers.cache_invalidation_worker import CacheInvalidationWorker
 
 app = FastAPI(
     title="Job Search API Gateway",
@@ -21,6 +26,23 @@ app.add_middleware(
 # Include the main router
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("startup")
+async def startup_upstream_clients():
+    upstream_clients.start()
+
+@app.on_event("shutdown")
+async def shutdown_upstream_clients():
+    await upstream_clients.close()
+
+@app.on_event("startup")
+async def startup_response_cache():
+    await response_cache.start()
+    asyncio.create_task(CacheInvalidationWorker().start())
+
+@app.on_event("shutdown")
+async def shutdown_response_cache():
+    await response_cache.close()
+
 @app.get("/")
 async def root():
     return {"message": "Job Search API Gateway"}
@@ -28,3 +50,18 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics/upstreams")
+async def upstream_metrics():
+    """Per-upstream request and connection reuse counters"""
+    return upstream_clients.metrics()
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """Response cache size, hit/miss counters and generations"""
+    return response_cache.stats()
+
+@app.get("/metrics/deadlines")
+async def deadline_metrics():
+    """Deadline-bound upstream calls answered in full, partially or not in time"""
+    return get_deadline_metrics().to_dict()
@@ -0,0 +1,50 @@
+import aio_pika
+import asyncio
+import json
+from typing import Optional
+from ..core.config import settings
+from ..core.response_cache import get_response_cache
+
+class CacheInvalidationWorker:
+    """Drops cached job reads when job_posting_service publishes a job event"""
+
+    def __init__(self):
+        self.cache = get_response_cache()
+
+    async def start(self):
+        """Bind a private queue to every job event and invalidate on each one"""
+        queue = await self.bind_until_ready()
+        async with queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                async with message.process():
+                    await self.process_job_event(message.routing_key, json.loads(message.body.decode()), message.message_id)
+
+    async def bind_until_ready(self):
+        """Retry binding with backoff; until it succeeds cached reads expire by TTL only"""
+        delay = 1
+        while True:
+            try:
+                return await self.bind_queue()
+            except Exception as e:
+                print(f"[CacheInvalidationWorker] RabbitMQ unavailable, retrying in {delay}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.CACHE_INVALIDATION_RETRY_MAX)
+
+    async def bind_queue(self):
+        """Declare a private queue bound to every job event (connect_robust reconnects it later)"""
+        connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
+        channel = await connection.channel()
+        exchange = await channel.declare_exchange(
+            settings.JOB_EVENTS_EXCHANGE, aio_pika.ExchangeType.TOPIC, durable=True
+        )
+        # Exclusive queue so every gateway instance sees every event
+        queue = await channel.declare_queue(exclusive=True)
+        await queue.bind(exchange, routing_key="job.*")
+        return queue
+
+    async def process_job_event(self, routing_key: str, job_data: dict, event_id: Optional[str] = None):
+        job_id = job_data.get("id")
+        if job_id is None:
+            return
+        print(f"[CacheInvalidationWorker] {routing_key} for job {job_id}, invalidating cached reads")
+        await self.cache.invalidate_job(job_id, event_id)
@@ -12,4 +12,211 @@ def test_root():
 def test_health():
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "healthy"} 
\ No newline at end of file
+    assert response.json() == {"status": "healthy"} 
+
+def test_upstream_metrics():
+    response = client.get("/metrics/upstreams")
+    assert response.status_code == 200
+    assert set(response.json()) == {"job_posting", "job_search", "notification", "ai_agent"}
+
+def test_cache_metrics():
+    response = client.get("/metrics/cache")
+    assert response.status_code == 200
+    assert {"entries", "hits", "misses", "generations"} <= set(response.json())
+
+def test_response_cache_coalesces_misses(monkeypatch):
+    import asyncio
+    from app.core.config import settings
+    from app.core.response_cache import CachedResponse, ResponseCache
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_REDIS_ENABLED", False)
+    cache = ResponseCache(max_entries=10)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return CachedResponse(200, b'{"id": 1}', "application/json")
+
+    async def run():
+        key = cache.key("job", "/api/v1/jobs/1")
+        results = await asyncio.gather(*(cache.get_or_load(key, 60, loader) for _ in range(5)))
+        cached, hit = await cache.get_or_load(key, 60, loader)
+        return results, cached, hit
+
+    results, cached, hit = asyncio.run(run())
+    assert len(calls) == 1
+    assert {entry.etag for entry, _ in results} == {cached.etag}
+    assert hit
+
+def test_cache_invalidation_worker_retries(monkeypatch):
+    import asyncio
+    from app.workers import cache_invalidation_worker
+    from app.workers.cache_invalidation_worker import CacheInvalidationWorker
+
+    attempts = []
+    delays = []
+
+    async def bind_queue(self):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("queue is down")
+        return "queue"
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(CacheInvalidationWorker, "bind_queue", bind_queue)
+    monkeypatch.setattr(cache_invalidation_worker.asyncio, "sleep", sleep)
+    assert asyncio.run(CacheInvalidationWorker().bind_until_ready()) == "queue"
+    assert delays == [1, 2]
+
+def test_response_cache_skips_loads_invalidated_in_flight(monkeypatch):
+    import asyncio
+    from app.core.config import settings
+    from app.core.response_cache import CachedResponse, ResponseCache
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_REDIS_ENABLED", False)
+    cache = ResponseCache(max_entries=10)
+
+    async def run():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def old_loader():
+            started.set()
+            await release.wait()
+            return CachedResponse(200, b'{"title": "old"}', "application/json")
+
+        async def new_loader():
+            return CachedResponse(200, b'{"title": "new"}', "application/json")
+
+        key = cache.key("job", "/api/v1/jobs/1")
+        load = asyncio.create_task(cache.get_or_load(key, 60, old_loader))
+        await started.wait()
+        await cache.invalidate_job(1)
+        release.set()
+        await load
+        return await cache.get_or_load(key, 60, new_loader)
+
+    entry, hit = asyncio.run(run())
+    assert entry.body == b'{"title": "new"}'
+    assert not hit
+
+def test_if_none_match_weak_etags():
+    from app.core.proxy import etag_matches
+
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+
+def test_generations_bumped_once_per_event(monkeypatch):
+    import asyncio
+    fakeredis = pytest.importorskip("fakeredis")
+    from app.core.config import settings
+    from app.core.response_cache import ResponseCache
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_REDIS_ENABLED", True)
+    server = fakeredis.FakeServer()
+    instances = [ResponseCache(max_entries=10) for _ in range(3)]
+    for instance in instances:
+        instance._redis = fakeredis.aioredis.FakeRedis(server=server)
+
+    async def run():
+        for event_id in ("event-1", "event-2"):
+            for instance in instances:
+                await instance.invalidate_job(1, event_id)
+        return await instances[0]._redis.get("gw:cache:gen:search")
+
+    assert int(asyncio.run(run())) == 2
+    assert {instance.stats()["generations"]["search"] for instance in instances} == {2}
+
+def test_deadline_metrics():
+    response = client.get("/metrics/deadlines")
+    assert response.status_code == 200
+    assert {"requests", "partial", "timeouts"} <= set(response.json())
+
+def test_upstream_deadline(monkeypatch):
+    import asyncio
+    import httpx
+    from fastapi import HTTPException
+    from app.core.config import settings
+    from app.core.deadline import DEADLINE_HEADER, PARTIAL_HEADER, Deadline
+    from app.core.proxy import send_upstream
+    from app.core.response_cache import CachedResponse, ResponseCache
+
+    async def handler(request: httpx.Request):
+        budget = int(request.headers[DEADLINE_HEADER])
+        if request.url.path == "/slow":
+            await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"budget": budget}, headers={PARTIAL_HEADER: "ranking"})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://upstream") as upstream:
+            resp = await send_upstream(upstream, upstream.build_request("GET", "/fast"), Deadline(1.0))
+            try:
+                await send_upstream(upstream, upstream.build_request("GET", "/slow"), Deadline(0.05))
+                status = None
+            except HTTPException as e:
+                status = e.status_code
+        return resp, status
+
+    resp, status = asyncio.run(run())
+    assert 0 < resp.json()["budget"] <= 1000 - settings.DEADLINE_MARGIN * 1000
+    assert status == 504
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_REDIS_ENABLED", False)
+    cache = ResponseCache(max_entries=10)
+
+    async def loader():
+        return CachedResponse(200, b'{"jobs": []}', "application/json", partial="ranking")
+
+    async def load_twice():
+        key = cache.key("search", "/api/v1/search")
+        await cache.get_or_load(key, 60, loader)
+        return await cache.get_or_load(key, 60, loader)
+
+    assert not asyncio.run(load_twice())[1]
+
+def test_coalesced_waiters_keep_their_own_deadline(monkeypatch):
+    import asyncio
+    from app.core.config import settings
+    from app.core.deadline import Deadline
+    from app.core.response_cache import CachedResponse, ResponseCache
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_REDIS_ENABLED", False)
+    cache = ResponseCache(max_entries=10)
+    key = cache.key("search", "/api/v1/search")
+
+    async def short_loader():
+        # Ran out of its own short budget
+        await asyncio.sleep(0.05)
+        return CachedResponse(200, b'{"jobs": []}', "application/json", partial="ranking")
+
+    async def full_loader():
+        return CachedResponse(200, b'{"jobs": [1]}', "application/json")
+
+    async def slow_loader():
+        await asyncio.sleep(0.5)
+        return CachedResponse(200, b'{"jobs": [1]}', "application/json")
+
+    async def run():
+        first = asyncio.create_task(cache.get_or_load(key, 60, short_loader, Deadline(0.05)))
+        await asyncio.sleep(0)
+        waiter = await cache.get_or_load(key, 60, full_loader, Deadline(1.0))
+        await first
+        other = cache.key("search", "/api/v1/search", "q=x")
+        slow = asyncio.create_task(cache.get_or_load(other, 60, slow_loader, Deadline(1.0)))
+        await asyncio.sleep(0)
+        try:
+            await cache.get_or_load(other, 60, slow_loader, Deadline(0.05))
+            timed_out = False
+        except asyncio.TimeoutError:
+            timed_out = True
+        await slow
+        return waiter, timed_out
+
+    (entry, hit), timed_out = asyncio.run(run())
+    assert entry.partial is None and entry.body == b'{"jobs": [1]}'
+    assert timed_out
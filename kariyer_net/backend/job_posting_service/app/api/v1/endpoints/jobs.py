@@ -1,24 +1,46 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ....core.database import get_db
 from ....services.job_service import JobService
+from ....services.job_event_log import EventLogTrimmedError
 from ....schemas.job import JobCreate, JobUpdate, JobResponse
+from ....utils.cursor import InvalidCursorError
 from pydantic import BaseModel
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = 100
+MAX_EVENTS_PAGE_SIZE = 1000
+
 @router.get("/", response_model=List[JobResponse])
 async def get_jobs(
+    response: Response,
     skip: int = 0, 
     limit: int = 10,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     job_service: JobService = Depends()
 ):
-    """Get all jobs with pagination from Redis"""
+    """Get all jobs with pagination from Redis, newest first.
+
+    Pass the X-Next-Cursor header of a page as cursor to get the next one;
+    it is sent with the first page and every cursor page until the last.
+    skip still works but costs more the deeper the page.
+    """
     try:
+        if cursor or skip == 0:
+            jobs, next_cursor = await job_service.get_jobs_page(db, limit, cursor)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return jobs
         jobs = await job_service.get_jobs(db, skip, limit)
         return jobs
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -59,13 +81,58 @@ async def get_home_jobs(
     if not jobs or len(jobs) < 5:
         # Fallback: get more jobs (not filtered by city), but avoid duplicates
         needed = 5 - len(jobs)
-        all_jobs = await job_service.get_jobs(db, 0, 20)
+        recent_jobs = await job_service.get_active_jobs(db, limit=5 + len(jobs))
         # Exclude jobs already in the city list
         city_job_ids = {job['id'] for job in jobs}
-        fallback_jobs = [job for job in all_jobs if job['id'] not in city_job_ids and job.get('is_active', True)]
+        fallback_jobs = [job for job in recent_jobs if job['id'] not in city_job_ids]
         jobs += fallback_jobs[:needed]
     return jobs[:5]
 
+@router.get("/batch", response_model=List[JobResponse])
+async def get_jobs_batch(
+    ids: str = Query(..., description="Comma-separated job ids, e.g. 1,2,3"),
+    db: Session = Depends(get_db),
+    job_service: JobService = Depends()
+):
+    """Get several jobs by ID from Redis in one round trip. Unknown ids are skipped."""
+    try:
+        job_ids = [int(job_id) for job_id in ids.split(",") if job_id.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers"
+        )
+    if len(job_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_SIZE} ids can be requested at once"
+        )
+    return await job_service.get_jobs_by_ids(db, job_ids)
+
+@router.get("/events/seq")
+async def get_job_events_seq(job_service: JobService = Depends()):
+    """Get the sequence number of the latest job event"""
+    return {"last_seq": await job_service.get_job_events_seq()}
+
+@router.get("/events")
+async def get_job_events(
+    after_seq: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=MAX_EVENTS_PAGE_SIZE),
+    job_service: JobService = Depends()
+):
+    """Get job events with a sequence number above after_seq, oldest first.
+
+    Returns 410 when part of that range was trimmed from the log; the
+    caller should reload the full job list instead.
+    """
+    try:
+        return await job_service.get_job_events(after_seq, limit)
+    except EventLogTrimmedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=str(e)
+        )
+
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(
     job_id: int,
@@ -89,7 +156,13 @@ async def update_job(
     job_service: JobService = Depends()
 ):
     """Update an existing job in Redis"""
-    job = await job_service.update_job(db, job_id, job_data)
+    try:
+        job = await job_service.update_job(db, job_id, job_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,17 @@
+import redis.asyncio as redis
+from .config import settings
+
+# One connection pool per process, shared by every request
+redis_pool = redis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    decode_responses=True
+)
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+def get_cache():
+    return redis_client
+
+async def close_cache():
+    await redis_client.aclose()
+    await redis_pool.disconnect()
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api.v1.router import api_router
+from .core.cache import close_cache
 
 app = FastAPI(
     title="Job Posting Service",
@@ -26,5 +27,9 @@ async def root():
 async def health():
     return {"status": "healthy", "service": "job_posting_service"}
 
+@app.on_event("shutdown")
+async def shutdown_cache():
+    await close_cache()
+
 # Include the main router
 app.include_router(api_router, prefix="/api/v1")
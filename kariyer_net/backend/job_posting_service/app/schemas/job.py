@@ -1,6 +1,13 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 from datetime import datetime
+from ..utils.validators import validate_salary_range
+
+def check_salary_range(job):
+    """Reject a salary_min above salary_max; search treats the two as a range"""
+    if not validate_salary_range(job.salary_min, job.salary_max):
+        raise ValueError("salary_min must not exceed salary_max")
+    return job
 
 class JobBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -12,6 +19,10 @@ class JobBase(BaseModel):
     work_mode: str = Field(..., pattern="^(remote|on-site|hybrid)$")
     job_type: str = Field(..., pattern="^(full-time|part-time|contract)$")
 
+    @model_validator(mode="after")
+    def salary_range(self):
+        return check_salary_range(self)
+
 class JobCreate(JobBase):
     pass
 
@@ -25,6 +36,10 @@ class JobUpdate(BaseModel):
     work_mode: Optional[str] = Field(None, pattern="^(remote|on-site|hybrid)$")
     job_type: Optional[str] = Field(None, pattern="^(full-time|part-time|contract)$")
 
+    @model_validator(mode="after")
+    def salary_range(self):
+        return check_salary_range(self)
+
 class JobResponse(BaseModel):
     id: int
     title: str
@@ -32,6 +47,10 @@ class JobResponse(BaseModel):
     company_id: int
     company_name: str
     location: str
+    # Gazetteer place ids parsed from location, None where not recognized
+    country_id: Optional[str] = None
+    city_id: Optional[str] = None
+    district_id: Optional[str] = None
     salary_min: Optional[int] = None
     salary_max: Optional[int] = None
     work_mode: str
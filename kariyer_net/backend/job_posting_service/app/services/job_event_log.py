@@ -0,0 +1,64 @@
+import json
+from typing import List, Tuple
+import redis.asyncio as redis
+
+# Kept outside "jobs:*" so rebuild_job_indexes.py never drops them
+SEQ_KEY = "job_events:seq"      # last sequence number handed out
+LOG_KEY = "job_events:log"      # stream of recent events, entry id "{seq}-0"
+
+# INCR and XADD in one script so stream order always matches sequence order,
+# however many API workers publish at the same time
+APPEND_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[1], seq .. '-0', 'routing_key', ARGV[2], 'job', ARGV[3])
+return seq
+"""
+
+class EventLogTrimmedError(Exception):
+    """The requested events are older than the retained log"""
+
+class JobEventLog:
+    """Sequenced, replayable log of job events.
+
+    Every published event gets the next sequence number and is kept in a
+    capped Redis stream, so consumers that notice a gap in the sequence
+    numbers can fetch exactly the events they missed.
+    """
+
+    def __init__(self, redis_client: redis.Redis, max_length: int):
+        self.redis_client = redis_client
+        self.max_length = max_length
+        self._append = redis_client.register_script(APPEND_SCRIPT)
+
+    async def append(self, routing_key: str, job: dict) -> int:
+        """Record an event and return its sequence number"""
+        seq = await self._append(keys=[SEQ_KEY, LOG_KEY], args=[self.max_length, routing_key, json.dumps(job)])
+        return int(seq)
+
+    async def current_seq(self) -> int:
+        return int(await self.redis_client.get(SEQ_KEY) or 0)
+
+    async def read_after(self, after_seq: int, limit: int) -> Tuple[List[dict], int]:
+        """Return up to limit events with seq > after_seq, oldest first, and the current seq.
+
+        Raises EventLogTrimmedError when some of those events were already
+        trimmed from the stream; the caller then has to reload everything.
+        """
+        current = await self.current_seq()
+        if after_seq >= current:
+            return [], current
+        entries = await self.redis_client.xrange(LOG_KEY, min=f"{after_seq + 1}-0", count=limit)
+        first_seq = _entry_seq(entries[0]) if entries else None
+        if first_seq != after_seq + 1:
+            raise EventLogTrimmedError(f"Events after seq {after_seq} are no longer retained")
+        events = [
+            {"seq": _entry_seq(entry), "routing_key": entry[1]["routing_key"], "job": json.loads(entry[1]["job"])}
+            for entry in entries
+        ]
+        return events, current
+
+def _entry_seq(entry: tuple) -> int:
+    entry_id = entry[0]
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    return int(entry_id.split("-")[0])
@@ -0,0 +1,195 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+import redis.asyncio as redis
+from ..utils.gazetteer import get_gazetteer
+
+# Index keys live under "jobs:" so they never match the "job:*" data keys
+RECENT_KEY = "jobs:recent"          # sorted set: job id -> created_at epoch
+ACTIVE_KEY = "jobs:active"          # set of active job ids
+INACTIVE_KEY = "jobs:inactive"      # set of soft-deleted job ids
+# Sorted sets of the active jobs per attribute value, scored like RECENT_KEY
+CITY_KEY = "jobs:city:{}"           # per location component
+PLACE_KEY = "jobs:place:{}"         # per gazetteer place id (country, city, district)
+WORK_MODE_KEY = "jobs:work_mode:{}"
+JOB_TYPE_KEY = "jobs:job_type:{}"
+COMPANY_KEY = "jobs:company:{}"
+JOB_KEYS_KEY = "jobs:keys:{}"       # set of the attribute keys a job is posted under
+
+class JobIndex:
+    """Secondary indexes for the jobs stored in Redis.
+
+    Every write to a job:{id} key goes through index_job in the same
+    pipeline, so listing and lookup queries can use ZRANGE/SINTER instead
+    of scanning the keyspace. Attribute indexes only hold active jobs,
+    newest first, so a lookup is one ZREVRANGE of the page it needs.
+    Each job also records the attribute keys it was posted under, so a
+    job whose key expired can be dropped without its body. index_job and
+    unindex_job only queue commands, so they work with both sync and
+    asyncio pipelines.
+    """
+
+    def __init__(self, redis_client: redis.Redis):
+        self.redis_client = redis_client
+
+    def index_job(self, pipe, job: dict, previous: Optional[dict] = None):
+        """Queue the index updates for a created or updated job on pipe"""
+        job_id = job["id"]
+        score = created_at_score(job)
+        keys = self._attribute_keys(job)
+        if previous:
+            for key in self._attribute_keys(previous):
+                pipe.zrem(key, job_id)
+        pipe.delete(JOB_KEYS_KEY.format(job_id))
+        pipe.zadd(RECENT_KEY, {job_id: score})
+        if job.get("is_active", True):
+            for key in keys:
+                pipe.zadd(key, {job_id: score})
+            if keys:
+                pipe.sadd(JOB_KEYS_KEY.format(job_id), *keys)
+            pipe.srem(INACTIVE_KEY, job_id)
+            pipe.sadd(ACTIVE_KEY, job_id)
+        else:
+            for key in keys:
+                pipe.zrem(key, job_id)
+            pipe.srem(ACTIVE_KEY, job_id)
+            pipe.sadd(INACTIVE_KEY, job_id)
+
+    def unindex_job(self, pipe, job_id: int, keys: Iterable[str] = ()):
+        """Queue the removal of a job from the given attribute indexes and every global one on pipe"""
+        for key in keys:
+            pipe.zrem(key, job_id)
+        pipe.delete(JOB_KEYS_KEY.format(job_id))
+        pipe.zrem(RECENT_KEY, job_id)
+        pipe.srem(ACTIVE_KEY, job_id)
+        pipe.srem(INACTIVE_KEY, job_id)
+
+    async def prune_jobs(self, job_ids: List[int]):
+        """Drop jobs whose job key has expired from every index they were posted under"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.smembers(JOB_KEYS_KEY.format(job_id))
+        key_sets = await pipe.execute()
+        pipe = self.redis_client.pipeline()
+        for job_id, keys in zip(job_ids, key_sets):
+            self.unindex_job(pipe, job_id, keys)
+        await pipe.execute()
+
+    async def recent_ids(self, skip: int, limit: int) -> List[int]:
+        """Job ids ordered by created_at, newest first"""
+        if limit <= 0:
+            return []
+        return [int(job_id) for job_id in await self.redis_client.zrevrange(RECENT_KEY, skip, skip + limit - 1)]
+
+    async def recent_page(self, limit: int, after: Optional[Tuple[float, int]] = None) -> Tuple[List[int], Optional[Tuple[float, int]]]:
+        """Job ids newest first, starting behind the (score, id) a previous page ended at.
+
+        Returns the page and the position of its last job, or None when
+        nothing follows. Jobs added meanwhile do not shift later pages.
+        """
+        if limit <= 0:
+            return [], None
+        start = 0 if after is None else await self._rank_after(*after)
+        members = await self.redis_client.zrevrange(RECENT_KEY, start, start + limit, withscores=True)
+        ids = [int(job_id) for job_id, _ in members[:limit]]
+        if len(members) <= limit:
+            return ids, None
+        return ids, (members[limit - 1][1], ids[-1])
+
+    async def _rank_after(self, score: float, job_id: int) -> int:
+        """Rank of the first job ordered after (score, job_id) in the recency index"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zrevrank(RECENT_KEY, job_id)
+        pipe.zscore(RECENT_KEY, job_id)
+        rank, current = await pipe.execute()
+        if rank is not None and current == score:
+            return rank + 1
+        # The job is gone or was re-scored: count the jobs ordered before its old
+        # position. Equal scores are in descending member order, so tied members
+        # greater than job_id were already returned.
+        higher = await self.redis_client.zcount(RECENT_KEY, f"({score}", "+inf")
+        ties = await self.redis_client.zrangebyscore(RECENT_KEY, score, score)
+        return higher + sum(1 for tied in ties if tied > str(job_id))
+
+    async def recent_active_ids(self, limit: int) -> List[int]:
+        """Newest active job ids, walking the recency index page by page"""
+        ids = []
+        start = 0
+        chunk = max(limit * 2, 10)
+        while len(ids) < limit:
+            page = await self.redis_client.zrevrange(RECENT_KEY, start, start + chunk - 1)
+            if not page:
+                break
+            flags = await self.redis_client.smismember(ACTIVE_KEY, page)
+            ids.extend(int(job_id) for job_id, active in zip(page, flags) if active)
+            start += chunk
+        return ids[:limit]
+
+    async def active_ids_in_city(self, city: str, limit: int) -> List[int]:
+        """Newest active job ids in a city or district, or whose location has the given component.
+
+        A city or district the gazetteer knows is looked up by place id,
+        so "İstanbul" also finds jobs posted in "Kadıköy". Otherwise only
+        whole comma-separated parts match: "Istanbul" finds "Kadıköy,
+        Istanbul", but "Ist" finds nothing.
+        """
+        if limit <= 0:
+            return []
+        gazetteer = get_gazetteer()
+        place = gazetteer.resolve_city(city) or gazetteer.resolve_district(city)
+        keys = [CITY_KEY.format(normalize(city))]
+        if place:
+            keys.append(PLACE_KEY.format(place))
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.zrevrange(key, 0, limit - 1, withscores=True)
+        scores = {}
+        for members in await pipe.execute():
+            scores.update((int(job_id), score) for job_id, score in members)
+        return sorted(scores, key=lambda job_id: (-scores[job_id], -job_id))[:limit]
+
+    async def related_ids(self, job: dict, limit: int) -> List[int]:
+        """Newest active job ids sharing the job's company or a part of its location, the job itself excluded"""
+        if limit <= 0:
+            return []
+        keys = [CITY_KEY.format(city) for city in location_components(job.get("location"))]
+        if job.get("company_id") is not None:
+            keys.append(COMPANY_KEY.format(job["company_id"]))
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            # One more than needed, in case the job itself is among them
+            pipe.zrevrange(key, 0, limit, withscores=True)
+        scores = {}
+        for members in await pipe.execute():
+            scores.update((int(job_id), score) for job_id, score in members)
+        scores.pop(job["id"], None)
+        return sorted(scores, key=lambda job_id: (-scores[job_id], -job_id))[:limit]
+
+    def _attribute_keys(self, job: dict) -> List[str]:
+        keys = [CITY_KEY.format(city) for city in location_components(job.get("location"))]
+        for field in ("country_id", "city_id", "district_id"):
+            if job.get(field):
+                keys.append(PLACE_KEY.format(job[field]))
+        if job.get("work_mode"):
+            keys.append(WORK_MODE_KEY.format(normalize(job["work_mode"])))
+        if job.get("job_type"):
+            keys.append(JOB_TYPE_KEY.format(normalize(job["job_type"])))
+        if job.get("company_id") is not None:
+            keys.append(COMPANY_KEY.format(job["company_id"]))
+        return keys
+
+def normalize(value: str) -> str:
+    return value.strip().lower()
+
+def location_components(location: Optional[str]) -> List[str]:
+    """Every comma-separated part of a location, e.g. "Kadıköy, Istanbul" -> ["kadıköy", "istanbul"]"""
+    return [normalize(part) for part in (location or "").split(",") if part.strip()]
+
+def created_at_score(job: dict) -> float:
+    """Sort score for the recency index; jobs without a usable created_at sort last"""
+    created_at = job.get("created_at")
+    if not created_at:
+        return 0.0
+    try:
+        return datetime.fromisoformat(created_at.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
@@ -1,38 +1,78 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import json
-import redis
 from ..models.job import Job
 from ..models.company import Company
 from ..schemas.job import JobCreate, JobUpdate
 from ..core.config import settings
+from ..core.cache import get_cache
 from ..models.application import JobApplication
+from ..utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+from ..utils.gazetteer import get_gazetteer
+from ..utils.validators import validate_salary_range
+from .job_index import JobIndex
+from .job_event_log import JobEventLog
 from sqlalchemy import func
 from datetime import datetime, timezone
 import aio_pika
 import asyncio
+import uuid
 
 class JobService:
     def __init__(self):
-        self.redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.redis_client = get_cache()
+        self.job_index = JobIndex(self.redis_client)
+        self.event_log = JobEventLog(self.redis_client, settings.JOB_EVENTS_LOG_MAX_LENGTH)
+        self.gazetteer = get_gazetteer()
     
     async def get_jobs(self, db: Session, skip: int = 0, limit: int = 10) -> List[dict]:
-        """Get all jobs from Redis with pagination"""
-        # Get all job keys from Redis
-        job_keys = self.redis_client.keys("job:*")
-        job_keys = job_keys[skip:skip + limit]
-        
-        jobs = []
-        for key in job_keys:
-            job_data = self.redis_client.get(key)
-            if job_data:
-                jobs.append(json.loads(job_data))
-        
+        """Get all jobs from Redis with pagination, newest first"""
+        return await self._load_jobs(await self.job_index.recent_ids(skip, limit), prune=True)
+
+    async def get_jobs_page(self, db: Session, limit: int = 10, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of jobs newest first and the cursor of the next page (None on the last).
+
+        The cursor holds the created_at score and id of the page's last
+        job, so any page costs the same and new jobs do not shift it.
+        """
+        after = None
+        if cursor:
+            position = decode_cursor(cursor)
+            try:
+                after = (float(position["s"]), int(position["i"]))
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursorError("Malformed cursor")
+        job_ids, last = await self.job_index.recent_page(limit, after)
+        jobs = await self._load_jobs(job_ids, prune=True)
+        return jobs, encode_cursor({"s": last[0], "i": last[1]}) if last else None
+
+    async def get_active_jobs(self, db: Session, limit: int = 10) -> List[dict]:
+        """Get the newest active jobs from Redis"""
+        return await self._load_jobs(await self.job_index.recent_active_ids(limit), prune=True)
+
+    async def get_jobs_by_ids(self, db: Session, job_ids: List[int]) -> List[dict]:
+        """Get several jobs from Redis in one round trip, in the given order, skipping unknown ids"""
+        return await self._load_jobs(job_ids)
+
+    async def _load_jobs(self, job_ids: List[int], prune: bool = False) -> List[dict]:
+        """Hydrate jobs with a single MGET and decode them in one pass.
+
+        With prune, ids whose job key has expired are dropped from the indexes.
+        """
+        if not job_ids:
+            return []
+        values = await self.redis_client.mget([f"job:{job_id}" for job_id in job_ids])
+        found = [value for value in values if value]
+        # Decode the whole batch with one parser call instead of one per job
+        jobs = json.loads("[" + ",".join(found) + "]")
+        expired = [job_id for job_id, value in zip(job_ids, values) if not value]
+        if prune and expired:
+            await self.job_index.prune_jobs(expired)
         return jobs
 
     async def get_job(self, db: Session, job_id: int) -> Optional[dict]:
         """Get a specific job by ID from Redis and add application_count and last_updated"""
-        job_data = self.redis_client.get(f"job:{job_id}")
+        job_data = await self.redis_client.get(f"job:{job_id}")
         if job_data:
             job = json.loads(job_data)
             # Get application count from DB
@@ -65,7 +105,7 @@ class JobService:
             raise ValueError("Company not found")
         
         # Generate job ID
-        job_id = self.redis_client.incr("job_counter")
+        job_id = await self.redis_client.incr("job_counter")
         
         # Create timestamp
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
@@ -78,6 +118,8 @@ class JobService:
             "company_id": job_data.company_id,
             "company_name": company.name,
             "location": job_data.location,
+            # Parsed once here, so readers filter by place id instead of matching text
+            **self.gazetteer.parse(job_data.location),
             "salary_min": job_data.salary_min,
             "salary_max": job_data.salary_max,
             "work_mode": job_data.work_mode,
@@ -88,20 +130,21 @@ class JobService:
             "updated_at": iso_now
         }
         
-        # Store in Redis
-        self.redis_client.setex(
+        # Store in Redis together with its index entries
+        pipe = self.redis_client.pipeline()
+        pipe.setex(
             f"job:{job_id}", 
             3600 * 24 * 30,  # 30 days TTL
             json.dumps(job_dict)
         )
+        self.job_index.index_job(pipe, job_dict)
+        await pipe.execute()
         
         # Also insert into SQL jobs table for FK integrity
         sql_job = Job(
             id=job_id,
             job_name=job_data.title,
-            country="Turkey",  # Default or parse from location
-            city=job_data.location.split(",")[0] if "," in job_data.location else job_data.location,
-            town="",  # Not available, set empty
+            **self._sql_location(job_dict),
             employment_type=job_data.job_type,
             workplace_type=job_data.work_mode,
             company_id=job_data.company_id,
@@ -111,21 +154,60 @@ class JobService:
         db.commit()
         db.refresh(sql_job)
         
-        # Publish to RabbitMQ (safe, non-blocking)
+        await self._publish_job_event("job.created", job_dict)
+        return job_dict
+
+    def _sql_location(self, job: dict) -> dict:
+        """The jobs table country, city and town columns for a job's parsed location"""
+        names = self.gazetteer.names
+        location = job["location"]
+        return {
+            "country": names.get(job.get("country_id"), "Turkey"),
+            # Unrecognized locations keep the old guess: the text before the first comma
+            "city": names.get(job.get("city_id"), location.split(",")[0].strip()),
+            "town": names.get(job.get("district_id"), ""),
+        }
+
+    async def _publish_job_event(self, routing_key: str, job: dict):
+        """Publish a job event to RabbitMQ (safe, non-blocking).
+
+        Events go to the job events topic exchange; the "new_jobs" queue only
+        receives job.created, the search service and gateway bind to job.*.
+        Each event is first recorded in the event log and carries its
+        sequence number in the "seq" header, so replicas can detect gaps.
+        """
+        headers = {}
+        try:
+            headers["seq"] = await self.event_log.append(routing_key, job)
+        except Exception as e:
+            print(f"[JobEventLog] Failed to record {routing_key} event: {e}")
         try:
             connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
             async with connection:
                 channel = await connection.channel()
+                exchange = await channel.declare_exchange(
+                    settings.JOB_EVENTS_EXCHANGE, aio_pika.ExchangeType.TOPIC, durable=True
+                )
                 queue = await channel.declare_queue("new_jobs", durable=True)
-                message_body = json.dumps(job_dict).encode()
-                await channel.default_exchange.publish(
-                    aio_pika.Message(body=message_body),
-                    routing_key=queue.name
+                await queue.bind(exchange, routing_key="job.created")
+                message_body = json.dumps(job).encode()
+                await exchange.publish(
+                    # Identifies the event, so consumers sharing state can act on it once
+                    aio_pika.Message(body=message_body, message_id=str(uuid.uuid4()), headers=headers),
+                    routing_key=routing_key
                 )
-                print("[RabbitMQ] Published new job event")
+                print(f"[RabbitMQ] Published {routing_key} event (seq {headers.get('seq')})")
         except Exception as e:
-            print(f"[RabbitMQ] Failed to publish new job event: {e}")
-        return job_dict
+            print(f"[RabbitMQ] Failed to publish {routing_key} event: {e}")
+
+    async def get_job_events_seq(self) -> int:
+        """Get the sequence number of the latest job event"""
+        return await self.event_log.current_seq()
+
+    async def get_job_events(self, after_seq: int, limit: int) -> dict:
+        """Get the logged job events after after_seq, for replicas catching up"""
+        events, current_seq = await self.event_log.read_after(after_seq, limit)
+        return {"events": events, "last_seq": current_seq}
 
     async def update_job(self, db: Session, job_id: int, job_data: JobUpdate) -> Optional[dict]:
         """Update an existing job in Redis and SQL"""
@@ -134,19 +216,28 @@ class JobService:
             return None
         
         # Update fields in Redis job dict
+        previous = dict(job)
         update_data = job_data.dict(exclude_unset=True)
         job.update(update_data)
+        # The update may set one bound past the job's other one
+        if not validate_salary_range(job.get("salary_min"), job.get("salary_max")):
+            raise ValueError("salary_min must not exceed salary_max")
+        if "location" in update_data:
+            job.update(self.gazetteer.parse(job["location"]))
         # Set updated_at to now
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
         iso_now = now.isoformat().replace('+00:00', 'Z')
         job['updated_at'] = iso_now
         
-        # Store updated job back to Redis
-        self.redis_client.setex(
+        # Store updated job back to Redis and move its index entries
+        pipe = self.redis_client.pipeline()
+        pipe.setex(
             f"job:{job_id}",
             3600 * 24 * 30,  # 30 days TTL
             json.dumps(job)
         )
+        self.job_index.index_job(pipe, job, previous)
+        await pipe.execute()
         
         # --- Update SQL record ---
         sql_job = db.query(Job).filter(Job.id == job_id).first()
@@ -164,11 +255,13 @@ class JobService:
                 elif field == "job_type":
                     sql_job.employment_type = value
                 elif field == "location":
-                    sql_job.city = value.split(",")[0] if "," in value else value
+                    for column, column_value in self._sql_location(job).items():
+                        setattr(sql_job, column, column_value)
             sql_job.updated_at = now
             db.commit()
             db.refresh(sql_job)
         
+        await self._publish_job_event("job.updated", job)
         return job
 
     async def delete_job(self, db: Session, job_id: int) -> bool:
@@ -179,24 +272,21 @@ class JobService:
         
         # Soft delete by setting is_active to False
         job["is_active"] = False
-        self.redis_client.setex(
+        pipe = self.redis_client.pipeline()
+        pipe.setex(
             f"job:{job_id}",
             3600 * 24 * 30,  # 30 days TTL
             json.dumps(job)
         )
+        self.job_index.index_job(pipe, job)
+        await pipe.execute()
         
+        await self._publish_job_event("job.deactivated", job)
         return True
 
     async def get_jobs_by_location(self, db: Session, location: str, limit: int = 5) -> List[dict]:
-        """Get jobs by location from Redis"""
-        # This is a simplified implementation
-        # In production, you might want to use Redis search or maintain separate indexes
-        all_jobs = await self.get_jobs(db, 0, 100)  # Get more jobs to filter
-        filtered_jobs = [
-            job for job in all_jobs 
-            if location.lower() in job.get("location", "").lower() and job.get("is_active", True)
-        ]
-        return filtered_jobs[:limit]
+        """Get the newest active jobs whose location has the given comma-separated part from Redis"""
+        return await self._load_jobs(await self.job_index.active_ids_in_city(location, limit), prune=True)
 
     async def get_company(self, db: Session, company_id: int) -> Optional[Company]:
         """Get company from SQL database"""
@@ -211,19 +301,12 @@ class JobService:
         return company 
 
     async def get_related_jobs(self, db: Session, job_id: int, skip: int = 0, limit: int = 3) -> list:
-        """Find related jobs by similar title or location, excluding the current job, with pagination."""
+        """Find the newest active jobs at the same company or in the same location, excluding the current job, with pagination."""
         job = await self.get_job(db, job_id)
         if not job:
             return []
-        all_jobs = await self.get_jobs(db, 0, 100)
-        related = [
-            j for j in all_jobs
-            if j["id"] != job_id and (
-                job["title"].split()[0].lower() in j["title"].lower() or
-                job["location"].lower() == j["location"].lower()
-            ) and j.get("is_active", True)
-        ]
-        return related[skip:skip+limit]
+        related_ids = await self.job_index.related_ids(job, skip + limit)
+        return await self._load_jobs(related_ids[skip:], prune=True)
 
     async def apply_to_job(self, db: Session, job_id: int, user_id: int) -> bool:
         """Create a job application if not already applied."""
@@ -236,14 +319,14 @@ class JobService:
         db.refresh(application)
         
         # Update application count in Redis
-        job_data = self.redis_client.get(f"job:{job_id}")
+        job_data = await self.redis_client.get(f"job:{job_id}")
         if job_data:
             job = json.loads(job_data)
             # Get current application count from DB
             application_count = db.query(func.count(JobApplication.id)).filter(JobApplication.job_id == job_id).scalar()
             job["application_count"] = application_count
             # Update the job in Redis
-            self.redis_client.setex(
+            await self.redis_client.setex(
                 f"job:{job_id}",
                 3600 * 24 * 30,  # 30 days TTL
                 json.dumps(job)
@@ -0,0 +1,19 @@
+import base64
+import json
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor that was not issued by this service or does not fit the request"""
+
+def encode_cursor(position: dict) -> str:
+    """Opaque URL-safe token for the position a page ended at"""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raise InvalidCursorError("Malformed cursor")
+    if not isinstance(position, dict):
+        raise InvalidCursorError("Malformed cursor")
+    return position
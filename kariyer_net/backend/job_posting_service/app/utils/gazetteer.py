@@ -0,0 +1,116 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional
+from .gazetteer_data import COUNTRIES, DISTRICTS, PROVINCES
+
+# Parts of a free-text location: "Kadıköy, İstanbul", "Istanbul/Kadıköy", "Ankara - Çankaya"
+LOCATION_SEPARATORS = re.compile(r"[,/;|()]|\s-\s")
+ASCII_FOLD = str.maketrans({"ı": "i", "İ": "i", "I": "i"})
+
+def place_key(text: Optional[str]) -> str:
+    """Lower-case ASCII form of a place name, so "İSTANBUL", "istanbul" and "Istanbul" compare equal"""
+    decomposed = unicodedata.normalize("NFKD", (text or "").translate(ASCII_FOLD).lower())
+    return " ".join("".join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+def city_id(plate: int) -> str:
+    return f"tr-{plate:02d}"
+
+def district_id(plate: int, name: str) -> str:
+    return f"{city_id(plate)}-{place_key(name).replace(' ', '-')}"
+
+class Gazetteer:
+    """Country, city and district names with their stable place ids.
+
+    Ids nest: "tr" is Türkiye, "tr-34" is İstanbul (by licence plate
+    code) and "tr-34-kadikoy" one of its districts, so a place id starts
+    with the id of every place containing it.
+    """
+
+    def __init__(self):
+        self.names: Dict[str, str] = {}
+        self.parents: Dict[str, Optional[str]] = {}
+        self._countries: Dict[str, str] = {}
+        self._cities: Dict[str, str] = {}
+        self._districts: Dict[str, List[str]] = {}
+        for code, (name, aliases) in COUNTRIES.items():
+            self._add(code, name, None)
+            for alias in [name] + aliases:
+                self._countries[place_key(alias)] = code
+        for plate, (name, aliases) in PROVINCES.items():
+            place = city_id(plate)
+            self._add(place, name, "tr")
+            for alias in [name] + aliases:
+                self._cities[place_key(alias)] = place
+        for plate, names in DISTRICTS.items():
+            for name in names:
+                place = district_id(plate, name)
+                self._add(place, name, city_id(plate))
+                self._districts.setdefault(place_key(name), []).append(place)
+
+    def _add(self, place: str, name: str, parent: Optional[str]):
+        self.names[place] = name
+        self.parents[place] = parent
+
+    def resolve_country(self, text: Optional[str]) -> Optional[str]:
+        return self._countries.get(place_key(text))
+
+    def resolve_city(self, text: Optional[str]) -> Optional[str]:
+        return self._cities.get(place_key(text))
+
+    def resolve_district(self, text: Optional[str], city: Optional[str] = None) -> Optional[str]:
+        """The district with this name, in city if given; None when unknown or ambiguous"""
+        candidates = self._districts.get(place_key(text), [])
+        if city is not None:
+            candidates = [place for place in candidates if self.parents[place] == city]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def lineage(self, place: Optional[str]) -> List[str]:
+        """The place id followed by the ids of the places containing it"""
+        ids = []
+        while place is not None:
+            ids.append(place)
+            place = self.parents.get(place)
+        return ids
+
+    def parse(self, location: Optional[str]) -> dict:
+        """Parse a free-text location into country_id, city_id and district_id (None where unknown).
+
+        Each comma-separated part is looked up whole and then word by
+        word. A district name found in several cities only counts once
+        the city is known.
+        """
+        countries, cities, districts = [], [], []
+
+        def match(key: str) -> bool:
+            if key in self._cities:
+                cities.append(self._cities[key])
+            elif key in self._districts:
+                districts.append(key)
+            elif key in self._countries:
+                countries.append(self._countries[key])
+            else:
+                return False
+            return True
+
+        for part in LOCATION_SEPARATORS.split(location or ""):
+            key = place_key(part)
+            if key and not match(key):
+                for word in key.split():
+                    match(word)
+        city = cities[0] if cities else None
+        district = None
+        for name in districts:
+            district = self.resolve_district(name, city)
+            if district is not None:
+                break
+        lineage = self.lineage(district or city)
+        if not lineage and countries:
+            lineage = [countries[0]]
+        lineage.reverse()
+        lineage += [None] * (3 - len(lineage))
+        return {"country_id": lineage[0], "city_id": lineage[1], "district_id": lineage[2]}
+
+gazetteer = Gazetteer()
+
+def get_gazetteer() -> Gazetteer:
+    return gazetteer
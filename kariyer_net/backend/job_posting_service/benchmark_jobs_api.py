@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import httpx
+import time
+
+# Run once against the service before a change and once after, e.g.
+#   python benchmark_jobs_api.py --base-url http://localhost:8000 --concurrency 50 --duration 10
+DEFAULT_BASE_URL = "http://job_posting_service:8000"
+
+async def run_endpoint(client: httpx.AsyncClient, path: str, concurrency: int, duration: float) -> dict:
+    """Hammer one endpoint with `concurrency` workers for `duration` seconds"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                resp = await client.get(path)
+                if resp.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0,
+    }
+
+async def main(base_url: str, concurrency: int, duration: float, city: str):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        resp = await client.get("/api/v1/jobs/", params={"limit": 1})
+        resp.raise_for_status()
+        jobs = resp.json()
+        if not jobs:
+            print("No jobs found; create some jobs before benchmarking.")
+            return
+        paths = [
+            "/api/v1/jobs/",
+            f"/api/v1/jobs/{jobs[0]['id']}",
+            f"/api/v1/jobs/home?city={city}",
+        ]
+        print(f"{'endpoint':40} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+        for path in paths:
+            result = await run_endpoint(client, path, concurrency, duration)
+            print(f"{result['path']:40} {result['rps']:10.1f} {result['p50_ms']:10.2f} {result['p99_ms']:10.2f} {result['errors']:8d}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Requests/sec benchmark for the job posting read endpoints")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--city", default="Istanbul")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.concurrency, args.duration, args.city))
@@ -0,0 +1,42 @@
+import json
+import redis
+from app.core.config import settings
+from app.services.job_index import JobIndex
+
+BATCH_SIZE = 500
+
+def rebuild_job_indexes():
+    """Drop the jobs:* index keys and rebuild them from the existing job:* keys"""
+    redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    job_index = JobIndex(redis_client)
+
+    # SCAN instead of KEYS so Redis keeps serving requests during the rebuild
+    stale_keys = list(redis_client.scan_iter("jobs:*", count=BATCH_SIZE))
+    for i in range(0, len(stale_keys), BATCH_SIZE):
+        redis_client.delete(*stale_keys[i:i + BATCH_SIZE])
+    print(f"Dropped {len(stale_keys)} index keys.")
+
+    indexed = 0
+    batch = []
+    for key in redis_client.scan_iter("job:*", count=BATCH_SIZE):
+        batch.append(key)
+        if len(batch) >= BATCH_SIZE:
+            indexed += _index_batch(redis_client, job_index, batch)
+            batch = []
+    if batch:
+        indexed += _index_batch(redis_client, job_index, batch)
+    print(f"Indexed {indexed} jobs.")
+
+def _index_batch(redis_client, job_index: JobIndex, keys) -> int:
+    pipe = redis_client.pipeline(transaction=False)
+    count = 0
+    for job_data in redis_client.mget(keys):
+        if not job_data:
+            continue
+        job_index.index_job(pipe, json.loads(job_data))
+        count += 1
+    pipe.execute()
+    return count
+
+if __name__ == "__main__":
+    rebuild_job_indexes()
@@ -0,0 +1,154 @@
+import heapq
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+class SpaceSaving:
+    """Space-Saving heavy-hitters sketch holding at most capacity counters.
+
+    A new item arriving when every counter is taken replaces the item with
+    the smallest count and inherits that count, so any item seen more than
+    total/capacity times is always tracked and no count is overestimated
+    by more than the count it inherited.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        # Lazy min-heap of (count, item); entries not matching counts are stale
+        self._heap: List[Tuple[int, str]] = []
+        self._sorted: Optional[List[Tuple[str, int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, item: str, count: int = 1):
+        if item not in self.counts and len(self.counts) >= self.capacity:
+            evicted, floor = self._pop_min()
+            del self.counts[evicted]
+            count += floor
+        self._set(item, self.counts.get(item, 0) + count)
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """The k largest (item, count) pairs, highest first"""
+        if self._sorted is None:
+            self._sorted = sorted(self.counts.items(), key=lambda pair: (-pair[1], pair[0]))
+        return self._sorted[:k]
+
+    @staticmethod
+    def merge(sketches: List["SpaceSaving"], capacity: int) -> "SpaceSaving":
+        """Sum the counters of several sketches, keeping the capacity largest.
+
+        An item missing from a sketch scores 0 there, although it may have
+        been seen up to that sketch's smallest count before being evicted,
+        so each merged count is within sum(total_i / capacity) of the true
+        count in both directions.
+        """
+        totals: Dict[str, int] = {}
+        for sketch in sketches:
+            for item, count in sketch.counts.items():
+                totals[item] = totals.get(item, 0) + count
+        merged = SpaceSaving(capacity)
+        for item, count in heapq.nlargest(capacity, totals.items(), key=lambda pair: (pair[1], pair[0])):
+            merged._set(item, count)
+        return merged
+
+    def _set(self, item: str, count: int):
+        self.counts[item] = count
+        self._sorted = None
+        heapq.heappush(self._heap, (count, item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, item) for item, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[str, int]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item, count
+
+class WindowBucket:
+    """Searches seen in one time slice of a window"""
+
+    def __init__(self, bucket_id: int, capacity: int):
+        self.bucket_id = bucket_id
+        self.keywords = SpaceSaving(capacity)
+        self.locations = SpaceSaving(capacity)
+        self.searches = 0
+        self.results = 0
+
+class SearchWindow:
+    """Popular keywords and locations over a sliding window of span seconds.
+
+    The window is split into buckets with a sketch each. Recording only
+    touches the current bucket, and a bucket sliding out of the window is
+    simply dropped. Reads merge the live buckets' sketches and cache the
+    result until the next change, so every count stays within
+    searches / capacity of the exact count over the window.
+    """
+
+    def __init__(self, span: int, buckets: int, capacity: int):
+        self.bucket_seconds = span / buckets
+        self.buckets = buckets
+        self.capacity = capacity
+        self._buckets: Deque[WindowBucket] = deque()
+        self._latest = 0
+        self._merged: Dict[str, SpaceSaving] = {}
+
+    @property
+    def searches(self) -> int:
+        return sum(bucket.searches for bucket in self._buckets)
+
+    @property
+    def results(self) -> int:
+        return sum(bucket.results for bucket in self._buckets)
+
+    @property
+    def keywords(self) -> SpaceSaving:
+        return self._merge("keywords")
+
+    @property
+    def locations(self) -> SpaceSaving:
+        return self._merge("locations")
+
+    def record(self, keyword: Optional[str], location: Optional[str], results: int, timestamp: float):
+        bucket_id = int(timestamp // self.bucket_seconds)
+        self._latest = max(self._latest, bucket_id)
+        self.expire(self._latest)
+        if bucket_id <= self._latest - self.buckets:
+            return
+        bucket = self._bucket(bucket_id)
+        bucket.searches += 1
+        bucket.results += results
+        if keyword:
+            bucket.keywords.add(keyword)
+            self._merged.pop("keywords", None)
+        if location:
+            bucket.locations.add(location)
+            self._merged.pop("locations", None)
+
+    def expire(self, latest_bucket_id: int):
+        """Drop every bucket older than the window ending at latest_bucket_id"""
+        while self._buckets and self._buckets[0].bucket_id <= latest_bucket_id - self.buckets:
+            self._buckets.popleft()
+            self._merged.clear()
+
+    def _merge(self, name: str) -> SpaceSaving:
+        merged = self._merged.get(name)
+        if merged is None:
+            sketches = [getattr(bucket, name) for bucket in self._buckets]
+            merged = self._merged[name] = SpaceSaving.merge(sketches, self.capacity)
+        return merged
+
+    def _bucket(self, bucket_id: int) -> WindowBucket:
+        # Records arrive in time order except while history is replayed at startup
+        for position in range(len(self._buckets) - 1, -1, -1):
+            existing = self._buckets[position]
+            if existing.bucket_id == bucket_id:
+                return existing
+            if existing.bucket_id < bucket_id:
+                bucket = WindowBucket(bucket_id, self.capacity)
+                self._buckets.insert(position + 1, bucket)
+                return bucket
+        bucket = WindowBucket(bucket_id, self.capacity)
+        self._buckets.appendleft(bucket)
+        return bucket
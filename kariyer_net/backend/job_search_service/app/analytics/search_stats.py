@@ -0,0 +1,53 @@
+import time
+from typing import Dict, List, Optional
+from ..core.config import settings
+from ..index.suggestions import normalize_phrase
+from .heavy_hitters import SearchWindow
+
+# Window name -> (span in seconds, buckets)
+WINDOWS = {
+    "hour": (3600, 12),
+    "day": (24 * 3600, 24),
+    "week": (7 * 24 * 3600, 28),
+}
+
+class SearchStats:
+    """Popular searches, locations and totals over the last hour, day and week.
+
+    Fed from the /search stream of this instance, so memory stays bounded
+    by the sketch capacity and reads never touch search_history.
+    """
+
+    def __init__(self, capacity: int = settings.ANALYTICS_SKETCH_CAPACITY):
+        self.windows: Dict[str, SearchWindow] = {
+            name: SearchWindow(span, buckets, capacity) for name, (span, buckets) in WINDOWS.items()
+        }
+
+    def record(self, query: Optional[str], location: Optional[str], results: int,
+               timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        keyword = normalize_phrase(query)
+        location = normalize_phrase(location)
+        for window in self.windows.values():
+            window.record(keyword, location, results, timestamp)
+
+    def summary(self, window_name: str = "day", limit: int = 10) -> dict:
+        window = self.windows[window_name]
+        window.expire(int(time.time() // window.bucket_seconds))
+        keywords = window.keywords.top(limit)
+        return {
+            "window": window_name,
+            "total_searches": window.searches,
+            "average_results": round(window.results / window.searches, 2) if window.searches else 0.0,
+            "popular_keywords": [keyword for keyword, _ in keywords],
+            "popular_locations": [location for location, _ in window.locations.top(limit)],
+            "search_trends": dict(keywords),
+        }
+
+    def popular_keywords(self, window_name: str = "day", limit: int = 10) -> List[str]:
+        return self.summary(window_name, limit)["popular_keywords"]
+
+search_stats = SearchStats()
+
+def get_search_stats() -> SearchStats:
+    return search_stats
@@ -1,23 +1,71 @@
-from fastapi import APIRouter, Depends
-from typing import List
-from sqlalchemy.orm import Session
-from ....core.database import get_database
-from ....services.search_service import SearchService
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+from ....services.search_service import CatalogNotReadyError, SearchService
+from ....dto.search_dto import SearchDTO
 
 router = APIRouter()
 
-@router.get("/filters/cities")
+def search_filters(
+    query: str = Query(""),
+    location: Optional[str] = None,
+    work_mode: Optional[str] = None,
+    date_filter: Optional[str] = None,
+    country: Optional[str] = None,
+    city: Optional[str] = None,
+    district: Optional[str] = None,
+    company: Optional[str] = None,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+) -> SearchDTO:
+    """The same filters /search takes, so facets describe the search being shown"""
+    return SearchDTO(
+        query=query,
+        location=location,
+        work_mode=work_mode,
+        date_filter=date_filter,
+        country=country,
+        city=city,
+        district=district,
+        company=company,
+        salary_min=salary_min,
+        salary_max=salary_max,
+    )
+
+async def facet_counts(search_service: SearchService, search_dto: SearchDTO, limit: int) -> dict:
+    try:
+        return await search_service.get_facets(search_dto, limit)
+    except CatalogNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+
+@router.get("/", response_model=dict)
+async def get_filters(
+    search_dto: SearchDTO = Depends(search_filters),
+    limit: int = Query(10, ge=1, le=100),
+    search_service: SearchService = Depends()
+):
+    """Get the matching job counts per city, company, work mode, date filter and salary range"""
+    return await facet_counts(search_service, search_dto, limit)
+
+@router.get("/cities", response_model=dict)
 async def get_cities(
-    db = Depends(get_database),
+    search_dto: SearchDTO = Depends(search_filters),
+    limit: int = Query(10, ge=1, le=100),
     search_service: SearchService = Depends()
 ):
-    """Get available cities for filtering"""
-    return {"message": "Get cities endpoint - to be implemented"}
+    """Get available cities for filtering, with the number of matching jobs in each"""
+    facets = await facet_counts(search_service, search_dto, limit)
+    return {"cities": facets["cities"], "total": facets["total"]}
 
-@router.get("/filters/companies")
+@router.get("/companies", response_model=dict)
 async def get_companies(
-    db = Depends(get_database),
+    search_dto: SearchDTO = Depends(search_filters),
+    limit: int = Query(10, ge=1, le=100),
     search_service: SearchService = Depends()
 ):
-    """Get available companies for filtering"""
-    return {"message": "Get companies endpoint - to be implemented"} 
\ No newline at end of file
+    """Get available companies for filtering, with the number of matching jobs at each"""
+    facets = await facet_counts(search_service, search_dto, limit)
+    return {"companies": facets["companies"], "total": facets["total"]}
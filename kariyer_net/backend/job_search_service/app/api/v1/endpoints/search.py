@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from motor.motor_asyncio import AsyncIOMotorClient
-from ....services.search_service import SearchService
+from ....core.config import settings
+from ....services.search_service import CatalogNotReadyError, SearchService
 from ....dto.search_dto import SearchDTO
+from ....index.suggestions import TOP_K as SUGGESTION_TOP_K
+from ....utils.cursor import InvalidCursorError
+from ....utils.deadline import PARTIAL_HEADER, Deadline, get_deadline_metrics
 from typing import List, Optional
 
 router = APIRouter()
@@ -13,6 +17,7 @@ def get_mongo_client():
 
 @router.get("/search", response_model=dict)
 async def search_jobs(
+    http_response: Response,
     query: str = Query(""),
     location: Optional[str] = None,
     work_mode: Optional[str] = None,
@@ -20,15 +25,35 @@ async def search_jobs(
     country: Optional[str] = None,
     city: Optional[str] = None,
     district: Optional[str] = None,
+    company: Optional[str] = None,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+    sort_by: str = Query("relevance", pattern="^(relevance|date|salary)$"),
     user_id: Optional[int] = None,
     page: int = 1,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    facets: bool = False,
+    x_deadline_ms: Optional[str] = Header(None),
     db: AsyncIOMotorClient = Depends(get_mongo_client),
     search_service: SearchService = Depends()
 ):
-    """Search for jobs with comprehensive filtering and pagination support."""
-    print(f"[DEBUG] /search called with: query={query}, location={location}, work_mode={work_mode}, date_filter={date_filter}, country={country}, city={city}, district={district}, user_id={user_id}, page={page}, limit={limit}")
-    skip = (page - 1) * limit
+    """Search for jobs with comprehensive filtering and pagination support.
+
+    Every page carries next_cursor; passing it back as cursor continues
+    right behind that page (page is then ignored) and stays stable while
+    jobs are added. next_cursor is null on the last page. A query that
+    finds (almost) nothing is retried with typos tolerated; corrected_query
+    then shows what it was read as, and is null otherwise. With facets the
+    response also counts the matches per city, company, work mode and
+    date filter, like GET /filters/.
+
+    The search gets the budget in the X-Deadline-Ms header (else
+    SEARCH_DEADLINE seconds). Running out of it returns what is ready with
+    partial true, naming the skipped stages in X-Partial-Results.
+    """
+    print(f"[DEBUG] /search called with: query={query}, location={location}, work_mode={work_mode}, date_filter={date_filter}, country={country}, city={city}, district={district}, sort_by={sort_by}, user_id={user_id}, page={page}, limit={limit}")
+    skip = 0 if cursor else (page - 1) * limit
     
     # Build search DTO with all filters
     search_dto = SearchDTO(
@@ -38,32 +63,76 @@ async def search_jobs(
         date_filter=date_filter,
         country=country,
         city=city,
-        district=district
+        district=district,
+        company=company,
+        salary_min=salary_min,
+        salary_max=salary_max,
+        sort_by=sort_by
     )
     
-    results = await search_service.search_jobs(db, search_dto, skip=skip, limit=limit)
-    total_results = await search_service.get_total_count(db, search_dto)
+    deadline = Deadline.from_header(x_deadline_ms, settings.SEARCH_DEADLINE)
+    try:
+        result = await search_service.execute_search(
+            db, search_dto, skip=skip, limit=limit, cursor=cursor, deadline=deadline
+        )
+        facet_counts = await search_service.get_facets(search_dto, deadline=deadline) if facets else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except CatalogNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    results = result["jobs"]
+    total_results = result["total_results"]
+    # A capped total is a lower bound, and so is total_pages; pages past it still work
     total_pages = (total_results + limit - 1) // limit
     
+    # Later pages of the same search are not new searches
+    if page == 1 and not cursor:
+        search_service.record_search(search_dto, total_results)
+    
     if user_id is not None:
         print(f"[DEBUG] Calling save_search_history for user_id={user_id} with query={query}")
-        await search_service.save_search_history(db, user_id, search_dto, results_count=len(results))
+        await search_service.save_search_history(db, user_id, search_dto, results_count=total_results)
     
-    return {
+    response = {
         "jobs": results,
         "total_results": total_results,
+        "total_results_label": f"{total_results}+" if result["total_is_capped"] else str(total_results),
+        "total_is_capped": result["total_is_capped"],
         "total_pages": total_pages,
         "current_page": page,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": result["next_cursor"],
+        "corrected_query": result.get("corrected_query"),
+        "partial": deadline.partial
     }
+    if facet_counts is not None:
+        response["facets"] = facet_counts
+    get_deadline_metrics().record(deadline)
+    if deadline.partial:
+        http_response.headers[PARTIAL_HEADER] = ",".join(deadline.skipped)
+    return response
 
 @router.get("/search/suggestions", response_model=List[str])
 async def autocomplete(
     query: str = Query(...),
+    limit: int = Query(10, ge=1, le=SUGGESTION_TOP_K),
     search_service: SearchService = Depends()
 ):
     """Get autocomplete suggestions for job search"""
-    return await search_service.get_search_suggestions(query)
+    return await search_service.get_search_suggestions(query, limit=limit)
+
+@router.get("/search/analytics", response_model=dict)
+async def search_analytics(
+    window: str = Query("day", pattern="^(hour|day|week)$"),
+    limit: int = Query(10, ge=1, le=50),
+    search_service: SearchService = Depends()
+):
+    """Get search totals and the most popular queries and locations of a window"""
+    return await search_service.get_search_analytics(window, limit)
 
 @router.get("/search/history", response_model=List[dict])
 async def recent_searches(
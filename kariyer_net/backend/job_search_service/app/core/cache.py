@@ -1,7 +1,19 @@
-import redis
+import redis.asyncio as redis
 from .config import settings
 
-redis_client = redis.Redis.from_url(settings.REDIS_URL)
+# One connection pool per process, shared by every request
+redis_pool = redis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    socket_connect_timeout=1.0,
+    socket_timeout=1.0,
+    decode_responses=True
+)
+redis_client = redis.Redis(connection_pool=redis_pool)
 
 def get_cache():
-    return redis_client 
\ No newline at end of file
+    return redis_client
+
+async def close_cache():
+    await redis_client.aclose()
+    await redis_pool.disconnect()
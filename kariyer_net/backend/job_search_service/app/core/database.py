@@ -1,5 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 from .config import settings
+from .history_writer import history_writer
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -12,14 +15,59 @@ async def get_database() -> AsyncIOMotorClient:
 async def connect_to_mongo():
     db.client = AsyncIOMotorClient(settings.MONGODB_URL)
     print("Connected to MongoDB.")
-    # Ensure text index exists for search functionality
     try:
-        await db.client.job_search.search_history.create_index([("job_name", "text")])
-        print("Ensured text index on 'job_name' in 'search_history' collection.")
+        await ensure_search_history_schema(db.client.job_search)
     except Exception as e:
         print(f"Index creation failed: {e}")
+    history_writer.start(db.client.job_search)
+
+async def ensure_search_history_schema(database):
+    """Create the search history indexes and fill recent_searches on first run.
+
+    search_history keeps one document per search:
+      - (user_id, created_at desc) serves a user's history newest first
+      - a TTL index on created_at deletes searches after the retention period
+      - the text index on job_name is kept for text queries
+    recent_searches keeps one document per user (_id = user_id) with their
+    newest RECENT_SEARCHES_PER_USER searches, maintained with $push/$slice,
+    and expires once the user has not searched for the retention period.
+    """
+    retention = settings.SEARCH_HISTORY_RETENTION_DAYS * 24 * 3600
+    history = database.search_history
+    await history.create_index([("job_name", "text")])
+    await history.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_created_at")
+    await ensure_ttl_index(database, "search_history", "created_at", retention)
+    await ensure_ttl_index(database, "recent_searches", "updated_at", retention)
+    print("Ensured search_history and recent_searches indexes.")
+
+    if await database.recent_searches.estimated_document_count() == 0:
+        # Built server-side from the history that predates recent_searches
+        await history.aggregate([
+            {"$sort": {"user_id": 1, "created_at": -1}},
+            {"$group": {
+                "_id": "$user_id",
+                "searches": {"$push": {
+                    "_id": "$_id", "job_name": "$job_name", "location": "$location",
+                    "results_count": "$results_count", "created_at": "$created_at",
+                }},
+                "updated_at": {"$first": "$created_at"},
+            }},
+            {"$project": {"searches": {"$slice": ["$searches", settings.RECENT_SEARCHES_PER_USER]}, "updated_at": 1}},
+            {"$merge": {"into": "recent_searches", "whenMatched": "keepExisting", "whenNotMatched": "insert"}},
+        ]).to_list(length=None)
+        print("Filled recent_searches from search_history.")
+
+async def ensure_ttl_index(database, collection: str, field: str, expire_after: int):
+    """Create a TTL index, or change its expiry if it exists with another one"""
+    name = f"{field}_ttl"
+    try:
+        await database[collection].create_index(field, name=name, expireAfterSeconds=expire_after)
+    except OperationFailure:
+        await database.command("collMod", collection, index={"name": name, "expireAfterSeconds": expire_after})
 
 async def close_mongo_connection():
+    # Write out buffered search history while the client is still open
+    await history_writer.close()
     if db.client:
         db.client.close()
         print("Disconnected from MongoDB.") 
\ No newline at end of file
@@ -0,0 +1,179 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from .config import settings
+
+DUPLICATE_KEY_ERROR = 11000
+
+class SearchHistoryWriter:
+    """Write-behind buffer for search_history inserts.
+
+    Searches append their record and return; a background task writes the
+    buffer with unordered insert_many once HISTORY_FLUSH_BATCH_SIZE records
+    are waiting or HISTORY_FLUSH_INTERVAL seconds after the first one. The
+    buffer holds at most HISTORY_BUFFER_MAX_SIZE records: a full buffer
+    makes writers wait up to HISTORY_BUFFER_PUT_TIMEOUT for room, after
+    which the record is dropped. close() writes out whatever is left.
+
+    insert_many assigns each record its _id, so retrying a batch that was
+    partly written only hits duplicate key errors for the written part.
+    Written records are then pushed to their users' recent_searches
+    documents, one update per user and batch.
+    """
+
+    def __init__(self):
+        self._pending: Deque[dict] = deque()
+        self._inflight: List[dict] = []
+        self._history = None
+        self._recent = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, database):
+        self._history = database.search_history
+        self._recent = database.recent_searches
+        self._changed = asyncio.Condition()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def write(self, record: dict) -> bool:
+        """Buffer a record, returning False if it was dropped because the buffer stayed full"""
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: len(self._pending) < settings.HISTORY_BUFFER_MAX_SIZE),
+                    settings.HISTORY_BUFFER_PUT_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                print(f"[SearchHistoryWriter] Buffer full, dropped a record ({self.dropped} so far)")
+                return False
+            self._pending.append(record)
+            self._changed.notify_all()
+        return True
+
+    async def discard_user(self, user_id: int):
+        """Forget a user's buffered records and wait for any batch being written"""
+        self._pending = deque(record for record in self._pending if record.get("user_id") != user_id)
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def close(self):
+        """Stop the background task and write out every buffered record"""
+        if self._task is None:
+            return
+        # Cancelling the task clears _inflight, and that batch may not have been written yet
+        inflight = self._inflight
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        remaining = inflight + list(self._pending)
+        self._pending.clear()
+        batch_size = settings.HISTORY_FLUSH_BATCH_SIZE
+        for start in range(0, len(remaining), batch_size):
+            await self._flush(remaining[start:start + batch_size])
+        print(f"[SearchHistoryWriter] Drained: {self.written} records written, {self.dropped} dropped")
+
+    async def _run(self):
+        batch_size = settings.HISTORY_FLUSH_BATCH_SIZE
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self._pending)
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: len(self._pending) >= batch_size),
+                        settings.HISTORY_FLUSH_INTERVAL,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                batch = [self._pending.popleft() for _ in range(min(batch_size, len(self._pending)))]
+                self._changed.notify_all()
+            self._inflight = batch
+            self._idle.clear()
+            try:
+                await self._flush(batch)
+            finally:
+                self._inflight = []
+                self._idle.set()
+
+    async def _flush(self, batch: List[dict]):
+        written = await self._insert(batch)
+        if not written:
+            return
+        try:
+            await self._recent.bulk_write(recent_searches_updates(written), ordered=False)
+        except Exception as e:
+            print(f"[SearchHistoryWriter] Failed to update recent searches: {e}")
+
+    async def _insert(self, batch: List[dict]) -> List[dict]:
+        """insert_many with retries, returning the records this call wrote"""
+        attempts = settings.HISTORY_FLUSH_RETRIES + 1
+        written = []
+        for attempt in range(1, attempts + 1):
+            try:
+                await self._history.insert_many(batch, ordered=False)
+                self.written += len(batch)
+                return written + batch
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                codes = {error["index"]: error.get("code") for error in errors}
+                # Duplicates were written by an earlier attempt and are already counted
+                written += [record for position, record in enumerate(batch) if position not in codes]
+                self.written += len(batch) - len(codes)
+                batch = [
+                    record for position, record in enumerate(batch)
+                    if codes.get(position, DUPLICATE_KEY_ERROR) != DUPLICATE_KEY_ERROR
+                ]
+                if not batch:
+                    return written
+                print(f"[SearchHistoryWriter] {len(batch)} records failed (attempt {attempt}/{attempts}): {errors[0]}")
+            except Exception as e:
+                print(f"[SearchHistoryWriter] Batch of {len(batch)} failed (attempt {attempt}/{attempts}): {e}")
+            if attempt < attempts:
+                await asyncio.sleep(attempt)
+        self.dropped += len(batch)
+        print(f"[SearchHistoryWriter] Gave up on {len(batch)} records")
+        return written
+
+def recent_search_entry(record: dict) -> dict:
+    return {key: record.get(key) for key in ("_id", "job_name", "location", "results_count", "created_at")}
+
+def recent_searches_updates(records: List[dict]) -> List[UpdateOne]:
+    """One $push per user putting their new searches first and capping the list"""
+    by_user: Dict[int, List[dict]] = {}
+    for record in records:
+        by_user.setdefault(record["user_id"], []).append(record)
+    updates = []
+    for user_id, user_records in by_user.items():
+        user_records.sort(key=lambda record: record["created_at"], reverse=True)
+        updates.append(UpdateOne(
+            {"_id": user_id},
+            {
+                "$push": {"searches": {
+                    "$each": [recent_search_entry(record) for record in user_records],
+                    "$position": 0,
+                    "$slice": settings.RECENT_SEARCHES_PER_USER,
+                }},
+                "$max": {"updated_at": user_records[0]["created_at"]},
+            },
+            upsert=True,
+        ))
+    return updates
+
+history_writer = SearchHistoryWriter()
+
+def get_history_writer() -> SearchHistoryWriter:
+    return history_writer
@@ -9,9 +9,11 @@ class SearchDTO(BaseModel):
     country: Optional[str] = None
     city: Optional[str] = None
     district: Optional[str] = None
+    company: Optional[str] = None
     job_type: Optional[List[str]] = None
     salary_min: Optional[int] = None
     salary_max: Optional[int] = None
+    sort_by: Optional[str] = None  # relevance (default), date, salary
     page: int = 1
     limit: int = 10
 
@@ -32,12 +34,16 @@ class SearchDTO(BaseModel):
             params["city"] = self.city
         if self.district:
             params["district"] = self.district
+        if self.company:
+            params["company"] = self.company
         if self.job_type:
             params["job_type"] = self.job_type
         if self.salary_min:
             params["salary_min"] = self.salary_min
         if self.salary_max:
             params["salary_max"] = self.salary_max
+        if self.sort_by:
+            params["sort_by"] = self.sort_by
         params["page"] = self.page
         params["limit"] = self.limit
         return params 
\ No newline at end of file
@@ -0,0 +1 @@
+# Index package
\ No newline at end of file
@@ -0,0 +1,75 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional, Set
+
+GRAM = 3
+
+class Categories:
+    """Dictionary encoding for a column: each distinct value gets a small int code"""
+
+    def __init__(self):
+        self.values: List = []
+        # How each value is shown, taken from the first raw value with that code
+        self.labels: List[str] = []
+        self._codes: Dict = {}
+
+    def code(self, value, label: Optional[str] = None) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            self.labels.append(value if label is None else label)
+        return code
+
+    def lookup(self, predicate: Callable) -> np.ndarray:
+        """Boolean table indexed by code, so table[codes] is the mask of a whole column"""
+        return np.fromiter((predicate(value) for value in self.values), dtype=bool, count=len(self.values))
+
+    def state(self) -> dict:
+        """The values and labels, as written to a snapshot"""
+        return {"values": self.values, "labels": self.labels}
+
+    def restore(self, state: dict):
+        """Code the values of a snapshot in their saved order, so codes in restored columns still match"""
+        for value, label in zip(state["values"], state["labels"]):
+            self.code(value, label)
+
+class TextCategories(Categories):
+    """Categories over folded text with a trigram index for substring lookups.
+
+    Each distinct value is posted under every trigram it contains. A
+    needle of three or more characters can only occur in values holding
+    all of its trigrams, so the smallest posting lists are intersected
+    and only those candidates are checked with `in`. Shorter needles
+    have no trigram and fall back to checking every distinct value.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._grams: Dict[str, Set[int]] = {}
+
+    def code(self, value: str, label: Optional[str] = None) -> int:
+        size = len(self.values)
+        code = super().code(value, label)
+        if code == size:
+            for gram in _trigrams(value):
+                self._grams.setdefault(gram, set()).add(code)
+        return code
+
+    def containing(self, needle: str) -> np.ndarray:
+        """Boolean table indexed by code: True where the value contains needle"""
+        if len(needle) < GRAM:
+            return self.lookup(lambda value: needle in value)
+        postings = sorted((self._grams.get(gram, set()) for gram in _trigrams(needle)), key=len)
+        candidates = set(postings[0])
+        for codes in postings[1:]:
+            if not candidates:
+                break
+            candidates &= codes
+        table = np.zeros(len(self.values), dtype=bool)
+        for code in candidates:
+            if needle in self.values[code]:
+                table[code] = True
+        return table
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
@@ -0,0 +1,53 @@
+import json
+import numpy as np
+from typing import Dict, Iterator, Optional
+
+class DocumentStore:
+    """The job dicts of the index by row slot, used like a list.
+
+    Restored from a snapshot, documents stay JSON-encoded in the mapped
+    file (one blob plus an offsets array) and are only decoded when read,
+    so startup does not parse the whole catalog. Documents stored since
+    are kept as dicts; None marks a free slot.
+    """
+
+    def __init__(self, blob=b"", offsets: Optional[np.ndarray] = None):
+        self._blob = blob
+        self._offsets = np.zeros(1, dtype=np.int64) if offsets is None else offsets
+        self._stored: Dict[int, Optional[dict]] = {}
+        self._size = len(self._offsets) - 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, slot: int) -> Optional[dict]:
+        if slot in self._stored:
+            return self._stored[slot]
+        encoded = self.encoded(slot)
+        return json.loads(encoded) if encoded else None
+
+    def __setitem__(self, slot: int, document: Optional[dict]):
+        self._stored[slot] = document
+
+    def append(self, document: Optional[dict]):
+        self._stored[self._size] = document
+        self._size += 1
+
+    def encoded(self, slot: int) -> bytes:
+        """The document in slot as UTF-8 JSON, b"" for a free slot"""
+        if slot in self._stored:
+            document = self._stored[slot]
+            return b"" if document is None else json.dumps(document, ensure_ascii=False).encode()
+        if slot + 1 >= len(self._offsets):
+            return b""
+        return bytes(self._blob[int(self._offsets[slot]):int(self._offsets[slot + 1])])
+
+    def frozen(self) -> "DocumentStore":
+        """A copy unaffected by later stores, sharing the mapped documents"""
+        copy = DocumentStore(self._blob, self._offsets)
+        copy._stored = dict(self._stored)
+        copy._size = self._size
+        return copy
+
+    def __iter__(self) -> Iterator[Optional[dict]]:
+        return (self[slot] for slot in range(self._size))
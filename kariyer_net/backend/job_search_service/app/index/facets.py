@@ -0,0 +1,46 @@
+import numpy as np
+from typing import Dict, List, Optional
+from ..utils.gazetteer import get_gazetteer
+
+# The date_filter values counted per search, besides "all"
+DATE_BUCKETS = ("3hours", "8hours", "today")
+
+# Facet name -> (filter it ignores, code column, categories attribute)
+FACETS = {
+    "cities": ("location", "_city_code", "_cities"),
+    "companies": ("company", "_company_code", "_companies"),
+    "work_modes": ("work_mode", "_work_mode_code", "_work_modes"),
+}
+
+def city_of(location: Optional[str], places: List[str]) -> str:
+    """The gazetteer name of a job's city, else the first part of its location ("Berlin, Germany")"""
+    # places run district, city, country, so the city is second to last
+    if len(places) >= 2:
+        return get_gazetteer().names[places[-2]]
+    return " ".join((location or "").split(",")[0].split())
+
+def top_counts(counts: np.ndarray, labels: List[str], limit: int) -> List[dict]:
+    """The limit codes with the largest nonzero counts as value/count pairs, biggest first"""
+    codes = np.flatnonzero(counts)
+    if 0 < limit < len(codes):
+        codes = codes[np.argpartition(-counts[codes], limit - 1)[:limit]]
+    top = sorted(codes.tolist(), key=lambda code: (-counts[code], labels[code]))[:max(limit, 0)]
+    return [{"value": labels[code], "count": int(counts[code])} for code in top if labels[code]]
+
+def merge_facet_counts(parts: List[dict], limit: int = 10) -> dict:
+    """Add up the JobIndex.facet_counts of several indexes into what facets returns for their union"""
+    result = {"total": sum(part["total"] for part in parts)}
+    for facet in FACETS:
+        merged: Dict = {}
+        for part in parts:
+            for value, (label, count) in part[facet].items():
+                merged.setdefault(value, [label, 0])[1] += count
+        labels = [label for label, _ in merged.values()]
+        counts = np.array([count for _, count in merged.values()], dtype=np.int64)
+        result[facet] = top_counts(counts, labels, limit)
+    result["date_buckets"] = {
+        bucket: sum(part["date_buckets"][bucket] for part in parts) for bucket in ("all",) + DATE_BUCKETS
+    }
+    result["salary_ranges"] = [dict(buckets[0], count=sum(bucket["count"] for bucket in buckets))
+                               for buckets in zip(*(part["salary_ranges"] for part in parts))]
+    return result
@@ -0,0 +1,147 @@
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+from .ranking import TOKEN_PATTERN, tokenize
+
+# Edits allowed between a query term and a title word, by term length:
+# short terms would match too many unrelated words
+MAX_EDIT_DISTANCE = 2
+EXACT_BELOW_LENGTH = 4
+ONE_EDIT_BELOW_LENGTH = 6
+# Title words a single query term may expand into
+MAX_EXPANSIONS = 5
+
+def ascii_fold(word: str) -> str:
+    """Drop diacritics from a folded word ("mühendis" -> "muhendis")"""
+    decomposed = unicodedata.normalize("NFKD", word)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def allowed_distance(term: str) -> int:
+    if len(term) < EXACT_BELOW_LENGTH:
+        return 0
+    if len(term) < ONE_EDIT_BELOW_LENGTH:
+        return 1
+    return MAX_EDIT_DISTANCE
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """Every string made by removing up to distance characters from word, word included"""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        found |= frontier
+    return found
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent swaps count once), or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class TitleVocabulary:
+    """Typo lookup over the words of the indexed job titles, SymSpell style.
+
+    Words are keyed by their ASCII fold, and every key is also stored
+    under each string left after deleting up to MAX_EDIT_DISTANCE of its
+    characters. A misspelled term and the word it was meant as then share
+    a delete, so candidates come from a few dict lookups and only those
+    are checked with a real edit distance. Each word keeps the title codes
+    it occurs in, so expanded terms map straight to a title table.
+
+    A vocabulary restored from a snapshot builds its deletes on the first
+    lookup instead of at startup.
+    """
+
+    def __init__(self):
+        self._words: Dict[str, Set[str]] = {}
+        self._deletes: Optional[Dict[str, Set[str]]] = {}
+        self._titles: Dict[str, Set[int]] = {}
+        self._display: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add_title(self, code: int, title: Optional[str]):
+        """Index the words of a newly coded title"""
+        words = tokenize(title)
+        # "İ".lower() would add a combining dot
+        raw = [word.replace("İ", "i").lower() for word in TOKEN_PATTERN.findall(title or "")]
+        # The title as written names the correction shown to the user, where the words line up
+        display = raw if len(raw) == len(words) else words
+        for word, shown in zip(words, display):
+            self._titles.setdefault(word, set()).add(code)
+            self._display.setdefault(word, shown)
+            key = ascii_fold(word)
+            if key not in self._words and self._deletes is not None:
+                for deleted in deletes(key, MAX_EDIT_DISTANCE):
+                    self._deletes.setdefault(deleted, set()).add(key)
+            self._words.setdefault(key, set()).add(word)
+
+    def expand(self, term: str) -> List[str]:
+        """Title words within the allowed edit distance of term, closest and most common first"""
+        key = ascii_fold(term)
+        limit = allowed_distance(key)
+        candidates: Set[str] = set()
+        index = self._delete_index()
+        for deleted in deletes(key, limit):
+            candidates |= index.get(deleted, set())
+        ranked: List[Tuple[int, int, str]] = []
+        for candidate in candidates:
+            distance = edit_distance(key, candidate, limit)
+            if distance <= limit:
+                for word in self._words[candidate]:
+                    ranked.append((distance, -len(self._titles[word]), word))
+        ranked.sort()
+        return [word for _, _, word in ranked[:MAX_EXPANSIONS]]
+
+    def expand_query(self, query: Optional[str]) -> Optional[List[List[str]]]:
+        """The expansions of every query term, or None if some term has none"""
+        expansions = [self.expand(term) for term in tokenize(query)]
+        if not expansions or not all(expansions):
+            return None
+        return expansions
+
+    def title_codes(self, words: List[str]) -> Set[int]:
+        """Codes of the titles containing any of words"""
+        codes: Set[int] = set()
+        for word in words:
+            codes |= self._titles.get(word, set())
+        return codes
+
+    def display(self, word: str) -> str:
+        return self._display.get(word, word)
+
+    def save(self, writer):
+        writer.json("vocabulary", {
+            "titles": {word: sorted(codes) for word, codes in self._titles.items()},
+            "display": self._display,
+        })
+
+    def restore(self, reader):
+        """Take over the words of a snapshot written by save"""
+        saved = reader.json("vocabulary")
+        self._titles = {word: set(codes) for word, codes in saved["titles"].items()}
+        self._display = saved["display"]
+        self._words = {}
+        for word in self._titles:
+            self._words.setdefault(ascii_fold(word), set()).add(word)
+        self._deletes = None
+
+    def _delete_index(self) -> Dict[str, Set[str]]:
+        if self._deletes is None:
+            self._deletes = {}
+            for key in self._words:
+                for deleted in deletes(key, MAX_EDIT_DISTANCE):
+                    self._deletes.setdefault(deleted, set()).add(key)
+        return self._deletes
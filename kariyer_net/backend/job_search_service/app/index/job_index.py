@@ -0,0 +1,539 @@
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..dto.search_dto import SearchDTO
+from ..utils.deadline import Deadline
+from ..utils.search_utils import fold_text, job_places, location_filters, parse_job_date
+from .categories import Categories, TextCategories
+from .documents import DocumentStore
+from .facets import DATE_BUCKETS, FACETS, city_of, top_counts
+from .fuzzy import TitleVocabulary
+from .place_index import PlaceIndex
+from .ranking import BM25Scorer, SortOrder, cursor_field, cursor_statistics, recency_boost, top_k
+from .ranking import FUZZY_FALLBACK_BELOW, page_position, ranking_skipped, sort_plan, wants_fuzzy
+from .salary import MISSING, salary_bounds, salary_histogram, salary_key, salary_low_key, salary_mask
+from .snapshot import SnapshotReader, SnapshotWriter
+
+INITIAL_CAPACITY = 1024
+# Rows counted at a time when a count cap may end counting early
+COUNT_CHUNK = 65536
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Below every real created_at, and still safe to negate
+UNDATED_KEY = np.iinfo(np.int64).min + 1
+
+# Column name -> (dtype, fill value of unused rows)
+COLUMNS = {
+    "_ids": (np.int64, 0),
+    "_alive": (bool, False),
+    "_title_code": (np.int32, 0),
+    "_location_code": (np.int32, 0),
+    "_city_code": (np.int32, 0),
+    "_company_code": (np.int32, 0),
+    "_work_mode_code": (np.int32, 0),
+    "_salary_min": (np.int64, MISSING),
+    "_salary_max": (np.int64, MISSING),
+    "_dated": (bool, False),
+    "_created_at": (np.int64, 0),
+    "_created_day": (np.int64, 0),
+    "_timezone_code": (np.int32, 0),
+}
+
+DATE_FILTER_WINDOWS = {
+    "3hours": timedelta(hours=3),
+    "8hours": timedelta(hours=8),
+}
+
+# Categories attributes written to snapshots as values and labels
+SNAPSHOT_CATEGORIES = ("_titles", "_locations", "_cities", "_companies", "_work_modes")
+
+class JobIndex:
+    """Resident columnar copy of the job catalog.
+
+    Every job owns a row slot in a set of NumPy columns: created_at as
+    int64 microseconds with its UTC offset and calendar day, location and
+    work_mode as categorical codes, and the salary bounds. A SearchDTO
+    compiles into one boolean mask per filter, combined over whole
+    columns. Substring filters on categorical columns are evaluated once
+    per distinct value instead of once per job, through a trigram index
+    over the distinct titles and locations. Text is compared after
+    fold_text, like job_matches does. Country, city and district values
+    the gazetteer knows are looked up in a PlaceIndex instead.
+
+    Matches are ranked by BM25 over title and description plus a recency
+    boost, or follow the date and salary orders kept up to date across
+    changes, so a page never needs a full sort of the matches.
+
+    Facet counts reuse the same filter masks: per-city, per-company and
+    per-work_mode counts are one bincount of a code column under the
+    matches, with the facet's own filter left out so the other choices
+    still show.
+
+    Salary ranges are resolved by binary search in two orders, by the
+    highest and by the lowest advertised salary, rather than by comparing
+    every job: each bound selects a prefix of one of them.
+
+    A query finding (almost) nothing falls back to a TitleVocabulary: each
+    term expands into the title words within a small edit distance, so
+    "devloper" or "muhendis" still find "Developer" and "Mühendis".
+
+    The whole index can be saved to a snapshot and restored from one
+    (see app.index.snapshot) with the columns, postings and documents
+    memory-mapped, so a restart does not rebuild it job by job.
+    """
+
+    def __init__(self):
+        self.ready = False
+        # Sequence number of the last job event applied to the index
+        self.seq = 0
+        self.clear()
+
+    def clear(self):
+        """Drop every job and column"""
+        self._jobs = DocumentStore()
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._titles = TextCategories()
+        self._vocabulary = TitleVocabulary()
+        self._locations = TextCategories()
+        self._places = PlaceIndex()
+        self._cities = Categories()
+        self._companies = TextCategories()
+        self._work_modes = Categories()
+        self._timezones = Categories()
+        self._scorer = BM25Scorer()
+        # "salary_low" is no sort_by; it backs the salary_max bound of salary filters
+        self._orders = {
+            "date": SortOrder(_date_key),
+            "salary": SortOrder(salary_key),
+            "salary_low": SortOrder(salary_low_key),
+        }
+        for name in COLUMNS:
+            self.__dict__.pop(name, None)
+        self._allocate(INITIAL_CAPACITY)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get(self, job_id: int) -> Optional[dict]:
+        slot = self._slots.get(job_id)
+        return None if slot is None else self._jobs[slot]
+
+    def load(self, jobs: Iterable[dict], seq: int = 0):
+        """Replace the whole index with the given jobs, current as of event seq"""
+        self.swap(JobIndex.build(jobs, seq))
+
+    @staticmethod
+    def build(jobs: Iterable[dict], seq: int = 0) -> "JobIndex":
+        """A new, ready index of the given jobs, current as of event seq.
+
+        It shares nothing with existing indexes, so a reload can build it
+        in a thread while searches keep hitting the previous index.
+        """
+        fresh = JobIndex()
+        for job in jobs:
+            fresh.upsert(job)
+        for order in fresh._orders.values():
+            order.refresh(fresh, fresh._alive)
+        fresh.ready = True
+        fresh.seq = seq
+        return fresh
+
+    def swap(self, fresh: "JobIndex"):
+        """Take over the contents of fresh in one step (call from the event loop)"""
+        self.__dict__.update(fresh.__dict__)
+
+    def save(self, writer: SnapshotWriter):
+        """Write the whole index into a snapshot; writer copies what it is given"""
+        for order in self._orders.values():
+            order.refresh(self, self._alive)
+        # Columns keep their spare rows, so jobs added after a restore fill those first
+        for name in COLUMNS:
+            writer.array(name, self.__dict__[name])
+        writer.documents("jobs", self._jobs)
+        categories = {attribute: self.__dict__[attribute].state() for attribute in SNAPSHOT_CATEGORIES}
+        categories["_timezones"] = {
+            "offsets": [None if zone is None else zone.utcoffset(None).total_seconds() for zone in self._timezones.values],
+        }
+        writer.json("categories", categories)
+        self._vocabulary.save(writer)
+        self._scorer.save(writer)
+        self._places.save(writer)
+        for name, order in self._orders.items():
+            order.save(writer, name)
+
+    def restore(self, reader: SnapshotReader):
+        """Replace the whole index with a snapshot, current as of its seq.
+
+        Columns are mapped copy-on-write: pages stay shared with the file
+        (and any other process restoring it) until a job in them changes.
+        Only the id -> slot map and the distinct values are rebuilt here.
+        """
+        fresh = JobIndex()
+        fresh._jobs = reader.documents("jobs")
+        for name in COLUMNS:
+            setattr(fresh, name, reader.array(name, writable=True))
+        n = len(fresh._jobs)
+        live = np.flatnonzero(fresh._alive[:n])
+        fresh._slots = dict(zip(fresh._ids[live].tolist(), live.tolist()))
+        fresh._free = np.flatnonzero(~fresh._alive[:n]).tolist()
+        categories = reader.json("categories")
+        for attribute in SNAPSHOT_CATEGORIES:
+            fresh.__dict__[attribute].restore(categories[attribute])
+        for offset in categories["_timezones"]["offsets"]:
+            fresh._timezones.code(None if offset is None else timezone(timedelta(seconds=offset)))
+        fresh._vocabulary.restore(reader)
+        fresh._scorer.restore(reader)
+        fresh._places.restore(reader)
+        for name, order in fresh._orders.items():
+            order.restore(reader, name)
+        fresh.ready = True
+        fresh.seq = reader.seq
+        self.__dict__.update(fresh.__dict__)
+
+    def title_counts(self) -> List[Tuple[str, int]]:
+        """(title, number of jobs) for every title in the index"""
+        n = len(self._jobs)
+        counts = np.bincount(self._title_code[:n][self._alive[:n]], minlength=len(self._titles.values))
+        return [(self._titles.labels[code], int(counts[code])) for code in np.flatnonzero(counts)]
+
+    def upsert(self, job: dict):
+        """Add a job to the index, replacing any previous version"""
+        job_id = job.get("id")
+        if job_id is None:
+            return
+        self.remove(job_id)
+        slot = self._free.pop() if self._free else self._new_slot()
+        self._slots[job_id] = slot
+        self._jobs[slot] = job
+        self._ids[slot] = job_id
+        self._alive[slot] = True
+        titles = len(self._titles.values)
+        title = job.get("title")
+        self._title_code[slot] = self._titles.code(fold_text(title), " ".join((title or "").split()))
+        if self._title_code[slot] == titles:
+            self._vocabulary.add_title(titles, title)
+        self._location_code[slot] = self._locations.code(fold_text(job.get("location")))
+        places = job_places(job)
+        self._places.add(slot, places)
+        city = city_of(job.get("location"), places)
+        self._city_code[slot] = self._cities.code(fold_text(city), city)
+        company = job.get("company_name")
+        self._company_code[slot] = self._companies.code(fold_text(company), " ".join((company or "").split()))
+        work_mode = job.get("work_mode")
+        self._work_mode_code[slot] = self._work_modes.code(fold_text(work_mode), (work_mode or "").strip())
+        self._salary_min[slot], self._salary_max[slot] = salary_bounds(job)
+        job_date = parse_job_date(job.get("created_at"))
+        self._dated[slot] = job_date is not None
+        if job_date is not None:
+            self._created_at[slot] = _wall_micros(job_date)
+            self._created_day[slot] = job_date.date().toordinal()
+            self._timezone_code[slot] = self._timezones.code(job_date.tzinfo)
+        self._scorer.add(slot, job)
+        for order in self._orders.values():
+            order.touch(slot)
+
+    def remove(self, job_id: int):
+        """Drop a job and free its row slot"""
+        slot = self._slots.pop(job_id, None)
+        if slot is None:
+            return
+        self._scorer.remove(slot, self._jobs[slot])
+        self._places.remove(slot, job_places(self._jobs[slot]))
+        for order in self._orders.values():
+            order.touch(slot)
+        self._alive[slot] = False
+        self._jobs[slot] = None
+        self._free.append(slot)
+
+    def search(self, search_dto: SearchDTO) -> List[dict]:
+        """Return every job matching the search, ordered by job id"""
+        slots = np.flatnonzero(self.mask(search_dto))
+        return [self._jobs[slot] for slot in self._ordered_slice(slots, 0, len(slots))]
+
+    def search_page(self, search_dto: SearchDTO, skip: int, limit: int, after: Optional[dict] = None,
+                    count_cap: int = 0, deadline: Optional[Deadline] = None
+                    ) -> Tuple[List[dict], int, bool, Optional[dict], Optional[str]]:
+        """Return one page of matches in search_dto.sort_by order, the total number of matches,
+        whether that total was capped, the position of the page's last job (None when no match
+        follows) and the corrected query when typo-tolerant matching was used (else None).
+
+        "relevance" (the default) ranks by BM25 plus recency and falls back
+        to the date order when there is no query; "date" is newest first and
+        "salary" highest first. Equal keys are in job id order. Passing a
+        returned position as after starts the page right behind that job.
+        With a positive count_cap, counting stops once count_cap matches
+        have been seen and the page is full; the total is then a lower
+        bound and the returned flag is True. A query with fewer than
+        FUZZY_FALLBACK_BELOW matches also accepts titles with words close
+        to its terms, and later pages keep doing so.
+
+        Once deadline has expired the typo fallback is skipped and a query
+        is served newest first instead of scored, as are the later pages of
+        such a search; the skipped stages are noted on deadline.
+        """
+        deadline = deadline or Deadline()
+        ranked, name = sort_plan(search_dto, after)
+        cap = max(count_cap, skip + limit) if count_cap else 0
+        mask = self.mask(search_dto)
+        total, capped = count_matches(mask, cap)
+        expansions = None
+        if wants_fuzzy(search_dto, after, total, capped):
+            if deadline.expired():
+                deadline.skip("fuzzy")
+            else:
+                expansions = self.expand_query(search_dto.query)
+                if expansions:
+                    mask = self.mask(search_dto, expansions)
+                    total, capped = count_matches(mask, cap)
+        query, corrected = self.expanded_query(search_dto.query, expansions)
+        if ranked and ranking_skipped(after, deadline):
+            ranked, name = False, "date"
+        now, statistics = self.ranking_context(query, after) if ranked else (None, None)
+        slots, keys = self.candidates(mask, name, query, after, skip + limit + 1, now, statistics)
+        slots, keys = slots[skip:], keys[skip:]
+        last = None
+        if 0 < limit < len(slots):
+            last = page_position(name, keys[limit - 1], self._ids[slots[limit - 1]], bool(expansions), now, statistics)
+        return [self._jobs[slot] for slot in slots[:limit]], total, capped, last, corrected
+
+    def candidates(self, mask: np.ndarray, name: str, query: Optional[str], after: Optional[dict], stop: int,
+                   now: Optional[int] = None, statistics: Optional[dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """The first stop slots of mask in order name, behind after if given, with their sort keys.
+
+        "relevance" ranks by BM25 of query under statistics plus the recency
+        boost at now; other names follow their precomputed order.
+        """
+        if name == "relevance":
+            n = len(mask)
+            scores = self._scorer.scores(query, n, statistics)
+            scores += recency_boost(self._created_at[:n], self._dated[:n], now)
+            slots = np.flatnonzero(mask)
+            if after:
+                key = np.float32(cursor_field(after, "k", float))
+                scored = scores[slots]
+                slots = slots[(scored < key) | ((scored == key) & (self._ids[slots] > cursor_field(after, "i", int)))]
+            slots = top_k(scores, self._ids, slots, 0, stop)
+            return slots, scores[slots]
+        order = self._orders[name]
+        order.refresh(self, self._alive)
+        start = 0
+        if after:
+            start = order.position_after(self, cursor_field(after, "k", int), cursor_field(after, "i", int))
+        slots = order.page(mask, 0, stop, start)
+        return slots, order.key(self, slots)
+
+    def ranking_context(self, query: Optional[str], after: Optional[dict] = None) -> Tuple[int, dict]:
+        """The clock and BM25 statistics a relevance page is scored with.
+
+        Later pages take the first page's from its cursor, so neither the
+        recency boost nor jobs coming and going reorder them.
+        """
+        if after:
+            return cursor_field(after, "t", int), cursor_statistics(after)
+        return _wall_micros(datetime.now(timezone.utc)), self._scorer.statistics(query)
+
+    def expand_query(self, query: Optional[str]) -> Optional[List[List[str]]]:
+        return self._vocabulary.expand_query(query)
+
+    def expanded_query(self, query: Optional[str], expansions: Optional[List[List[str]]]) -> Tuple[Optional[str], Optional[str]]:
+        """The query to score with and the correction to show, given the typo expansions used (if any)"""
+        if not expansions:
+            return query, None
+        return (
+            " ".join(word for words in expansions for word in words),
+            " ".join(self._vocabulary.display(words[0]) for words in expansions),
+        )
+
+    def jobs(self) -> Iterable[dict]:
+        """Every job in the index"""
+        return (self._jobs[slot] for slot in self._slots.values())
+
+    def mask(self, search_dto: SearchDTO, expansions: Optional[List[List[str]]] = None) -> np.ndarray:
+        """Compile a SearchDTO into a boolean mask over the row slots.
+
+        Accepts exactly the jobs job_matches accepts, with the same
+        substring and date semantics; with typo expansions a title may
+        also match through them.
+        """
+        masks = self._filter_masks(search_dto)
+        if expansions:
+            masks["query"] = masks["query"] | self._fuzzy_mask(expansions)
+        return self._combine(masks)
+
+    def _combine(self, masks: Dict[str, np.ndarray]) -> np.ndarray:
+        mask = self._alive[:len(self._jobs)].copy()
+        for filter_mask in masks.values():
+            mask &= filter_mask
+        return mask
+
+    def _fuzzy_mask(self, expansions: List[List[str]]) -> np.ndarray:
+        """Jobs whose title has, for every query term, one of the words it expanded into"""
+        n = len(self._jobs)
+        mask = np.ones(n, dtype=bool)
+        for words in expansions:
+            table = np.zeros(len(self._titles.values), dtype=bool)
+            table[list(self._vocabulary.title_codes(words))] = True
+            mask &= table[self._title_code[:n]]
+        return mask
+
+    def facets(self, search_dto: SearchDTO, limit: int = 10) -> dict:
+        """Count the matches of a search per city, company, work mode, date filter and salary range.
+
+        Each facet leaves out its own filter, so with city=Ankara the
+        cities facet still lists Istanbul with the jobs picking it would
+        find. Lists hold the limit largest values, biggest first; every
+        date bucket counts undated jobs, as the date filter keeps them.
+        """
+        result = self._facet_arrays(search_dto)
+        for facet, (_, _, attribute) in FACETS.items():
+            result[facet] = top_counts(result[facet], self.__dict__[attribute].labels, limit)
+        return result
+
+    def facet_counts(self, search_dto: SearchDTO) -> dict:
+        """Like facets, but with every value's count as {value: [label, count]} so that
+        the counts of several indexes can be added up by merge_facet_counts"""
+        result = self._facet_arrays(search_dto)
+        for facet, (_, _, attribute) in FACETS.items():
+            categories = self.__dict__[attribute]
+            counts = result[facet]
+            result[facet] = {
+                categories.values[code]: [categories.labels[code], int(counts[code])]
+                for code in np.flatnonzero(counts).tolist()
+            }
+        return result
+
+    def _facet_arrays(self, search_dto: SearchDTO) -> dict:
+        """The facets of a search with each facet's counts as an array indexed by code"""
+        n = len(self._jobs)
+        masks = self._filter_masks(search_dto)
+        alive = self._alive[:n]
+
+        def matches(ignored: Optional[str] = None) -> np.ndarray:
+            mask = alive.copy()
+            for name, filter_mask in masks.items():
+                if name != ignored:
+                    mask &= filter_mask
+            return mask
+
+        full = matches()
+        result = {"total": int(np.count_nonzero(full))}
+        for facet, (ignored, column, attribute) in FACETS.items():
+            mask = matches(ignored) if ignored in masks else full
+            result[facet] = np.bincount(self.__dict__[column][:n][mask], minlength=len(self.__dict__[attribute].values))
+
+        mask = matches("date") if "date" in masks else full
+        undated = mask & ~self._dated[:n]
+        result["date_buckets"] = {"all": int(np.count_nonzero(mask))}
+        for bucket in DATE_BUCKETS:
+            result["date_buckets"][bucket] = int(np.count_nonzero(undated | (mask & self._date_mask(bucket, n))))
+
+        mask = matches("salary") if "salary" in masks else full
+        result["salary_ranges"] = salary_histogram(*self._salary_orders(), mask)
+        return result
+
+    def _filter_masks(self, search_dto: SearchDTO) -> Dict[str, np.ndarray]:
+        """One mask per active filter group, so facets can leave a group out"""
+        n = len(self._jobs)
+        masks = {}
+        if search_dto.query:
+            masks["query"] = self._titles.containing(fold_text(search_dto.query))[self._title_code[:n]]
+
+        places, needles = location_filters(search_dto)
+        location_masks = [self._places.mask(place, n) for place in places]
+        location_masks += [self._locations.containing(needle)[self._location_code[:n]] for needle in needles]
+        for location in location_masks:
+            masks["location"] = masks["location"] & location if "location" in masks else location
+
+        if search_dto.company:
+            masks["company"] = self._companies.containing(fold_text(search_dto.company))[self._company_code[:n]]
+
+        if search_dto.work_mode:
+            modes = [fold_text(mode.strip()) for mode in search_dto.work_mode.split(',')]
+            masks["work_mode"] = self._work_modes.lookup(
+                lambda job_mode: any(mode in job_mode for mode in modes)
+            )[self._work_mode_code[:n]]
+
+        if search_dto.date_filter == "today" or search_dto.date_filter in DATE_FILTER_WINDOWS:
+            # Jobs without a usable created_at are not filtered by date
+            masks["date"] = ~self._dated[:n] | self._date_mask(search_dto.date_filter, n)
+
+        if search_dto.salary_min is not None or search_dto.salary_max is not None:
+            masks["salary"] = salary_mask(self, *self._salary_orders(), search_dto.salary_min, search_dto.salary_max, n)
+        return masks
+
+    def _date_mask(self, date_filter: str, n: int) -> np.ndarray:
+        """Compare created_at with "now" taken in each job's own UTC offset, as job_matches does"""
+        zones = self._timezones.values
+        codes = self._timezone_code[:n]
+        if date_filter == "today":
+            today = np.array([datetime.now(zone).date().toordinal() for zone in zones] or [0], dtype=np.int64)
+            return self._created_day[:n] == today[codes]
+        window = DATE_FILTER_WINDOWS[date_filter]
+        since = np.array([_wall_micros(datetime.now(zone) - window) for zone in zones] or [0], dtype=np.int64)
+        return self._created_at[:n] >= since[codes]
+
+    def _salary_orders(self) -> Tuple[SortOrder, SortOrder]:
+        """The orders by highest and by lowest salary, brought up to date"""
+        orders = self._orders["salary"], self._orders["salary_low"]
+        for order in orders:
+            order.refresh(self, self._alive)
+        return orders
+
+    def _ordered_slice(self, slots: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """slots[start:stop] in job id order, partitioning instead of sorting every match"""
+        if start >= len(slots) or stop <= start:
+            return slots[:0]
+        ids = self._ids[slots]
+        if stop < len(slots):
+            head = np.argpartition(ids, stop - 1)[:stop]
+            return slots[head[np.argsort(ids[head])]][start:stop]
+        return slots[np.argsort(ids)][start:stop]
+
+    def _new_slot(self) -> int:
+        slot = len(self._jobs)
+        if slot >= len(self._ids):
+            self._allocate(2 * len(self._ids))
+        self._jobs.append(None)
+        return slot
+
+    def _allocate(self, capacity: int):
+        """Grow every column to capacity rows, keeping existing values"""
+        for name, (dtype, fill) in COLUMNS.items():
+            column = np.full(capacity, fill, dtype=dtype)
+            old = self.__dict__.get(name)
+            if old is not None:
+                column[:len(old)] = old
+            setattr(self, name, column)
+
+def count_matches(mask: np.ndarray, cap: int = 0) -> Tuple[int, bool]:
+    """Count the True rows of mask, stopping once cap of them have been seen.
+
+    Returns the count and whether counting stopped at the cap, in which
+    case the count is exactly cap and only a lower bound. A cap of 0
+    counts every row.
+    """
+    if not cap:
+        return int(np.count_nonzero(mask)), False
+    total = 0
+    for start in range(0, len(mask), COUNT_CHUNK):
+        total += int(np.count_nonzero(mask[start:start + COUNT_CHUNK]))
+        if total >= cap:
+            return cap, True
+    return total, False
+
+def _wall_micros(value: datetime) -> int:
+    """Microseconds since the epoch of value's own wall clock.
+
+    Each job is only ever compared with "now" in its own offset, so naive
+    and aware timestamps never have to be reconciled.
+    """
+    return (value.replace(tzinfo=timezone.utc) - EPOCH) // timedelta(microseconds=1)
+
+def _date_key(index: JobIndex, slots: np.ndarray) -> np.ndarray:
+    """Newest first; undated jobs last"""
+    return np.where(index._dated[slots], index._created_at[slots], UNDATED_KEY)
+
+job_index = JobIndex()
+
+def get_job_index() -> JobIndex:
+    return job_index
@@ -0,0 +1,38 @@
+import numpy as np
+from typing import Iterable
+from .postings import PostingLists
+
+class PlaceIndex:
+    """Posting lists of row slots per gazetteer place id.
+
+    A job is posted under its district, city and country, so any level of
+    the hierarchy is a single dict lookup rather than a scan of the
+    location strings. Each list is materialized as a slot array on first
+    use and kept until a job joins or leaves that place.
+    """
+
+    def __init__(self):
+        self._postings = PostingLists(np.uint8)
+
+    def add(self, slot: int, places: Iterable[str]):
+        for place in places:
+            self._postings.add(place, slot)
+
+    def remove(self, slot: int, places: Iterable[str]):
+        for place in places:
+            self._postings.discard(place, slot)
+
+    def slots(self, place: str) -> np.ndarray:
+        return self._postings.arrays(place)[0]
+
+    def mask(self, place: str, n: int) -> np.ndarray:
+        """Boolean mask over the first n row slots of the jobs in place"""
+        mask = np.zeros(n, dtype=bool)
+        mask[self.slots(place)] = True
+        return mask
+
+    def save(self, writer):
+        self._postings.save(writer, "places")
+
+    def restore(self, reader):
+        self._postings = PostingLists.restore(reader, "places")
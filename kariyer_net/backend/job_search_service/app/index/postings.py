@@ -0,0 +1,102 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+class PostingLists:
+    """Row slots per key, each with a number (a term frequency, say).
+
+    Lists restored from a snapshot stay in its CSR arrays, usually memory
+    mapped: key i owns slots[offsets[i]:offsets[i + 1]] and the values
+    alongside. A list is copied into a dict only once it changes, so the
+    unchanged ones are served as views of the mapped pages.
+    """
+
+    def __init__(self, value_dtype=np.int32):
+        self._value_dtype = value_dtype
+        self._changed: Dict[str, Dict[int, int]] = {}
+        self._mapped: Dict[str, Tuple[int, int]] = {}
+        self._slots = np.zeros(0, dtype=np.int64)
+        self._values = np.zeros(0, dtype=value_dtype)
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._changed or key in self._mapped
+
+    def size(self, key: str) -> int:
+        postings = self._changed.get(key)
+        if postings is not None:
+            return len(postings)
+        start, end = self._mapped.get(key, (0, 0))
+        return end - start
+
+    def add(self, key: str, slot: int, value: int = 1):
+        self._postings(key)[slot] = value
+        self._arrays.pop(key, None)
+
+    def discard(self, key: str, slot: int):
+        if key not in self:
+            return
+        postings = self._postings(key)
+        postings.pop(slot, None)
+        if not postings:
+            del self._changed[key]
+        self._arrays.pop(key, None)
+
+    def arrays(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """The slots and values of key as arrays, kept until the key changes"""
+        arrays = self._arrays.get(key)
+        if arrays is None:
+            postings = self._changed.get(key)
+            if postings is None:
+                start, end = self._mapped.get(key, (0, 0))
+                return self._slots[start:end], self._values[start:end]
+            arrays = self._arrays[key] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=self._value_dtype, count=len(postings)),
+            )
+        return arrays
+
+    def _postings(self, key: str) -> Dict[int, int]:
+        """The dict of key, copied out of the mapped arrays on first change"""
+        postings = self._changed.get(key)
+        if postings is None:
+            start, end = self._mapped.pop(key, (0, 0))
+            postings = self._changed[key] = dict(
+                zip(self._slots[start:end].tolist(), self._values[start:end].tolist())
+            )
+        return postings
+
+    def save(self, writer, name: str):
+        """Write every list as CSR arrays, slots ascending within a key"""
+        keys: List[str] = sorted(self._changed.keys() | self._mapped.keys())
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        slot_parts, value_parts = [], []
+        for i, key in enumerate(keys):
+            postings = self._changed.get(key)
+            if postings is None:
+                start, end = self._mapped[key]
+                slots, values = self._slots[start:end], self._values[start:end]
+            else:
+                slots = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+                values = np.fromiter(postings.values(), dtype=self._value_dtype, count=len(postings))
+                order = np.argsort(slots)
+                slots, values = slots[order], values[order]
+            slot_parts.append(slots)
+            value_parts.append(values)
+            offsets[i + 1] = offsets[i] + len(slots)
+        writer.json(f"{name}_keys", keys)
+        writer.array(f"{name}_offsets", offsets)
+        writer.array(f"{name}_slots", np.concatenate(slot_parts) if slot_parts else self._slots[:0])
+        writer.array(f"{name}_values", np.concatenate(value_parts) if value_parts else self._values[:0])
+
+    @classmethod
+    def restore(cls, reader, name: str) -> "PostingLists":
+        """Lists mapped from a snapshot written by save"""
+        values = reader.array(f"{name}_values")
+        postings = cls(values.dtype)
+        offsets = reader.array(f"{name}_offsets").tolist()
+        postings._mapped = {
+            key: (offsets[i], offsets[i + 1]) for i, key in enumerate(reader.json(f"{name}_keys"))
+        }
+        postings._slots = reader.array(f"{name}_slots")
+        postings._values = values
+        return postings
@@ -0,0 +1,258 @@
+import math
+import re
+import numpy as np
+from collections import Counter
+from typing import Callable, List, Optional, Set, Tuple
+from ..dto.search_dto import SearchDTO
+from ..utils.cursor import InvalidCursorError
+from ..utils.deadline import Deadline
+from ..utils.search_utils import fold_text
+from .postings import PostingLists
+
+TOKEN_PATTERN = re.compile(r"\w+")
+INT64 = np.iinfo(np.int64)
+
+# BM25 parameters; title terms count TITLE_WEIGHT times, like a short boosted field
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 3
+
+# Recency boost added to the text score: RECENCY_WEIGHT for a brand new
+# job, halving every RECENCY_HALF_LIFE_HOURS
+RECENCY_WEIGHT = 1.0
+RECENCY_HALF_LIFE_HOURS = 72.0
+
+# First chunk of a precomputed order scanned for a page; doubles each round
+ORDER_SCAN_CHUNK = 1024
+
+# A query matching fewer jobs than this is retried with typo-tolerant title terms
+FUZZY_FALLBACK_BELOW = 3
+
+def tokenize(text) -> List[str]:
+    return TOKEN_PATTERN.findall(fold_text(text))
+
+def job_terms(job: dict) -> Counter:
+    """Weighted term frequencies of a job's title and description"""
+    terms = Counter(tokenize(job.get("description")))
+    for term in tokenize(job.get("title")):
+        terms[term] += TITLE_WEIGHT
+    return terms
+
+class BM25Scorer:
+    """Term postings (slot -> weighted term frequency) and document lengths for BM25.
+
+    Queried terms keep their postings as NumPy arrays until the term
+    changes, so repeated queries do not convert the same dicts again.
+    """
+
+    def __init__(self):
+        self._postings = PostingLists(np.float32)
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._total_length = 0
+        self._documents = 0
+
+    def add(self, slot: int, job: dict):
+        terms = job_terms(job)
+        for term, frequency in terms.items():
+            self._postings.add(term, slot, frequency)
+        if slot >= len(self._lengths):
+            lengths = np.zeros(max(2 * len(self._lengths), slot + 1), dtype=np.float32)
+            lengths[:len(self._lengths)] = self._lengths
+            self._lengths = lengths
+        length = sum(terms.values())
+        self._lengths[slot] = length
+        self._total_length += length
+        self._documents += 1
+
+    def remove(self, slot: int, job: dict):
+        for term in job_terms(job):
+            self._postings.discard(term, slot)
+        self._total_length -= int(self._lengths[slot])
+        self._lengths[slot] = 0
+        self._documents -= 1
+
+    def statistics(self, query: str) -> dict:
+        """The collection statistics a query's scores depend on.
+
+        Scoring later pages with the first page's statistics keeps jobs
+        that did not change at the same score while others come and go.
+        """
+        return {
+            "n": self._documents,
+            "avg": self._total_length / self._documents if self._documents else 0.0,
+            "df": {term: self._postings.size(term) for term in set(tokenize(query))},
+        }
+
+    def scores(self, query: str, n: int, statistics: Optional[dict] = None) -> np.ndarray:
+        """BM25 score of every slot below n for the query's terms (0 where none occur)"""
+        scores = np.zeros(n, dtype=np.float32)
+        statistics = statistics or self.statistics(query)
+        documents, average_length = statistics["n"], statistics["avg"]
+        if not documents:
+            return scores
+        for term, frequency in statistics["df"].items():
+            if not frequency or term not in self._postings:
+                continue
+            idf = math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5))
+            slots, frequencies = self._postings.arrays(term)
+            norm = K1 * (1 - B + B * self._lengths[slots] / average_length)
+            scores[slots] += idf * frequencies * (K1 + 1) / (frequencies + norm)
+        return scores
+
+    def save(self, writer):
+        self._postings.save(writer, "bm25")
+        writer.array("bm25_lengths", self._lengths)
+        writer.json("bm25", {"total_length": self._total_length, "documents": self._documents})
+
+    def restore(self, reader):
+        """Take over the postings and lengths of a snapshot written by save"""
+        self._postings = PostingLists.restore(reader, "bm25")
+        self._lengths = reader.array("bm25_lengths", writable=True)
+        totals = reader.json("bm25")
+        self._total_length, self._documents = totals["total_length"], totals["documents"]
+
+class SortOrder:
+    """Row slots kept sorted by a key, highest first, equal keys by lowest job id.
+
+    Changed slots are only recorded; the next refresh drops them from the
+    order and merges their new positions in with searchsorted, instead of
+    sorting the whole catalog again. The negated keys are kept alongside,
+    so the position behind a (key, job id) cursor is a binary search.
+    """
+
+    def __init__(self, key: Callable[[object, np.ndarray], np.ndarray]):
+        self.key = key
+        self.slots = np.zeros(0, dtype=np.int64)
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._pending: Set[int] = set()
+
+    def touch(self, slot: int):
+        self._pending.add(slot)
+
+    def refresh(self, index, alive: np.ndarray):
+        if not self._pending:
+            return
+        pending = np.fromiter(self._pending, dtype=np.int64, count=len(self._pending))
+        self._pending.clear()
+        kept = ~np.isin(self.slots, pending)
+        slots, keys = self.slots[kept], self._keys[kept]
+        added = pending[alive[pending]]
+        added_keys = -self.key(index, added)
+        added_ids = index._ids[added]
+        order = np.lexsort((added_ids, added_keys))
+        added, added_keys, added_ids = added[order], added_keys[order], added_ids[order]
+        positions = np.searchsorted(keys, added_keys, side="left")
+        ends = np.searchsorted(keys, added_keys, side="right")
+        for i in np.flatnonzero(positions < ends):
+            positions[i] += np.searchsorted(index._ids[slots[positions[i]:ends[i]]], added_ids[i])
+        self.slots = np.insert(slots, positions, added)
+        self._keys = np.insert(keys, positions, added_keys)
+
+    def save(self, writer, name: str):
+        """Write the order (the caller refreshed it)"""
+        writer.array(f"order_{name}_slots", self.slots)
+        writer.array(f"order_{name}_keys", self._keys)
+
+    def restore(self, reader, name: str):
+        self.slots = reader.array(f"order_{name}_slots")
+        self._keys = reader.array(f"order_{name}_keys")
+        self._pending.clear()
+
+    def count_at_least(self, key: int) -> int:
+        """How many slots at the head of the order have a key of at least key"""
+        return int(np.searchsorted(self._keys, -key, side="right"))
+
+    def position_after(self, index, key: int, job_id: int) -> int:
+        """Where the order continues behind the job with this key and id, whether or not it still exists"""
+        start = int(np.searchsorted(self._keys, -key, side="left"))
+        end = int(np.searchsorted(self._keys, -key, side="right"))
+        return start + int(np.searchsorted(index._ids[self.slots[start:end]], job_id, side="right"))
+
+    def page(self, mask: np.ndarray, start: int, stop: int, position: int = 0) -> np.ndarray:
+        """The matching slots start..stop from position on, scanning only as far as the page needs"""
+        found = []
+        collected = 0
+        chunk = ORDER_SCAN_CHUNK
+        while position < len(self.slots) and collected < stop:
+            part = self.slots[position:position + chunk]
+            hits = part[mask[part]]
+            found.append(hits)
+            collected += len(hits)
+            position += chunk
+            chunk *= 2
+        if not found:
+            return self.slots[:0]
+        return np.concatenate(found)[start:stop]
+
+def top_k(scores: np.ndarray, ids: np.ndarray, slots: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """slots start..stop by score (highest first, then lowest job id), ranking only about stop of them.
+
+    np.partition finds the stop-th best score in linear time; only slots
+    scoring at least that much (stop plus any ties) are fully sorted.
+    """
+    if start >= len(slots) or stop <= start:
+        return slots[:0]
+    candidate_scores = scores[slots]
+    if stop < len(slots):
+        threshold = np.partition(candidate_scores, len(slots) - stop)[len(slots) - stop]
+        selected = candidate_scores >= threshold
+        slots, candidate_scores = slots[selected], candidate_scores[selected]
+    order = np.lexsort((ids[slots], -candidate_scores))
+    return slots[order][start:stop]
+
+def recency_boost(created_at: np.ndarray, dated: np.ndarray, now_micros: int) -> np.ndarray:
+    age_hours = np.maximum(now_micros - created_at, 0) / 3.6e9
+    return np.where(dated, RECENCY_WEIGHT * np.exp2(-age_hours / RECENCY_HALF_LIFE_HOURS), 0).astype(np.float32)
+
+def cursor_field(after: dict, field: str, kind: type):
+    """A field of a decoded cursor position, or InvalidCursorError"""
+    try:
+        value = kind(after[field])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursorError("Malformed cursor")
+    # Keys are negated, so int64 min itself is out of range as well
+    if kind is int and not INT64.min < value <= INT64.max:
+        raise InvalidCursorError("Malformed cursor")
+    return value
+
+def cursor_statistics(after: dict) -> dict:
+    """The BM25 statistics a relevance cursor carries, in the shape BM25Scorer.statistics returns"""
+    try:
+        statistics = after["bm25"]
+        return {
+            "n": int(statistics["n"]),
+            "avg": float(statistics["avg"]),
+            "df": {str(term): int(frequency) for term, frequency in statistics["df"].items()},
+        }
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise InvalidCursorError("Malformed cursor")
+
+def sort_plan(search_dto: SearchDTO, after: Optional[dict] = None) -> Tuple[bool, str]:
+    """Whether a search is ranked by relevance, and the name of its order (checked against after)"""
+    sort_by = search_dto.sort_by or "relevance"
+    ranked = sort_by == "relevance" and bool(search_dto.query)
+    name = "relevance" if ranked else "date" if sort_by == "relevance" else sort_by
+    # A relevance search cut short by its deadline continues newest first
+    if after is not None and after.get("o") != name and not (ranked and after.get("o") == "date"):
+        raise InvalidCursorError(f"Cursor does not belong to sort_by={sort_by}")
+    return ranked, name
+
+def wants_fuzzy(search_dto: SearchDTO, after: Optional[dict], total: int, capped: bool = False) -> bool:
+    """Whether a query is retried with typos tolerated: too few matches, or a later page of one that was"""
+    if after:
+        return bool(search_dto.query) and after.get("f", False)
+    return bool(search_dto.query) and not capped and total < FUZZY_FALLBACK_BELOW
+
+def ranking_skipped(after: Optional[dict], deadline: Deadline) -> bool:
+    """Whether a relevance search is served newest first: out of time, or a later page of one that was"""
+    if after.get("o") == "date" if after else deadline.expired():
+        deadline.skip("ranking")
+        return True
+    return False
+
+def page_position(name: str, key, job_id: int, fuzzy: bool, now: Optional[int] = None,
+                  statistics: Optional[dict] = None) -> dict:
+    """The cursor position of a job with this sort key in order name"""
+    if name == "relevance":
+        return {"o": name, "k": float(key), "i": int(job_id), "f": fuzzy, "t": now, "bm25": statistics}
+    return {"o": name, "k": int(key), "i": int(job_id), "f": fuzzy}
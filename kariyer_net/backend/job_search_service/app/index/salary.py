@@ -0,0 +1,85 @@
+import numpy as np
+from typing import List, Optional, Tuple
+from .ranking import SortOrder
+
+# Salary column value of a job without that bound
+MISSING = -1
+
+# The salary buckets /search/filters offers, as (min, max) overlap filters
+SALARY_RANGES = [
+    (0, 25000, "0-25K"),
+    (25000, 50000, "25K-50K"),
+    (50000, 100000, "50K-100K"),
+    (100000, None, "100K+"),
+]
+
+def salary_bounds(job: dict) -> Tuple[int, int]:
+    """A job's (low, high) salary columns, MISSING where a bound is not given.
+
+    Bounds posted the wrong way round are swapped, as the orders and
+    buckets below rely on low <= high.
+    """
+    low, high = _salary(job.get("salary_min")), _salary(job.get("salary_max"))
+    if low != MISSING and high != MISSING and low > high:
+        low, high = high, low
+    return low, high
+
+def salary_key(index, slots: np.ndarray) -> np.ndarray:
+    """Highest advertised salary first; jobs without a salary (MISSING) last"""
+    high = index._salary_max[slots]
+    return np.where(high == MISSING, index._salary_min[slots], high)
+
+def salary_low_key(index, slots: np.ndarray) -> np.ndarray:
+    """Lowest advertised salary first (as a negated key); jobs without a salary first as well"""
+    low = index._salary_min[slots]
+    return -np.where(low == MISSING, index._salary_max[slots], low)
+
+def salary_mask(index, high_order: SortOrder, low_order: SortOrder,
+                salary_min: Optional[int], salary_max: Optional[int], n: int) -> np.ndarray:
+    """Jobs whose salary range overlaps the requested one; a missing bound falls back to the other.
+
+    Jobs paying up to at least salary_min are a prefix of the order by
+    highest salary, and jobs starting at most at salary_max a prefix of
+    the order by lowest salary. The shorter prefix is taken and only its
+    slots are checked against the other bound.
+    """
+    # Salaries are never negative and jobs without one sort below 0
+    floor = max(salary_min or 0, 0)
+    slots = high_order.slots[:high_order.count_at_least(floor)]
+    if salary_max is not None:
+        below = low_order.slots[:low_order.count_at_least(-salary_max)]
+        if len(below) < len(slots):
+            slots = below[salary_key(index, below) >= floor]
+        else:
+            slots = slots[-salary_low_key(index, slots) <= salary_max]
+    mask = np.zeros(n, dtype=bool)
+    mask[slots] = True
+    return mask
+
+def salary_histogram(high_order: SortOrder, low_order: SortOrder, mask: np.ndarray) -> List[dict]:
+    """Matches per SALARY_RANGES bucket, each counted like the overlap filter for that range.
+
+    Running counts of the matches along both salary orders turn every
+    bucket into two binary searches. A job overlaps [low, high] unless it
+    pays less than low or starts above high, and as salary_bounds keeps
+    every job's bounds in order, no job does both.
+    """
+    paying = np.cumsum(mask[high_order.slots])
+    starting = np.cumsum(mask[low_order.slots])
+
+    def matches_in(counts: np.ndarray, head: int) -> int:
+        return int(counts[head - 1]) if head else 0
+
+    buckets = []
+    for low, high, label in SALARY_RANGES:
+        count = matches_in(paying, high_order.count_at_least(low))
+        if high is not None:
+            count -= matches_in(starting, len(starting)) - matches_in(starting, low_order.count_at_least(-high))
+        buckets.append({"min": low, "max": high, "label": label, "count": count})
+    return buckets
+
+def _salary(value) -> int:
+    try:
+        return MISSING if value is None else int(value)
+    except (TypeError, ValueError):
+        return MISSING
@@ -0,0 +1,233 @@
+import asyncio
+import heapq
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from ..core.config import settings
+from ..dto.search_dto import SearchDTO
+from ..utils.cursor import InvalidCursorError
+from ..utils.deadline import Deadline
+from .facets import merge_facet_counts
+from .job_index import JobIndex, count_matches
+from .ranking import page_position, ranking_skipped, sort_plan, wants_fuzzy
+
+# Jobs sent to a shard per message while it loads
+LOAD_BATCH_SIZE = 5000
+
+class ShardPoolError(Exception):
+    """A shard process died or its pipe broke; searches go to the main index until it is reloaded"""
+
+def serve_shard(conn):
+    """Main loop of a shard process: keep a JobIndex of one partition and answer queries on it.
+
+    Changes arrive without a reply; "page", "facets" and "ping" are answered
+    with ("ok", value) or ("error", exception). Messages are handled in the
+    order they were sent, so a query sees every change sent before it.
+    """
+    index = JobIndex()
+    pending: List[dict] = []
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        op = message[0]
+        try:
+            if op == "upsert":
+                index.upsert(message[1])
+            elif op == "remove":
+                index.remove(message[1])
+            elif op == "jobs":
+                pending.extend(message[1])
+            elif op == "loaded":
+                index.load(pending)
+                pending = []
+            else:
+                conn.send(("ok", _answer(index, op, *message[1:])))
+        except Exception as e:
+            if op in ("upsert", "remove", "jobs", "loaded"):
+                print(f"[Shard] Failed to apply {op}: {e}")
+                continue
+            conn.send(("error", e if isinstance(e, InvalidCursorError) else RuntimeError(repr(e))))
+
+def _answer(index: JobIndex, op: str, *args):
+    if op == "page":
+        search_dto, expansions, name, query, after, stop, cap, now, statistics = args
+        mask = index.mask(search_dto, expansions)
+        slots, keys = index.candidates(mask, name, query, after, stop, now, statistics)
+        return count_matches(mask, cap)[0], keys.tolist(), index._ids[slots].tolist()
+    if op == "facets":
+        return index.facet_counts(args[0])
+    if op == "ping":
+        return len(index)
+    raise ValueError(f"Unknown shard query {op}")
+
+class Shard:
+    """One shard process and the pipe to it.
+
+    Every send goes through a single thread, so messages keep their order
+    and a slow query never blocks the event loop; a query waits for the
+    changes queued in front of it.
+    """
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=serve_shard, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.broken = False
+        self._sender = ThreadPoolExecutor(max_workers=1)
+
+    def send(self, message: tuple):
+        """Queue a change; a broken pipe marks the shard broken"""
+        self._sender.submit(self._send, message)
+
+    async def request(self, *message):
+        return await asyncio.get_running_loop().run_in_executor(self._sender, self._exchange, message)
+
+    def _send(self, message: tuple):
+        try:
+            self.conn.send(message)
+        except (OSError, ValueError) as e:
+            self.broken = True
+            print(f"[ShardPool] Shard {self.process.pid} is gone: {e}")
+
+    def _exchange(self, message: tuple):
+        try:
+            self.conn.send(message)
+            status, value = self.conn.recv()
+        except (EOFError, OSError, ValueError) as e:
+            self.broken = True
+            raise ShardPoolError(f"Shard {self.process.pid} is gone: {e}")
+        if status == "error":
+            raise value
+        return value
+
+    def close(self):
+        self._sender.shutdown(wait=False)
+        self.conn.close()
+        self.process.terminate()
+
+class ShardPool:
+    """Runs searches on SEARCH_SHARDS processes, each holding the jobs with id % count == its number.
+
+    The main index stays authoritative: it takes every job event, writes
+    the snapshots, supplies the BM25 statistics, typo expansions and
+    clock a search is ranked with (so every shard scores like the whole
+    catalog would), and returns the documents of the merged page. The
+    shards only filter and rank their partition, in parallel and off the
+    event loop, and send back the ids and sort keys of their top hits.
+    """
+
+    def __init__(self, count: int):
+        self.count = count
+        self.ready = False
+        self._shards: List[Shard] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.count > 0
+
+    @property
+    def usable(self) -> bool:
+        return self.ready and not any(shard.broken for shard in self._shards)
+
+    async def load(self, index: JobIndex):
+        """(Re)start the shard processes and partition the jobs of index among them"""
+        self.ready = False
+        self.close()
+        context = multiprocessing.get_context("spawn")
+        self._shards = [Shard(context) for _ in range(self.count)]
+        partitions: List[List[dict]] = [[] for _ in self._shards]
+        for job in index.jobs():
+            partitions[job["id"] % self.count].append(job)
+        for shard, jobs in zip(self._shards, partitions):
+            for start in range(0, len(jobs), LOAD_BATCH_SIZE):
+                shard.send(("jobs", jobs[start:start + LOAD_BATCH_SIZE]))
+            shard.send(("loaded",))
+        sizes = await self._fan_out("ping")
+        self.ready = True
+        print(f"[ShardPool] Loaded {sum(sizes)} jobs into {self.count} shards ({', '.join(map(str, sizes))})")
+
+    def upsert(self, job: dict):
+        if self._shards and job.get("id") is not None:
+            self._shard(job["id"]).send(("upsert", job))
+
+    def remove(self, job_id: int):
+        if self._shards and job_id is not None:
+            self._shard(job_id).send(("remove", job_id))
+
+    async def search_page(self, index: JobIndex, search_dto: SearchDTO, skip: int, limit: int,
+                          after: Optional[dict] = None, count_cap: int = 0, deadline: Optional[Deadline] = None
+                          ) -> Tuple[List[dict], int, bool, Optional[dict], Optional[str]]:
+        """JobIndex.search_page over the shards: each returns its first skip + limit + 1 hits,
+        which are merged by (key, job id) and cut at skip.
+
+        Each shard stops counting at the count cap as well; once their
+        counts add up to it the total is reported as the cap, like the main
+        index does.
+        """
+        deadline = deadline or Deadline()
+        cap = max(count_cap, skip + limit) if count_cap else 0
+        ranked, name = sort_plan(search_dto, after)
+        if ranked and ranking_skipped(after, deadline):
+            ranked, name = False, "date"
+        stop = skip + limit + 1
+        expansions = None
+        # Later pages of a typo-tolerant search stay typo-tolerant
+        if after and wants_fuzzy(search_dto, after, 0):
+            expansions = self._expansions(index, search_dto, deadline)
+        page = await self._page(index, search_dto, expansions, ranked, name, after, stop, cap)
+        if not after and wants_fuzzy(search_dto, None, page[0], page[1]):
+            expansions = self._expansions(index, search_dto, deadline)
+            if expansions:
+                page = await self._page(index, search_dto, expansions, ranked, name, after, stop, cap)
+        total, capped, hits, corrected, now, statistics = page
+        hits = hits[skip:]
+        last = None
+        if 0 < limit < len(hits):
+            key, job_id = hits[limit - 1]
+            last = page_position(name, -key, job_id, bool(expansions), now, statistics)
+        jobs = [index.get(job_id) for _, job_id in hits[:limit]]
+        # A job removed since the shards answered is left out
+        return [job for job in jobs if job is not None], total, capped, last, corrected
+
+    async def facets(self, search_dto: SearchDTO, limit: int = 10) -> dict:
+        return merge_facet_counts(await self._fan_out("facets", search_dto), limit)
+
+    async def _page(self, index: JobIndex, search_dto: SearchDTO, expansions: Optional[List[List[str]]],
+                    ranked: bool, name: str, after: Optional[dict], stop: int, cap: int):
+        query, corrected = index.expanded_query(search_dto.query, expansions)
+        now, statistics = index.ranking_context(query, after) if ranked else (None, None)
+        parts = await self._fan_out("page", search_dto, expansions, name, query, after, stop, cap, now, statistics)
+        # Every shard's hits are already highest key first, then lowest job id
+        hits = heapq.merge(*([(-key, job_id) for key, job_id in zip(keys, ids)] for _, keys, ids in parts))
+        total = sum(count for count, _, _ in parts)
+        capped = bool(cap) and total >= cap
+        return cap if capped else total, capped, list(hits)[:stop], corrected, now, statistics
+
+    def _expansions(self, index: JobIndex, search_dto: SearchDTO, deadline: Deadline) -> Optional[List[List[str]]]:
+        if deadline.expired():
+            deadline.skip("fuzzy")
+            return None
+        return index.expand_query(search_dto.query)
+
+    async def _fan_out(self, *message) -> list:
+        try:
+            return list(await asyncio.gather(*(shard.request(*message) for shard in self._shards)))
+        except ShardPoolError:
+            self.ready = False
+            raise
+
+    def _shard(self, job_id: int) -> Shard:
+        return self._shards[job_id % self.count]
+
+    def close(self):
+        for shard in self._shards:
+            shard.close()
+        self._shards = []
+
+shard_pool = ShardPool(settings.SEARCH_SHARDS)
+
+def get_shard_pool() -> ShardPool:
+    return shard_pool
@@ -0,0 +1,158 @@
+import fcntl
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import numpy as np
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+from .documents import DocumentStore
+
+# Bump whenever what an index writes changes meaning (columns, tokenization, ...):
+# snapshots in another format are skipped, and the catalog is loaded in full instead
+SNAPSHOT_FORMAT = 1
+MANIFEST = "manifest.json"
+LOCK_FILE = ".lock"
+TEMP_PREFIX = ".tmp-"
+
+class SnapshotError(Exception):
+    """A snapshot directory is incomplete or in another format"""
+
+def snapshot_name(seq: int) -> str:
+    return f"v{SNAPSHOT_FORMAT}-{seq:012d}"
+
+class SnapshotWriter:
+    """Collects the arrays, JSON values and documents of one index snapshot, then writes them.
+
+    Everything is copied or frozen when collected, so write can run in a
+    thread while the index keeps changing. Files go into a temporary
+    directory, which is renamed into place once the manifest is written.
+    """
+
+    def __init__(self, root: str, seq: int):
+        self.root = root
+        self.seq = seq
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._json: Dict[str, str] = {}
+        self._documents: Dict[str, DocumentStore] = {}
+
+    def array(self, name: str, array: np.ndarray):
+        self._arrays[name] = np.array(array)
+
+    def json(self, name: str, value):
+        self._json[name] = json.dumps(value, ensure_ascii=False)
+
+    def documents(self, name: str, store: DocumentStore):
+        self._documents[name] = store.frozen()
+
+    def write(self, keep: int) -> str:
+        """Write the snapshot, then drop all but the keep newest; returns its directory"""
+        os.makedirs(self.root, exist_ok=True)
+        temp = tempfile.mkdtemp(prefix=TEMP_PREFIX, dir=self.root)
+        try:
+            for name, array in self._arrays.items():
+                np.save(os.path.join(temp, f"{name}.npy"), array, allow_pickle=False)
+            for name, text in self._json.items():
+                with open(os.path.join(temp, f"{name}.json"), "w", encoding="utf-8") as f:
+                    f.write(text)
+            for name, store in self._documents.items():
+                _write_documents(temp, name, store)
+            manifest = {
+                "format": SNAPSHOT_FORMAT,
+                "seq": self.seq,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            with open(os.path.join(temp, MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            path = os.path.join(self.root, snapshot_name(self.seq))
+            os.rename(temp, path)
+        except BaseException:
+            shutil.rmtree(temp, ignore_errors=True)
+            raise
+        prune_snapshots(self.root, keep)
+        return path
+
+class SnapshotReader:
+    """One snapshot directory. Arrays and documents are memory-mapped rather than read,
+    so only the pages a process touches are loaded, and processes restoring the
+    same snapshot share them."""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") != SNAPSHOT_FORMAT:
+                raise SnapshotError(f"{path} is in snapshot format {manifest.get('format')}")
+            self.seq = int(manifest["seq"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            raise SnapshotError(f"No readable manifest in {path}: {e}")
+
+    def array(self, name: str, writable: bool = False) -> np.ndarray:
+        """A mapped array; writable ones are copy-on-write, so changes stay private to this process"""
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="c" if writable else "r", allow_pickle=False)
+
+    def json(self, name: str):
+        with open(os.path.join(self.path, f"{name}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def documents(self, name: str) -> DocumentStore:
+        offsets = self.array(f"{name}_offsets")
+        with open(os.path.join(self.path, f"{name}.bin"), "rb") as f:
+            # The mapping stays valid after the file is closed (or deleted)
+            blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if offsets[-1] else b""
+        return DocumentStore(blob, offsets)
+
+def _write_documents(directory: str, name: str, store: DocumentStore):
+    """Documents as one blob of concatenated JSON plus the offset of each slot in it"""
+    offsets = np.zeros(len(store) + 1, dtype=np.int64)
+    with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+        for slot in range(len(store)):
+            encoded = store.encoded(slot)
+            f.write(encoded)
+            offsets[slot + 1] = offsets[slot] + len(encoded)
+    np.save(os.path.join(directory, f"{name}_offsets.npy"), offsets, allow_pickle=False)
+
+def _snapshot_dirs(root: str):
+    """Snapshot directories in the current format, newest first"""
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        return []
+    prefix = snapshot_name(0)[:-12]
+    return sorted((name for name in names if name.startswith(prefix)), reverse=True)
+
+def latest_snapshot(root: str) -> Optional[SnapshotReader]:
+    """The newest readable snapshot under root, if any"""
+    for name in _snapshot_dirs(root):
+        try:
+            return SnapshotReader(os.path.join(root, name))
+        except SnapshotError as e:
+            print(f"[Snapshot] Skipping {name}: {e}")
+    return None
+
+def prune_snapshots(root: str, keep: int):
+    """Remove all but the keep newest snapshots, older formats and leftover temporary
+    directories (the caller holds the snapshot lock, so no write is in progress)"""
+    kept = set(_snapshot_dirs(root)[:max(keep, 1)])
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name not in kept and os.path.isdir(path) and (name.startswith(TEMP_PREFIX) or name[:1] == "v"):
+            shutil.rmtree(path, ignore_errors=True)
+
+@contextmanager
+def snapshot_lock(root: str) -> Iterator[bool]:
+    """Take the lock of the snapshot directory unless another process holds it; yields whether it did"""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_FILE), "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,271 @@
+import asyncio
+import bisect
+import heapq
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..utils.search_utils import fold_text
+
+# Popularity of a phrase: TITLE_WEIGHT per live job with that title plus
+# SEARCH_WEIGHT per past search for it that found something
+TITLE_WEIGHT = 1.0
+SEARCH_WEIGHT = 2.0
+
+# Suggestions kept per prefix. Prefixes up to PRECOMPUTED_PREFIX_LENGTH
+# characters, and longer ones matching more than SCAN_LIMIT entries at build
+# time, have their top TOP_K stored; the rest are ranked on lookup.
+TOP_K = 10
+PRECOMPUTED_PREFIX_LENGTH = 6
+SCAN_LIMIT = 64
+MAX_PHRASE_LENGTH = 80
+
+# Sorts after every character a folded prefix can continue with
+PREFIX_END = "\U0010ffff"
+
+def normalize_phrase(text: Optional[str]) -> str:
+    return " ".join(fold_text(text).split())[:MAX_PHRASE_LENGTH]
+
+def normalize_prefix(text: Optional[str]) -> str:
+    folded = fold_text(text)
+    prefix = " ".join(folded.split())
+    # A trailing space ends the last word: "java " must not suggest "javascript"
+    if prefix and folded[-1].isspace():
+        prefix += " "
+    return prefix
+
+def phrase_suffixes(phrase: str) -> List[str]:
+    """The phrase from each word start, so "dev" finds "python developer" too"""
+    suffixes = [phrase]
+    suffixes.extend(phrase[i + 1:] for i, char in enumerate(phrase) if char == " ")
+    return list(dict.fromkeys(suffixes))
+
+class SuggestionIndex:
+    """Autocomplete over live job titles and past searches.
+
+    Every phrase is stored once per word start as a (suffix, phrase) pair
+    in a sorted list, so a prefix is a bisect range. The best TOP_K phrases
+    of each short or crowded prefix are precomputed, making most lookups one
+    dict access; other prefixes rank their few entries directly.
+    Weight changes update only the prefixes of the changed phrase; when a
+    listed phrase loses weight, the prefix is recomputed on its next lookup.
+
+    Replacing all title or search counts builds a new index: rebuild does
+    that in a thread, replays the changes made meanwhile onto it and swaps
+    it in, so lookups never wait for the sort.
+    """
+
+    def __init__(self):
+        self._titles: Counter = Counter()
+        self._searches: Counter = Counter()
+        self._weights: Dict[str, float] = {}
+        self._display: Dict[str, str] = {}
+        self._entries: List[Tuple[str, str]] = []
+        self._top: Dict[str, List[str]] = {}
+        self._stale: Set[str] = set()
+        # Changes made while a replacement is being built: (add_title or add_search, text, delta)
+        self._journal: Optional[List[Tuple[str, Optional[str], int]]] = None
+        self._rebuilding = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    @staticmethod
+    def build(titles: Iterable[Tuple[Optional[str], int]],
+              searches: Iterable[Tuple[Optional[str], int]]) -> "SuggestionIndex":
+        """A new index of (job title, number of jobs) and (search text, count) pairs.
+
+        It shares nothing with existing indexes, so it can be built in a thread.
+        """
+        fresh = SuggestionIndex()
+        # Job titles read better than typed searches, so they win the display
+        for counter, counts in ((fresh._titles, titles), (fresh._searches, searches)):
+            for text, count in counts:
+                phrase = normalize_phrase(text)
+                if phrase and count > 0:
+                    counter[phrase] += count
+                    fresh._display.setdefault(phrase, " ".join(text.split()))
+        fresh._rebuild()
+        return fresh
+
+    async def rebuild(self, titles: Optional[Iterable[Tuple[Optional[str], int]]] = None,
+                      searches: Optional[Iterable[Tuple[Optional[str], int]]] = None):
+        """Replace the title and/or search counts (None keeps the current ones), building the new index in a thread"""
+        async with self._rebuilding:
+            current_titles, current_searches = self.counts()
+            self._journal = []
+            try:
+                fresh = await asyncio.to_thread(
+                    SuggestionIndex.build,
+                    current_titles if titles is None else list(titles),
+                    current_searches if searches is None else list(searches),
+                )
+                self.swap(fresh)
+            finally:
+                self._journal = None
+
+    def counts(self) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+        """The title and search counts as (display text, count) pairs"""
+        return (
+            [(self._display[phrase], count) for phrase, count in self._titles.items()],
+            [(self._display[phrase], count) for phrase, count in self._searches.items()],
+        )
+
+    def swap(self, fresh: "SuggestionIndex"):
+        """Take over the contents of fresh, with the changes journaled since the build started"""
+        journal = self._journal or []
+        for method, text, delta in journal:
+            getattr(fresh, method)(text, delta)
+        fresh._journal, fresh._rebuilding = self._journal, self._rebuilding
+        self.__dict__.update(fresh.__dict__)
+
+    def load_titles(self, titles: Iterable[Optional[str]]):
+        """Replace the title counts on the calling thread, e.g. in scripts"""
+        self.swap(SuggestionIndex.build(((title, 1) for title in titles), self.counts()[1]))
+
+    def load_searches(self, counts: Iterable[Tuple[Optional[str], int]]):
+        """Replace the search counts with (search text, count) pairs, on the calling thread"""
+        self.swap(SuggestionIndex.build(self.counts()[0], counts))
+
+    def add_title(self, title: Optional[str], delta: int = 1):
+        """Count a job with this title in (delta=1) or out (delta=-1)"""
+        if self._journal is not None:
+            self._journal.append(("add_title", title, delta))
+        phrase = normalize_phrase(title)
+        if not phrase:
+            return
+        self._titles[phrase] = max(self._titles[phrase] + delta, 0)
+        if not self._titles[phrase]:
+            del self._titles[phrase]
+        if delta > 0:
+            # Job titles read better than typed searches, so they win the display
+            self._display[phrase] = " ".join(title.split())
+        self._reweigh(phrase)
+
+    def add_search(self, text: Optional[str], count: int = 1):
+        if self._journal is not None:
+            self._journal.append(("add_search", text, count))
+        phrase = normalize_phrase(text)
+        if not phrase:
+            return
+        self._searches[phrase] += count
+        self._display.setdefault(phrase, " ".join(text.split()))
+        self._reweigh(phrase)
+
+    def suggest(self, text: Optional[str], limit: int = TOP_K) -> List[str]:
+        """The most popular phrases with a word starting with text, best first"""
+        prefix = normalize_prefix(text)
+        if not prefix or limit <= 0:
+            return []
+        if prefix in self._stale:
+            self._recompute(prefix)
+        top = self._top.get(prefix)
+        if top is None:
+            # Short prefixes are always stored, so a missing one has no matches
+            top = [] if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH else self._rank(self._range(prefix), limit)
+        return [self._display[phrase] for phrase in top[:limit]]
+
+    def _weight(self, phrase: str) -> float:
+        return TITLE_WEIGHT * self._titles.get(phrase, 0) + SEARCH_WEIGHT * self._searches.get(phrase, 0)
+
+    def _rank_key(self, phrase: str) -> Tuple[float, str]:
+        return -self._weights[phrase], phrase
+
+    def _rank(self, phrases: Iterable[str], k: int) -> List[str]:
+        return heapq.nsmallest(k, set(phrases), key=self._rank_key)
+
+    def _range(self, prefix: str) -> Iterable[str]:
+        lo = bisect.bisect_left(self._entries, (prefix,))
+        hi = bisect.bisect_left(self._entries, (prefix + PREFIX_END,), lo)
+        return (phrase for _, phrase in self._entries[lo:hi])
+
+    def _rebuild(self):
+        phrases = set(self._titles) | set(self._searches)
+        self._weights = {phrase: self._weight(phrase) for phrase in phrases}
+        self._display = {phrase: self._display[phrase] for phrase in phrases}
+        self._entries = sorted(
+            (suffix, phrase) for phrase in phrases for suffix in phrase_suffixes(phrase)
+        )
+        self._top = {}
+        self._stale = set()
+        # Split the sorted entries into one range per prefix, one character
+        # deeper each round, following only ranges that need a stored list
+        ranges = [(0, len(self._entries), "")]
+        while ranges:
+            lo, hi, parent = ranges.pop()
+            length = len(parent) + 1
+            i = lo
+            while i < hi:
+                suffix = self._entries[i][0]
+                if len(suffix) < length:
+                    i += 1
+                    continue
+                prefix = suffix[:length]
+                j = bisect.bisect_left(self._entries, (prefix + PREFIX_END,), i, hi)
+                if length <= PRECOMPUTED_PREFIX_LENGTH or j - i > SCAN_LIMIT:
+                    self._top[prefix] = self._rank((phrase for _, phrase in self._entries[i:j]), TOP_K)
+                    ranges.append((i, j, prefix))
+                i = j
+
+    def _recompute(self, prefix: str):
+        # An emptied list stays stored, so the crowded prefixes below it are still kept current
+        self._stale.discard(prefix)
+        self._top[prefix] = self._rank(self._range(prefix), TOP_K)
+
+    def _reweigh(self, phrase: str):
+        old = self._weights.get(phrase, 0.0)
+        new = self._weight(phrase)
+        if new == old:
+            return
+        suffixes = phrase_suffixes(phrase)
+        if not old:
+            for suffix in suffixes:
+                bisect.insort(self._entries, (suffix, phrase))
+        if new:
+            self._weights[phrase] = new
+        else:
+            for suffix in suffixes:
+                position = bisect.bisect_left(self._entries, (suffix, phrase))
+                del self._entries[position]
+
+        for prefix in self._stored_prefixes(suffixes):
+            if prefix in self._stale:
+                continue
+            if new > old:
+                top = self._top.setdefault(prefix, [])
+                if phrase not in top:
+                    top.append(phrase)
+                top.sort(key=self._rank_key)
+                del top[TOP_K:]
+                continue
+            top = self._top.get(prefix)
+            if top and phrase in top:
+                if len(top) < TOP_K:
+                    # A short list holds every candidate, so it stays exact
+                    if new:
+                        top.sort(key=self._rank_key)
+                    else:
+                        top.remove(phrase)
+                else:
+                    # A phrase outside the list may now outrank this one
+                    self._stale.add(prefix)
+
+        if not new:
+            del self._weights[phrase]
+            self._display.pop(phrase, None)
+
+    def _stored_prefixes(self, suffixes: List[str]) -> Set[str]:
+        """Prefixes of the suffixes that have (or, if short, get) a stored list"""
+        prefixes = set()
+        for suffix in suffixes:
+            for length in range(1, len(suffix) + 1):
+                prefix = suffix[:length]
+                # Crowded ranges nest, so past a prefix without a list no longer one has one
+                if length > PRECOMPUTED_PREFIX_LENGTH and prefix not in self._top:
+                    break
+                prefixes.add(prefix)
+        return prefixes
+
+# Shared by the search endpoints and the workers that keep it current
+suggestion_index = SuggestionIndex()
+
+def get_suggestion_index() -> SuggestionIndex:
+    return suggestion_index
@@ -2,6 +2,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api.v1.router import api_router
 from .core.database import connect_to_mongo, close_mongo_connection
+from .core.cache import close_cache
+from .index.shards import get_shard_pool
+from .workers.job_index_worker import JobIndexWorker
+from .workers.suggestion_worker import SuggestionWorker
+from .workers.search_stats_worker import SearchStatsWorker
+from .utils.deadline import get_deadline_metrics
+import asyncio
 
 app = FastAPI(
     title="Job Search Service",
@@ -25,10 +32,16 @@ app.include_router(api_router, prefix="/api/v1")
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongo()
+    # Build the job index in the background and keep it warm from job events
+    asyncio.create_task(JobIndexWorker().start())
+    asyncio.create_task(SuggestionWorker().start())
+    asyncio.create_task(SearchStatsWorker().start())
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     await close_mongo_connection()
+    await close_cache()
+    get_shard_pool().close()
 
 @app.get("/")
 async def root():
@@ -37,3 +50,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics/deadlines")
+async def deadline_metrics():
+    """Searches answered partially to meet their deadline, by skipped stage"""
+    return get_deadline_metrics().to_dict()
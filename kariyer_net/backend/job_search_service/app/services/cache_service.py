@@ -1,6 +1,22 @@
+import hashlib
 import json
-from typing import Optional, Any
+import time
+from typing import Iterable, List, Optional, Any
 from ..core.cache import get_cache
+from ..core.config import settings
+from ..dto.search_dto import SearchDTO
+from ..utils.search_utils import fold_text, job_places, location_filters
+
+# Cached search results are grouped in one hash per location scope, so a
+# job change only drops the scopes its old or new location can match
+SEARCH_RESULTS_PREFIX = "search:results:"
+# Sorted set of the scopes with a hash, scored by when that hash expires
+SEARCH_SCOPES_KEY = "search:scopes"
+# Field of a scope hash holding the event seq it was last invalidated at
+INVALIDATED_SEQ_FIELD = "invalidated_seq"
+ANY_LOCATION_SCOPE = "*"
+PLACE_SCOPE_PREFIX = "place:"
+SCAN_BATCH_SIZE = 500
 
 class CacheService:
     def __init__(self):
@@ -8,17 +24,151 @@ class CacheService:
 
     async def get_cached_jobs(self, cache_key: str) -> Optional[Any]:
         """Get cached job search results"""
-        cached_data = self.cache.get(cache_key)
+        cached_data = await self.cache.get(cache_key)
         if cached_data:
             return json.loads(cached_data)
         return None
 
     async def cache_jobs(self, cache_key: str, jobs_data: Any, expire_time: int = 3600):
         """Cache job search results"""
-        self.cache.setex(cache_key, expire_time, json.dumps(jobs_data))
+        await self.cache.setex(cache_key, expire_time, json.dumps(jobs_data))
 
     async def invalidate_cache(self, pattern: str):
         """Invalidate cache by pattern"""
-        keys = self.cache.keys(pattern)
-        if keys:
-            self.cache.delete(*keys) 
\ No newline at end of file
+        # SCAN walks the keyspace incrementally instead of blocking Redis like KEYS
+        batch = []
+        async for key in self.cache.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                await self.cache.unlink(*batch)
+                batch = []
+        if batch:
+            await self.cache.unlink(*batch)
+
+    async def get_search_result(self, search_dto: SearchDTO, skip: int, limit: int,
+                                cursor: Optional[str] = None) -> Optional[dict]:
+        """Return the cached page and total for a search, or None on a miss"""
+        try:
+            cached_data, invalidated_seq = await self.cache.hmget(
+                SEARCH_RESULTS_PREFIX + search_scope(search_dto),
+                [search_fingerprint(search_dto, skip, limit, cursor), INVALIDATED_SEQ_FIELD],
+            )
+        except Exception as e:
+            print(f"[CacheService] Search cache read failed: {e}")
+            return None
+        if not cached_data:
+            return None
+        entry = json.loads(cached_data)
+        # Entries share their hash's expiry, so each one carries its own deadline
+        if entry["expires_at"] < time.time():
+            return None
+        # Computed before the last job event of its scope, but written after that event's invalidation
+        if invalidated_seq is not None and entry.get("seq", -1) < int(invalidated_seq):
+            return None
+        return entry["result"]
+
+    async def cache_search_result(self, search_dto: SearchDTO, skip: int, limit: int, result: dict,
+                                  cursor: Optional[str] = None, seq: int = 0):
+        """Store the page and total of a search under its scope, tagged with the index seq it was computed at"""
+        ttl = search_ttl(search_dto)
+        scope = search_scope(search_dto)
+        now = time.time()
+        entry = {"expires_at": now + ttl, "seq": seq, "result": result}
+        try:
+            pipe = self.cache.pipeline(transaction=False)
+            pipe.hset(
+                SEARCH_RESULTS_PREFIX + scope, search_fingerprint(search_dto, skip, limit, cursor), json.dumps(entry)
+            )
+            pipe.expire(SEARCH_RESULTS_PREFIX + scope, settings.SEARCH_CACHE_TTL)
+            pipe.zadd(SEARCH_SCOPES_KEY, {scope: now + settings.SEARCH_CACHE_TTL})
+            # Scopes whose hash expired on its own
+            pipe.zremrangebyscore(SEARCH_SCOPES_KEY, "-inf", now)
+            pipe.expire(SEARCH_SCOPES_KEY, settings.SEARCH_CACHE_TTL)
+            await pipe.execute()
+        except Exception as e:
+            print(f"[CacheService] Search cache write failed: {e}")
+
+    async def invalidate_job_searches(self, jobs: Iterable[Optional[dict]], seq: int = 0):
+        """Drop cached searches any of these job versions could appear in.
+
+        Pass both the old and the new version of a changed job, and the
+        seq of the event that changed it. Searches without a location
+        filter are always dropped.
+        """
+        job_keys = []
+        for job in jobs:
+            if job:
+                job_keys.append(fold_text(job.get("location")))
+                job_keys.extend(PLACE_SCOPE_PREFIX + place for place in job_places(job))
+        try:
+            scopes = await self.cache.zrangebyscore(SEARCH_SCOPES_KEY, time.time(), "+inf")
+            stale = [
+                scope for scope in scopes
+                if scope == ANY_LOCATION_SCOPE or any(scope in key for key in job_keys)
+            ]
+            await self._drop_scopes(stale, seq)
+        except Exception as e:
+            print(f"[CacheService] Search cache invalidation failed: {e}")
+
+    async def invalidate_all_searches(self, seq: int = 0):
+        """Drop every cached search, e.g. after the index was reloaded up to seq"""
+        try:
+            await self._drop_scopes(await self.cache.zrange(SEARCH_SCOPES_KEY, 0, -1), seq)
+        except Exception as e:
+            print(f"[CacheService] Search cache invalidation failed: {e}")
+
+    async def _drop_scopes(self, scopes: Iterable[str], seq: int):
+        """Replace each scope's hash by a marker of seq, so that results computed
+        before it and written late are ignored until the hash expires"""
+        scopes = list(scopes)
+        if not scopes:
+            return
+        expires_at = time.time() + settings.SEARCH_CACHE_TTL
+        pipe = self.cache.pipeline(transaction=True)
+        pipe.zadd(SEARCH_SCOPES_KEY, {scope: expires_at for scope in scopes})
+        for scope in scopes:
+            pipe.unlink(SEARCH_RESULTS_PREFIX + scope)
+            pipe.hset(SEARCH_RESULTS_PREFIX + scope, INVALIDATED_SEQ_FIELD, seq)
+            pipe.expire(SEARCH_RESULTS_PREFIX + scope, settings.SEARCH_CACHE_TTL)
+        await pipe.execute()
+
+def search_scope(search_dto: SearchDTO) -> str:
+    """The location filter that decides which job changes can affect a search.
+
+    Every place filter must be among a matching job's places and every
+    other location filter a substring of its location, so one of them
+    alone is enough to rule jobs out: the most specific place, else the
+    longest substring.
+    """
+    places, needles = location_filters(search_dto)
+    if places:
+        return PLACE_SCOPE_PREFIX + max(places, key=len)
+    return max(needles, key=len) if needles else ANY_LOCATION_SCOPE
+
+def search_fingerprint(search_dto: SearchDTO, skip: int, limit: int, cursor: Optional[str] = None) -> str:
+    """Hash of the filters that change the result, folded like job_matches compares them"""
+    work_modes: List[str] = sorted({
+        fold_text(mode.strip()) for mode in search_dto.work_mode.split(',')
+    }) if search_dto.work_mode else []
+    normalized = {
+        "query": fold_text(search_dto.query) if search_dto.query else None,
+        "location": fold_text(search_dto.location) if search_dto.location else None,
+        "country": fold_text(search_dto.country) if search_dto.country else None,
+        "city": fold_text(search_dto.city) if search_dto.city else None,
+        "district": fold_text(search_dto.district) if search_dto.district else None,
+        "company": fold_text(search_dto.company) if search_dto.company else None,
+        "work_mode": work_modes,
+        "date_filter": search_dto.date_filter or None,
+        "salary_min": search_dto.salary_min,
+        "salary_max": search_dto.salary_max,
+        "sort_by": search_dto.sort_by or "relevance",
+        "skip": skip,
+        "limit": limit,
+        "cursor": cursor,
+    }
+    return hashlib.sha1(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+def search_ttl(search_dto: SearchDTO) -> int:
+    if search_dto.date_filter:
+        return settings.SEARCH_CACHE_DATE_FILTER_TTL
+    return settings.SEARCH_CACHE_TTL
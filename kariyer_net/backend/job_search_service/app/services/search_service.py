@@ -2,134 +2,113 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from typing import List, Optional
 from ..models.search_history import SearchHistory, SearchHistoryInDB
 from ..dto.search_dto import SearchDTO
-from ..core.cache import get_cache
-from datetime import datetime, timedelta
-import httpx
-import os
+from ..core.config import settings
+from ..index.job_index import get_job_index
+from ..index.shards import ShardPoolError, get_shard_pool
+from ..index.suggestions import get_suggestion_index
+from ..analytics.search_stats import get_search_stats
+from ..core.history_writer import get_history_writer, recent_searches_updates
+from ..utils.cursor import decode_cursor, encode_cursor
+from ..utils.deadline import Deadline
+from .cache_service import CacheService
+from datetime import datetime
+
+class CatalogNotReadyError(Exception):
+    """The local job catalog replica has not finished its first load"""
 
 class SearchService:
     def __init__(self):
-        self.cache = get_cache()
+        self.cache_service = CacheService()
+        self.index = get_job_index()
+        self.shards = get_shard_pool()
+        self.suggestions = get_suggestion_index()
+        self.stats = get_search_stats()
+        self.history_writer = get_history_writer()
+
+    async def execute_search(self, db: AsyncIOMotorClient, search_dto: SearchDTO, skip: int = 0, limit: int = 10,
+                             cursor: Optional[str] = None, deadline: Optional[Deadline] = None) -> dict:
+        """Run one filter pass over the local catalog replica and return the page, total count, next cursor
+        and, when the query only matched with typos tolerated, the corrected query.
+
+        With a cursor from a previous page the page starts right behind
+        that page's last job instead of at skip, so deep pages cost the
+        same as the first and do not shift when jobs are added. Index
+        results are cached per search fingerprint and page; the index
+        worker drops them when a job they could contain changes.
+
+        Cache reads and writes only get what is left of deadline, and the
+        index cuts stages short once it has passed (see deadline.skipped);
+        such partial results are not cached.
+
+        Counting stops at settings.SEARCH_COUNT_CAP for very broad queries;
+        total_is_capped then marks total_results as a lower bound.
+        """
+        if not self.index.ready:
+            raise CatalogNotReadyError("Job catalog is still loading")
+        deadline = deadline or Deadline()
+        after = decode_cursor(cursor) if cursor else None
+        cached = await deadline.within(
+            self.cache_service.get_search_result(search_dto, skip, limit, cursor), "cache_read"
+        )
+        if cached is not None:
+            return cached
+        seq = self.index.seq
+        jobs, total, capped, last, corrected = await self.search_page(
+            search_dto, skip, limit, after, settings.SEARCH_COUNT_CAP, deadline
+        )
+        result = {
+            "jobs": jobs,
+            "total_results": total,
+            "total_is_capped": capped,
+            "next_cursor": encode_cursor(last) if last else None,
+            "corrected_query": corrected,
+        }
+        if not deadline.partial:
+            await deadline.within(
+                self.cache_service.cache_search_result(search_dto, skip, limit, result, cursor, seq), "cache_write"
+            )
+        return result
+
+    async def search_page(self, search_dto: SearchDTO, skip: int, limit: int, after: Optional[dict],
+                          count_cap: int, deadline: Deadline):
+        """Search the shard processes when they are up, else the main index"""
+        if self.shards.usable:
+            try:
+                return await self.shards.search_page(self.index, search_dto, skip, limit, after, count_cap, deadline)
+            except ShardPoolError as e:
+                print(f"[SearchService] Shards unavailable, searching the main index: {e}")
+        return self.index.search_page(search_dto, skip, limit, after, count_cap, deadline)
+
+    async def get_facets(self, search_dto: SearchDTO, limit: int = 10,
+                         deadline: Optional[Deadline] = None) -> Optional[dict]:
+        """Count the jobs matching search_dto per city, company, work mode, date filter and salary range.
+
+        None once deadline has expired (noted as skipped on it).
+        """
+        if not self.index.ready:
+            raise CatalogNotReadyError("Job catalog is still loading")
+        if deadline is not None and deadline.expired():
+            deadline.skip("facets")
+            return None
+        if self.shards.usable:
+            try:
+                return await self.shards.facets(search_dto, limit)
+            except ShardPoolError as e:
+                print(f"[SearchService] Shards unavailable, counting facets on the main index: {e}")
+        return self.index.facets(search_dto, limit)
 
     async def search_jobs(self, db: AsyncIOMotorClient, search_dto: SearchDTO, skip: int = 0, limit: int = 10) -> List[dict]:
-        """Search for jobs from job posting service with comprehensive filtering and pagination support"""
-        # JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting_service:8000")
-        JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting_service:8000")
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                # Get all jobs from job posting service
-                resp = await client.get(f"{JOB_POSTING_SERVICE_URL}/api/v1/jobs/")
-                resp.raise_for_status()
-                all_jobs = resp.json()
-                
-                # Filter jobs based on search criteria
-                filtered_jobs = self._filter_jobs(all_jobs, search_dto)
-                
-                # Apply pagination
-                return filtered_jobs[skip:skip+limit]
-                
-        except Exception as e:
-            print(f"Error fetching jobs from job posting service: {e}")
-            # Fallback to mock data for assignment demonstration
-            return [
-                {
-                    "id": 1,
-                    "title": search_dto.query or "Sample Job",
-                    "location": search_dto.location or "Istanbul",
-                    "company": "Sample Company"
-                }
-            ]
+        """Search the local job catalog replica with comprehensive filtering and pagination support"""
+        result = await self.execute_search(db, search_dto, skip=skip, limit=limit)
+        return result["jobs"]
 
     async def get_total_count(self, db: AsyncIOMotorClient, search_dto: SearchDTO) -> int:
         """Get total count of jobs matching the search criteria (without pagination)"""
-        # JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting_service:8000")
-        JOB_POSTING_SERVICE_URL = os.getenv("JOB_POSTING_SERVICE_URL", "http://job_posting_service:8000")
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                # Get all jobs from job posting service
-                resp = await client.get(f"{JOB_POSTING_SERVICE_URL}/api/v1/jobs/")
-                resp.raise_for_status()
-                all_jobs = resp.json()
-                
-                # Apply same filtering logic as search_jobs but without pagination
-                filtered_jobs = self._filter_jobs(all_jobs, search_dto)
-                return len(filtered_jobs)
-                
-        except Exception as e:
-            print(f"Error getting total count: {e}")
-            return 0
-
-    def _filter_jobs(self, all_jobs: List[dict], search_dto: SearchDTO) -> List[dict]:
-        """Helper method to filter jobs based on search criteria"""
-        filtered_jobs = []
-        for job in all_jobs:
-            # Filter by query (title/description)
-            if search_dto.query and search_dto.query.lower() not in job.get('title', '').lower():
-                continue
-            
-            # Filter by location
-            if search_dto.location and search_dto.location.lower() not in job.get('location', '').lower():
-                continue
-            
-            # Filter by work mode
-            if search_dto.work_mode:
-                work_modes = [mode.strip() for mode in search_dto.work_mode.split(',')]
-                job_mode = job.get('work_mode', '').lower()
-                if not any(mode.lower() in job_mode for mode in work_modes):
-                    continue
-            
-            # Filter by date
-            if search_dto.date_filter:
-                job_created = job.get('created_at')
-                print(f"Date filter: {search_dto.date_filter}, Job {job.get('id')} created_at: {job_created}")
-                if job_created:
-                    try:
-                        # Handle different date formats
-                        if 'T' in job_created:
-                            job_date = datetime.fromisoformat(job_created.replace('Z', '+00:00'))
-                        else:
-                            job_date = datetime.fromisoformat(job_created)
-                        
-                        now = datetime.now(job_date.tzinfo)
-                        
-                        if search_dto.date_filter == 'today':
-                            if job_date.date() != now.date():
-                                print(f"  Job {job.get('id')} filtered out: not today")
-                                continue
-                        elif search_dto.date_filter == '3hours':
-                            if now - job_date > timedelta(hours=3):
-                                print(f"  Job {job.get('id')} filtered out: older than 3 hours")
-                                continue
-                        elif search_dto.date_filter == '8hours':
-                            if now - job_date > timedelta(hours=8):
-                                print(f"  Job {job.get('id')} filtered out: older than 8 hours")
-                                continue
-                        print(f"  Job {job.get('id')} passed date filter")
-                    except Exception as e:
-                        print(f"Date parsing error for job {job.get('id')}: {e}")
-                        # If date parsing fails, skip date filtering
-                        pass
-                else:
-                    print(f"  Job {job.get('id')} has no created_at field")
-                    # If no created_at field, skip date filtering
-                    pass
-            
-            # Filter by country/city/district
-            if search_dto.country and search_dto.country.lower() not in job.get('location', '').lower():
-                continue
-            if search_dto.city and search_dto.city.lower() not in job.get('location', '').lower():
-                continue
-            if search_dto.district and search_dto.district.lower() not in job.get('location', '').lower():
-                continue
-            
-            filtered_jobs.append(job)
-        
-        return filtered_jobs
+        result = await self.execute_search(db, search_dto, skip=0, limit=0)
+        return result["total_results"]
 
     async def save_search_history(self, db: AsyncIOMotorClient, user_id: int, search_dto: SearchDTO, results_count: int):
-        """Save search history to MongoDB"""
+        """Save search history to MongoDB through the write-behind buffer"""
         # Only save if at least one meaningful field is present
         if not (search_dto.query or search_dto.location or search_dto.city or search_dto.country or search_dto.district):
             print("[DEBUG] Not saving empty search to history.")
@@ -145,21 +124,38 @@ class SearchService:
         # Convert to dict for MongoDB
         search_data = search_history.dict()
         search_data["results_count"] = results_count
-        try:
-            insertion = db.job_search.search_history.insert_one(search_data)
-            if hasattr(insertion, '__await__'):
-                await insertion
-            print("[DEBUG] Search history inserted successfully.")
-        except Exception as e:
-            print(f"[ERROR] Failed to insert search history: {e}")
+        if self.history_writer.running:
+            if not await self.history_writer.write(search_data):
+                return
+        else:
+            try:
+                insertion = db.job_search.search_history.insert_one(search_data)
+                if hasattr(insertion, '__await__'):
+                    await insertion
+                await db.job_search.recent_searches.bulk_write(recent_searches_updates([search_data]))
+                print("[DEBUG] Search history inserted successfully.")
+            except Exception as e:
+                print(f"[ERROR] Failed to insert search history: {e}")
+                return
+        if results_count > 0:
+            self.suggestions.add_search(search_dto.query)
 
     async def get_user_search_history(self, db: AsyncIOMotorClient, user_id: int, limit: int = 10) -> List[dict]:
-        """Get user's search history from MongoDB"""
-        cursor = db.job_search.search_history.find(
-            {"user_id": user_id}
-        ).sort("created_at", -1).limit(limit)
-        
-        history = await cursor.to_list(length=limit)
+        """Get user's search history from MongoDB, newest first"""
+        history = None
+        if limit <= settings.RECENT_SEARCHES_PER_USER:
+            # One _id lookup of the user's capped recent_searches document
+            recent = await db.job_search.recent_searches.find_one(
+                {"_id": user_id}, {"searches": {"$slice": limit}}
+            )
+            if recent is not None:
+                history = [dict(search, user_id=user_id) for search in recent.get("searches", [])]
+        if history is None:
+            # Longer histories read the (user_id, created_at desc) index
+            cursor = db.job_search.search_history.find(
+                {"user_id": user_id}
+            ).sort("created_at", -1).limit(limit)
+            history = await cursor.to_list(length=limit)
         # Convert ObjectId to string for each document
         for doc in history:
             if "_id" in doc:
@@ -167,19 +163,29 @@ class SearchService:
         print(f"[DEBUG] get_user_search_history for user_id={user_id}: {history}")
         return history
 
-    async def get_search_suggestions(self, query: str) -> List[str]:
-        """Get search suggestions from cache"""
-        # This would typically use cached popular searches
-        return ["Software Engineer", "Data Scientist", "Product Manager"]
+    async def get_search_suggestions(self, query: str, limit: int = 10) -> List[str]:
+        """Get the most popular job titles and past searches with a word starting with query"""
+        return self.suggestions.suggest(query, limit)
+
+    def record_search(self, search_dto: SearchDTO, total_results: int):
+        """Count a search in the analytics windows"""
+        self.stats.record(search_dto.query, search_dto.location or search_dto.city, total_results)
+
+    async def get_popular_searches(self, window: str = "day", limit: int = 10) -> List[str]:
+        """Get the most searched queries of the last hour, day or week"""
+        return self.stats.popular_keywords(window, limit)
 
-    async def get_popular_searches(self) -> List[str]:
-        """Get popular searches from cache"""
-        return ["Software Engineer", "Data Scientist", "Product Manager"]
+    async def get_search_analytics(self, window: str = "day", limit: int = 10) -> dict:
+        """Get search totals and the most searched queries and locations of a window"""
+        return self.stats.summary(window, limit)
 
     async def delete_user_search_history(self, db: AsyncIOMotorClient, user_id: int):
         """Delete all search history for a user from MongoDB"""
         try:
+            # Buffered records would otherwise be written after the delete
+            await self.history_writer.discard_user(user_id)
             result = await db.job_search.search_history.delete_many({"user_id": user_id})
+            await db.job_search.recent_searches.delete_one({"_id": user_id})
             print(f"[DEBUG] Deleted {result.deleted_count} search history records for user_id={user_id}")
             return result.deleted_count
         except Exception as e:
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from typing import Awaitable, Dict, List, Optional
+
+# Remaining budget of a request in milliseconds, sent by the API gateway
+DEADLINE_HEADER = "X-Deadline-Ms"
+# Set on partial search results: the stages skipped to answer in time
+PARTIAL_HEADER = "X-Partial-Results"
+
+class Deadline:
+    """Time budget of one search, and what was cut short to stay within it.
+
+    Stages that change the result (typo fallback, ranking, facets) are
+    noted in skipped and make the result partial; awaits cut off by
+    within are noted in timed_out. Without a budget nothing expires.
+    """
+
+    def __init__(self, budget: Optional[float] = None):
+        self.expires_at = None if budget is None else time.monotonic() + budget
+        self.skipped: List[str] = []
+        self.timed_out: List[str] = []
+
+    @classmethod
+    def from_header(cls, value: Optional[str], default: Optional[float] = None) -> "Deadline":
+        """The budget an X-Deadline-Ms header grants, else default seconds"""
+        try:
+            return cls(max(int(value), 0) / 1000)
+        except (TypeError, ValueError):
+            return cls(default)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.skipped)
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def skip(self, stage: str):
+        if stage not in self.skipped:
+            self.skipped.append(stage)
+
+    async def within(self, awaitable: Awaitable, stage: str, default=None):
+        """The result of awaitable, or default when the budget runs out first"""
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            self.timed_out.append(stage)
+            return default
+
+class DeadlineMetrics:
+    """How often searches came back partial, and which stages were cut short"""
+
+    def __init__(self):
+        self.searches = 0
+        self.partial = 0
+        self.skipped: Dict[str, int] = {}
+        self.timed_out: Dict[str, int] = {}
+
+    def record(self, deadline: Deadline):
+        self.searches += 1
+        if deadline.partial:
+            self.partial += 1
+        for stage in deadline.skipped:
+            self.skipped[stage] = self.skipped.get(stage, 0) + 1
+        for stage in deadline.timed_out:
+            self.timed_out[stage] = self.timed_out.get(stage, 0) + 1
+
+    def to_dict(self) -> dict:
+        return {
+            "searches": self.searches,
+            "partial": self.partial,
+            "partial_ratio": round(self.partial / self.searches, 4) if self.searches else 0.0,
+            "skipped": dict(self.skipped),
+            "timed_out": dict(self.timed_out),
+        }
+
+deadline_metrics = DeadlineMetrics()
+
+def get_deadline_metrics() -> DeadlineMetrics:
+    return deadline_metrics
@@ -1,5 +1,12 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
 import re
+from .gazetteer import get_gazetteer
+
+# Turkish dotted and dotless I all fold to "i", so "İstanbul", "ISTANBUL"
+# and "ıstanbul" compare equal; str.lower() alone turns "İ" into "i" plus a
+# combining dot (U+0307), which is dropped as well. Ş and Ğ lower correctly.
+TURKISH_FOLD = str.maketrans({"İ": "i", "I": "i", "ı": "i", "\u0307": None})
 
 def build_search_query(filters: Dict[str, Any]) -> str:
     """Build search query from filters"""
@@ -22,4 +29,130 @@ def sanitize_search_term(term: str) -> str:
 
 def calculate_pagination_offset(page: int, limit: int) -> int:
     """Calculate pagination offset"""
-    return (page - 1) * limit 
\ No newline at end of file
+    return (page - 1) * limit 
+
+def fold_text(text: Optional[str]) -> str:
+    """Case-fold text for matching, with Turkish I/İ/ı handled"""
+    return (text or "").translate(TURKISH_FOLD).lower()
+
+def job_places(job: Dict[str, Any]) -> List[str]:
+    """Gazetteer place ids of a job's location, most specific first.
+
+    Jobs posted before locations were parsed at ingest carry no ids and
+    are parsed here instead.
+    """
+    gazetteer = get_gazetteer()
+    if not any(field in job for field in ("country_id", "city_id", "district_id")):
+        place = gazetteer.parse(job.get("location"))
+    else:
+        place = job
+    most_specific = place.get("district_id") or place.get("city_id") or place.get("country_id")
+    return gazetteer.lineage(most_specific)
+
+def location_filters(search_dto) -> Tuple[List[str], List[str]]:
+    """Split a SearchDTO's location filters into place ids and location substrings.
+
+    Country, city and district values the gazetteer recognizes filter by
+    place id, so "Istanbul" also finds jobs posted in "Kadıköy". Anything
+    else, and the free-text location filter, must be a substring of the
+    job's location.
+    """
+    gazetteer = get_gazetteer()
+    places, needles = [], []
+    if search_dto.location:
+        needles.append(fold_text(search_dto.location))
+    city = gazetteer.resolve_city(search_dto.city) if search_dto.city else None
+    resolved = [
+        (search_dto.country, gazetteer.resolve_country(search_dto.country) if search_dto.country else None),
+        (search_dto.city, city),
+        (search_dto.district, gazetteer.resolve_district(search_dto.district, city) if search_dto.district else None),
+    ]
+    for value, place in resolved:
+        if place:
+            places.append(place)
+        elif value:
+            needles.append(fold_text(value))
+    return places, needles
+
+def parse_job_date(created_at: Optional[str]) -> Optional[datetime]:
+    """Parse a job's created_at string, returning None if it is missing or invalid"""
+    if not created_at:
+        return None
+    try:
+        # Handle different date formats
+        if 'T' in created_at:
+            return datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        return datetime.fromisoformat(created_at)
+    except (TypeError, ValueError):
+        return None
+
+def matches_date_filter(job_date: Optional[datetime], date_filter: Optional[str]) -> bool:
+    """Check a parsed job date against a date filter (today, 3hours, 8hours)"""
+    if not date_filter or job_date is None:
+        # Jobs without a usable created_at are not filtered by date
+        return True
+    now = datetime.now(job_date.tzinfo)
+    if date_filter == 'today':
+        return job_date.date() == now.date()
+    if date_filter == '3hours':
+        return now - job_date <= timedelta(hours=3)
+    if date_filter == '8hours':
+        return now - job_date <= timedelta(hours=8)
+    return True
+
+def matches_salary(job: Dict[str, Any], salary_min: Optional[int], salary_max: Optional[int]) -> bool:
+    """Check whether a job's salary range overlaps the requested one.
+
+    A job missing one bound is treated as paying exactly the other, and
+    one posted with its bounds swapped as paying between them; jobs
+    without any salary never match a salary filter.
+    """
+    if salary_min is None and salary_max is None:
+        return True
+    low = job.get('salary_min')
+    high = job.get('salary_max')
+    low, high = (high if low is None else low), (low if high is None else high)
+    if high is None:
+        return False
+    low, high = min(low, high), max(low, high)
+    if salary_min is not None and high < salary_min:
+        return False
+    if salary_max is not None and low > salary_max:
+        return False
+    return True
+
+def job_matches(job: Dict[str, Any], search_dto) -> bool:
+    """Check whether a single job satisfies every filter of a SearchDTO"""
+    # Filter by query (title/description)
+    if search_dto.query and fold_text(search_dto.query) not in fold_text(job.get('title')):
+        return False
+
+    # Filter by location, country, city and district
+    places, needles = location_filters(search_dto)
+    location = fold_text(job.get('location'))
+    if any(needle not in location for needle in needles):
+        return False
+    if places and not set(places) <= set(job_places(job)):
+        return False
+
+    # Filter by work mode
+    if search_dto.work_mode:
+        work_modes = [mode.strip() for mode in search_dto.work_mode.split(',')]
+        job_mode = fold_text(job.get('work_mode'))
+        if not any(fold_text(mode) in job_mode for mode in work_modes):
+            return False
+
+    # Filter by date
+    if search_dto.date_filter:
+        if not matches_date_filter(parse_job_date(job.get('created_at')), search_dto.date_filter):
+            return False
+
+    # Filter by company
+    if search_dto.company and fold_text(search_dto.company) not in fold_text(job.get('company_name')):
+        return False
+
+    # Filter by salary
+    if not matches_salary(job, search_dto.salary_min, search_dto.salary_max):
+        return False
+
+    return True
@@ -0,0 +1 @@
+# Workers package
\ No newline at end of file
@@ -0,0 +1,248 @@
+import aio_pika
+import asyncio
+import httpx
+import json
+from typing import List, Optional
+from ..core.config import settings
+from ..core.queue import get_rabbitmq_connection
+from ..index.job_index import JobIndex, get_job_index
+from ..index.shards import get_shard_pool
+from ..index.snapshot import SnapshotError, SnapshotWriter, latest_snapshot, snapshot_lock
+from ..index.suggestions import get_suggestion_index
+from ..services.cache_service import CacheService
+
+class EventLogTrimmedError(Exception):
+    """job_posting_service no longer has the events the replica is missing"""
+
+class JobIndexWorker:
+    """Keeps the in-process catalog replica current.
+
+    Loads the catalog once from job_posting_service, then applies the job
+    events published on the job events exchange in sequence order. When
+    the "seq" header skips ahead, or the periodic check finds the replica
+    behind, the missed events are replayed from /jobs/events; if they were
+    already trimmed from the log the catalog is loaded again.
+
+    The index is snapshotted to INDEX_SNAPSHOT_DIR now and then. At startup
+    the newest snapshot is mapped and only the events after its seq are
+    replayed, so startup does not grow with the catalog.
+
+    With SEARCH_SHARDS set, every load also repartitions the index across
+    the shard processes and every event is forwarded to its shard.
+    """
+
+    def __init__(self):
+        self.index = get_job_index()
+        self.shards = get_shard_pool()
+        self.suggestions = get_suggestion_index()
+        self.cache_service = CacheService()
+        self.client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Bind to job events, bootstrap the index and follow the event stream"""
+        self.client = httpx.AsyncClient(base_url=settings.JOB_POSTING_SERVICE_URL, timeout=10.0)
+        queue = None
+        try:
+            # Bind before bootstrapping so no event published meanwhile is lost
+            queue = await self.bind_queue()
+        except Exception as e:
+            print(f"[JobIndexWorker] RabbitMQ unavailable, index will follow job events by polling only: {e}")
+
+        await self.bootstrap_until_ready()
+        asyncio.create_task(self.resync_periodically())
+        if settings.INDEX_SNAPSHOT_DIR:
+            asyncio.create_task(self.snapshot_periodically())
+        if queue is None:
+            return
+
+        async with queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                async with message.process():
+                    await self.handle_message(message)
+
+    async def bind_queue(self):
+        """Declare a private queue bound to every job event"""
+        connection = await get_rabbitmq_connection()
+        channel = await connection.channel()
+        exchange = await channel.declare_exchange(
+            settings.JOB_EVENTS_EXCHANGE, aio_pika.ExchangeType.TOPIC, durable=True
+        )
+        queue = await channel.declare_queue(exclusive=True)
+        await queue.bind(exchange, routing_key="job.*")
+        return queue
+
+    async def bootstrap_until_ready(self):
+        """Retry the initial load with backoff; searches return 503 until it succeeds"""
+        delay = 1
+        while not await self.bootstrap():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.INDEX_RESYNC_INTERVAL)
+
+    async def bootstrap(self) -> bool:
+        """Restore the newest snapshot, or else load the full catalog page by page into the index"""
+        try:
+            async with self._lock:
+                if not await self.restore_snapshot():
+                    # Read the seq first: events after it may or may not be in the
+                    # pages below, and replaying them on top is harmless
+                    last_seq = await self.fetch_last_seq()
+                    jobs = await self.fetch_catalog()
+                    active = [job for job in jobs if job.get("is_active", True)]
+                    # Built in a thread, so searches keep running on the old index meanwhile
+                    self.index.swap(await asyncio.to_thread(JobIndex.build, active, last_seq))
+                    await self.suggestions.rebuild(titles=[(job.get("title"), 1) for job in active])
+                    await self.replay()
+                if self.shards.enabled:
+                    await self.shards.load(self.index)
+        except Exception as e:
+            print(f"[JobIndexWorker] Failed to bootstrap job index: {e}")
+            return False
+        await self.cache_service.invalidate_all_searches(self.index.seq)
+        print(f"[JobIndexWorker] Indexed {len(self.index)} jobs up to event seq {self.index.seq}")
+        return True
+
+    async def restore_snapshot(self) -> bool:
+        """Restore the newest snapshot and replay the events after it (caller holds the lock).
+
+        False when there is no usable snapshot, or the events since it were
+        trimmed from the log; the catalog has to be loaded in full then.
+        """
+        if not settings.INDEX_SNAPSHOT_DIR:
+            return False
+        reader = latest_snapshot(settings.INDEX_SNAPSHOT_DIR)
+        if reader is None:
+            return False
+        try:
+            self.index.restore(reader)
+        except (SnapshotError, OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[JobIndexWorker] Could not restore snapshot {reader.path}: {e}")
+            return False
+        await self.suggestions.rebuild(titles=self.index.title_counts())
+        try:
+            await self.replay()
+        except EventLogTrimmedError as e:
+            print(f"[JobIndexWorker] Snapshot at seq {reader.seq} is too old ({e}), loading the catalog")
+            return False
+        print(f"[JobIndexWorker] Restored snapshot at seq {reader.seq}")
+        return True
+
+    async def fetch_last_seq(self) -> int:
+        resp = await self.client.get("/api/v1/jobs/events/seq")
+        resp.raise_for_status()
+        return resp.json()["last_seq"]
+
+    async def fetch_catalog(self) -> List[dict]:
+        """Page through the job list by cursor, so jobs posted meanwhile do not shift the pages"""
+        params = {"limit": settings.INDEX_BOOTSTRAP_PAGE_SIZE}
+        jobs = []
+        while True:
+            resp = await self.client.get("/api/v1/jobs/", params=params)
+            resp.raise_for_status()
+            jobs.extend(resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                return jobs
+            params["cursor"] = cursor
+
+    async def resync_periodically(self):
+        """Catch up even when no new message arrives to reveal a lost one"""
+        while True:
+            await asyncio.sleep(settings.INDEX_RESYNC_INTERVAL)
+            await self.resync()
+
+    async def resync(self):
+        """Replay the events the replica missed, reloading the catalog if they are gone"""
+        try:
+            async with self._lock:
+                await self.replay()
+                if self.shards.enabled and not self.shards.usable:
+                    print("[JobIndexWorker] Reloading the search shards")
+                    await self.shards.load(self.index)
+        except EventLogTrimmedError as e:
+            print(f"[JobIndexWorker] {e}, reloading the catalog")
+            await self.bootstrap()
+        except Exception as e:
+            print(f"[JobIndexWorker] Resync failed, will retry: {e}")
+
+    async def snapshot_periodically(self):
+        """Snapshot the index right away and then every INDEX_SNAPSHOT_INTERVAL seconds"""
+        while True:
+            await self.snapshot()
+            await asyncio.sleep(settings.INDEX_SNAPSHOT_INTERVAL)
+
+    async def snapshot(self):
+        """Write a snapshot unless the newest one is current or another worker process is writing one"""
+        root = settings.INDEX_SNAPSHOT_DIR
+        try:
+            with snapshot_lock(root) as locked:
+                if not locked or not self.index.ready:
+                    return
+                latest = latest_snapshot(root)
+                if latest is not None and latest.seq >= self.index.seq:
+                    return
+                async with self._lock:
+                    writer = SnapshotWriter(root, self.index.seq)
+                    self.index.save(writer)
+                # Encoding and writing the files does not hold up searches or events
+                path = await asyncio.to_thread(writer.write, settings.INDEX_SNAPSHOTS_KEPT)
+            print(f"[JobIndexWorker] Wrote index snapshot {path}")
+        except Exception as e:
+            print(f"[JobIndexWorker] Failed to write index snapshot: {e}")
+
+    async def replay(self):
+        """Apply every logged event after the index's seq (caller holds the lock)"""
+        page_size = settings.INDEX_REPLAY_PAGE_SIZE
+        while True:
+            resp = await self.client.get(
+                "/api/v1/jobs/events", params={"after_seq": self.index.seq, "limit": page_size}
+            )
+            if resp.status_code == 410:
+                raise EventLogTrimmedError(f"Events after seq {self.index.seq} were trimmed")
+            resp.raise_for_status()
+            events = resp.json()["events"]
+            for event in events:
+                await self.apply_event(event["routing_key"], event["job"], event["seq"])
+            if len(events) < page_size:
+                return
+
+    async def handle_message(self, message: aio_pika.abc.AbstractIncomingMessage):
+        """Apply an event in order, or replay the gap in front of it"""
+        job_data = json.loads(message.body.decode())
+        seq = (message.headers or {}).get("seq")
+        async with self._lock:
+            if self.index.ready and (seq is None or seq == self.index.seq + 1):
+                await self.apply_event(message.routing_key, job_data, seq)
+                return
+            if seq is not None and seq <= self.index.seq:
+                # Already applied by a replay
+                return
+        if self.index.ready:
+            print(f"[JobIndexWorker] Gap before event seq {seq} (index at {self.index.seq}), replaying")
+            await self.resync()
+
+    async def apply_event(self, routing_key: str, job_data: dict, seq: Optional[int] = None):
+        """Apply a single job event to the index and drop the cached searches it affects"""
+        if seq is not None and seq <= self.index.seq:
+            return
+        print(f"[JobIndexWorker] {routing_key} for job {job_data.get('id')} (seq {seq})")
+        previous = self.index.get(job_data.get("id"))
+        if routing_key == "job.deactivated" or not job_data.get("is_active", True):
+            self.index.remove(job_data.get("id"))
+            self.shards.remove(job_data.get("id"))
+        else:
+            self.index.upsert(job_data)
+            self.shards.upsert(job_data)
+        self.update_suggestions(previous, self.index.get(job_data.get("id")))
+        if seq is not None:
+            self.index.seq = seq
+        await self.cache_service.invalidate_job_searches([previous, job_data], self.index.seq)
+
+    def update_suggestions(self, previous: Optional[dict], current: Optional[dict]):
+        """Move a job's title count from its old title to its new one"""
+        old_title = previous.get("title") if previous else None
+        new_title = current.get("title") if current else None
+        if old_title == new_title:
+            return
+        self.suggestions.add_title(old_title, -1)
+        self.suggestions.add_title(new_title)
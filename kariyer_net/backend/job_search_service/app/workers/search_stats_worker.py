@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+from ..analytics.search_stats import WINDOWS, get_search_stats
+from ..core.database import db
+
+class SearchStatsWorker:
+    """Refills the analytics windows from search_history after a restart.
+
+    Only searches made by signed-in users are stored there, so until the
+    window has slid past the restart anonymous searches are undercounted.
+    """
+
+    def __init__(self):
+        self.stats = get_search_stats()
+        # Created during startup, before any search is served and recorded live
+        self.started_at = datetime.utcnow()
+
+    async def start(self):
+        since = self.started_at - timedelta(seconds=max(span for span, _ in WINDOWS.values()))
+        replayed = 0
+        try:
+            cursor = db.client.job_search.search_history.find(
+                {"created_at": {"$gte": since, "$lt": self.started_at}},
+                {"job_name": 1, "location": 1, "results_count": 1, "created_at": 1},
+            )
+            async for doc in cursor:
+                created_at = doc["created_at"].replace(tzinfo=timezone.utc)
+                self.stats.record(
+                    doc.get("job_name"), doc.get("location"), doc.get("results_count", 0),
+                    timestamp=created_at.timestamp(),
+                )
+                replayed += 1
+        except Exception as e:
+            print(f"[SearchStatsWorker] Failed to replay search history: {e}")
+        print(f"[SearchStatsWorker] Replayed {replayed} searches into the analytics windows")
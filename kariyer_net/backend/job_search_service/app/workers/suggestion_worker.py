@@ -0,0 +1,36 @@
+import asyncio
+from ..core.config import settings
+from ..core.database import db
+from ..index.suggestions import get_suggestion_index
+
+class SuggestionWorker:
+    """Loads search popularity for autocomplete from search_history.
+
+    Searches served by this instance are counted in as they happen; the
+    periodic reload brings in the ones other instances served.
+    """
+
+    def __init__(self):
+        self.suggestions = get_suggestion_index()
+
+    async def start(self):
+        while True:
+            await self.load_searches()
+            await asyncio.sleep(settings.SUGGESTION_REFRESH_INTERVAL)
+
+    async def load_searches(self):
+        """Count past searches per job_name, keeping only ones that found jobs"""
+        pipeline = [
+            {"$match": {"job_name": {"$nin": [None, ""]}, "results_count": {"$gt": 0}}},
+            {"$group": {"_id": "$job_name", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+            {"$limit": settings.SUGGESTION_MAX_SEARCH_PHRASES},
+        ]
+        try:
+            cursor = db.client.job_search.search_history.aggregate(pipeline)
+            counts = [(doc["_id"], doc["count"]) async for doc in cursor]
+        except Exception as e:
+            print(f"[SuggestionWorker] Failed to load search history: {e}")
+            return
+        await self.suggestions.rebuild(searches=counts)
+        print(f"[SuggestionWorker] Loaded {len(counts)} searched phrases, {len(self.suggestions)} suggestions")
@@ -0,0 +1,80 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from app.dto.search_dto import SearchDTO
+from app.index.job_index import JobIndex
+from app.utils.search_utils import job_matches
+
+# Compares the columnar JobIndex with the per-dict filter scan it replaced, e.g.
+#   python benchmark_search_filters.py --sizes 10000 100000 1000000
+TITLES = ["Python Developer", "Java Engineer", "Data Scientist", "Frontend Developer",
+          "DevOps Engineer", "Product Manager", "QA Specialist", "Backend Developer"]
+LEVELS = ["", "Senior ", "Junior ", "Lead "]
+CITIES = ["İstanbul", "Ankara", "İzmir", "Bursa", "Antalya", "Konya", "Adana", "Gaziantep"]
+DISTRICTS = ["Kadikoy", "Besiktas", "Cankaya", "Konak", "Nilufer", "Muratpasa", ""]
+WORK_MODES = ["Remote", "Hybrid", "On-site"]
+DESCRIPTIONS = ["Build and run Python services", "Own our Java and Kotlin backend",
+                "Ship React features with the design team", "Analyse product data in SQL", ""]
+
+QUERIES = {
+    "query": SearchDTO(query="python"),
+    "short query": SearchDTO(query="qa"),
+    "phrase": SearchDTO(query="senior data"),
+    "location": SearchDTO(location="ISTANBUL"),
+    "work_mode+date": SearchDTO(work_mode="Remote,Hybrid", date_filter="today"),
+    "all filters": SearchDTO(query="developer", location="ankara", work_mode="Remote", date_filter="8hours"),
+    "ranked query": SearchDTO(query="developer", sort_by="relevance"),
+    "newest first": SearchDTO(location="ankara", sort_by="date"),
+    "best paid": SearchDTO(work_mode="Remote", sort_by="salary"),
+    "salary": SearchDTO(salary_min=30000, salary_max=60000),
+}
+
+def make_jobs(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    jobs = []
+    for job_id in range(1, count + 1):
+        district = rng.choice(DISTRICTS)
+        city = rng.choice(CITIES)
+        salary_min = rng.choice([None, rng.randrange(10000, 80000, 1000)])
+        jobs.append({
+            "id": job_id,
+            "title": rng.choice(LEVELS) + rng.choice(TITLES),
+            "location": f"{city}, {district}" if district else city,
+            "work_mode": rng.choice(WORK_MODES),
+            "created_at": (now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))).isoformat(),
+            "salary_min": salary_min,
+            "salary_max": salary_min + 20000 if salary_min else None,
+            "description": rng.choice(DESCRIPTIONS),
+        })
+    return jobs
+
+def best_of(repeat: int, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run(size: int, repeat: int):
+    jobs = make_jobs(size)
+    started = time.perf_counter()
+    index = JobIndex()
+    index.load(jobs)
+    print(f"\n{size} jobs (index built in {time.perf_counter() - started:.1f}s)")
+    print(f"{'filter':16} {'dict scan ms':>14} {'columnar ms':>14} {'speedup':>9} {'matches':>9}")
+    for name, dto in QUERIES.items():
+        scan = best_of(repeat, lambda: [job for job in jobs if job_matches(job, dto)])
+        columnar = best_of(repeat, lambda: index.search_page(dto, 0, 10))
+        matches = index.search_page(dto, 0, 10)[1]
+        print(f"{name:16} {scan * 1000:14.1f} {columnar * 1000:14.2f} {scan / columnar:8.0f}x {matches:9d}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dict scan vs columnar JobIndex filter benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeat)
@@ -0,0 +1,65 @@
+import argparse
+import random
+import time
+from app.index.suggestions import SuggestionIndex
+
+# Replays users typing searches one keystroke at a time against the
+# autocomplete index while job and search updates arrive, e.g.
+#   python benchmark_suggestions.py --titles 200000 --sessions 20000
+LEVELS = ["", "Senior ", "Junior ", "Lead ", "Principal ", "Stajyer "]
+SKILLS = ["Python", "Java", "Go", "React", "Node.js", "Kotlin", "Swift", "SQL", "Data", "Cloud",
+          "Machine Learning", "Mobile", "Backend", "Frontend", "Full Stack", "DevOps", "Security",
+          "SAP", "Satış", "Muhasebe", "İnsan Kaynakları", "Lojistik", "Pazarlama", "Yazılım"]
+ROLES = ["Developer", "Engineer", "Architect", "Specialist", "Analyst", "Manager", "Uzmanı",
+         "Sorumlusu", "Müdürü", "Consultant", "Team Lead", "Intern"]
+CITIES = ["", " - İstanbul", " - Ankara", " - İzmir", " - Remote"]
+
+def make_title(rng: random.Random) -> str:
+    return rng.choice(LEVELS) + rng.choice(SKILLS) + " " + rng.choice(ROLES) + rng.choice(CITIES)
+
+def percentile(timings, fraction: float) -> float:
+    return timings[min(int(len(timings) * fraction), len(timings) - 1)]
+
+def run(titles: int, sessions: int, seed: int = 7):
+    rng = random.Random(seed)
+    catalog = [make_title(rng) for _ in range(titles)]
+    searches = [(make_title(rng).lower(), rng.randint(1, 50)) for _ in range(titles // 4)]
+
+    index = SuggestionIndex()
+    started = time.perf_counter()
+    index.load_titles(catalog)
+    index.load_searches(searches)
+    print(f"{titles} titles, {len(searches)} searched phrases -> {len(index)} suggestions "
+          f"(built in {time.perf_counter() - started:.1f}s)")
+
+    lookups, updates = [], []
+    served = time.perf_counter()
+    for _ in range(sessions):
+        typed = rng.choice(catalog) if rng.random() < 0.7 else rng.choice(searches)[0]
+        for end in range(1, min(len(typed), 25) + 1):
+            start = time.perf_counter()
+            index.suggest(typed[:end], 8)
+            lookups.append(time.perf_counter() - start)
+        # The search is run, a job is posted and another one closes
+        start = time.perf_counter()
+        index.add_search(typed)
+        index.add_title(make_title(rng))
+        index.add_title(rng.choice(catalog), -1)
+        updates.append((time.perf_counter() - start) / 3)
+    elapsed = time.perf_counter() - served
+
+    lookups.sort()
+    updates.sort()
+    print(f"{len(lookups)} keystrokes in {elapsed:.1f}s ({len(lookups) / elapsed:,.0f}/s incl. updates)")
+    print(f"lookup us: p50 {percentile(lookups, 0.5) * 1e6:.1f}  p99 {percentile(lookups, 0.99) * 1e6:.1f}  "
+          f"max {lookups[-1] * 1e6:.0f}")
+    print(f"update us: p50 {percentile(updates, 0.5) * 1e6:.1f}  p99 {percentile(updates, 0.99) * 1e6:.1f}  "
+          f"max {updates[-1] * 1e6:.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keystroke-rate autocomplete benchmark")
+    parser.add_argument("--titles", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--sessions", type=int, default=5000)
+    args = parser.parse_args()
+    for size in args.titles:
+        run(size, args.sessions)
@@ -0,0 +1,28 @@
+import pytest
+from datetime import datetime, timezone
+from app.index import job_index
+from app.index.job_index import JobIndex
+from benchmark_search_filters import make_jobs
+
+@pytest.fixture(scope="session")
+def jobs():
+    return make_jobs(2000, seed=7)
+
+@pytest.fixture
+def index(jobs):
+    index = JobIndex()
+    index.load(jobs)
+    return index
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    """Stop the clock the index ranks and filters by, so repeated searches agree"""
+    frozen = datetime.now(timezone.utc)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen.astimezone(tz) if tz else frozen.replace(tzinfo=None)
+
+    monkeypatch.setattr(job_index, "datetime", FrozenDatetime)
+    return frozen
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from app.dto.search_dto import SearchDTO
+from app.services import cache_service
+from app.services.cache_service import CacheService
+
+fakeredis = pytest.importorskip("fakeredis.aioredis")
+
+@pytest.fixture
+def service():
+    service = CacheService()
+    service.cache = fakeredis.FakeRedis(decode_responses=True)
+    return service
+
+def test_job_event_drops_only_matching_scopes(service):
+    ankara = SearchDTO(query="engineer", city="Ankara")
+    izmir = SearchDTO(query="engineer", city="Izmir")
+
+    async def run():
+        await service.cache_search_result(ankara, 0, 10, {"jobs": [1]})
+        await service.cache_search_result(izmir, 0, 10, {"jobs": [2]})
+        await service.invalidate_job_searches([{"location": "Ankara, Turkey"}])
+        assert await service.get_search_result(ankara, 0, 10) is None
+        assert await service.get_search_result(izmir, 0, 10) == {"jobs": [2]}
+
+    asyncio.run(run())
+
+def test_expired_scopes_are_pruned(service):
+    async def run():
+        await service.cache.zadd(cache_service.SEARCH_SCOPES_KEY, {"long gone": 1})
+        await service.cache_search_result(SearchDTO(query="engineer"), 0, 10, {"jobs": []})
+        scopes = await service.cache.zrange(cache_service.SEARCH_SCOPES_KEY, 0, -1)
+        assert scopes == [cache_service.ANY_LOCATION_SCOPE]
+        assert await service.cache.ttl(cache_service.SEARCH_SCOPES_KEY) > 0
+
+    asyncio.run(run())
+
+def test_late_write_of_stale_result_is_ignored(service):
+    search = SearchDTO(query="engineer", city="Ankara")
+
+    async def run():
+        await service.cache_search_result(search, 0, 10, {"jobs": [1]}, seq=5)
+        assert await service.get_search_result(search, 0, 10) == {"jobs": [1]}
+        await service.invalidate_job_searches([{"location": "Ankara, Turkey"}], seq=6)
+        assert await service.get_search_result(search, 0, 10) is None
+        # Computed before event 6, written after its invalidation
+        await service.cache_search_result(search, 0, 10, {"jobs": [1]}, seq=5)
+        assert await service.get_search_result(search, 0, 10) is None
+        await service.cache_search_result(search, 0, 10, {"jobs": [2]}, seq=6)
+        assert await service.get_search_result(search, 0, 10) == {"jobs": [2]}
+
+    asyncio.run(run())
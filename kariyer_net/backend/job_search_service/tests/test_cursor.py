@@ -0,0 +1,52 @@
+from datetime import datetime
+import pytest
+from app.dto.search_dto import SearchDTO
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+
+SEARCHES = [
+    SearchDTO(sort_by="date"),
+    SearchDTO(sort_by="salary", work_mode="Remote"),
+    SearchDTO(query="developer"),
+    SearchDTO(query="python", location="ankara"),
+    SearchDTO(salary_min=30000, sort_by="salary"),
+]
+
+def cursor_pages(index, search, limit):
+    """Every page of a search, following next cursors through their encoded form"""
+    ids, after = [], None
+    while True:
+        page, _, _, last, _ = index.search_page(search, 0, limit, after)
+        ids += [job["id"] for job in page]
+        if last is None:
+            return ids
+        after = decode_cursor(encode_cursor(last))
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_cursor_paging_matches_skip_paging(index, frozen_clock, search):
+    limit = 37
+    total = index.search_page(search, 0, 0)[1]
+    by_skip = []
+    for skip in range(0, total, limit):
+        by_skip += [job["id"] for job in index.search_page(search, skip, limit)[0]]
+    assert len(by_skip) == total
+    assert cursor_pages(index, search, limit) == by_skip
+
+def test_new_jobs_do_not_shift_later_pages(index, jobs, frozen_clock):
+    search = SearchDTO(sort_by="date")
+    first, _, _, last, _ = index.search_page(search, 0, 50)
+    expected = [job["id"] for job in index.search_page(search, 50, 50)[0]]
+    for job_id in range(10 ** 6, 10 ** 6 + 20):
+        index.upsert(dict(jobs[0], id=job_id, created_at=datetime.utcnow().isoformat()))
+    page = index.search_page(search, 0, 50, last)[0]
+    assert [job["id"] for job in page] == expected
+    # Skip paging shifts by the 20 new jobs instead
+    assert [job["id"] for job in index.search_page(search, 50, 50)[0]] != expected
+
+def test_cursor_of_another_order_is_rejected(index):
+    _, _, _, last, _ = index.search_page(SearchDTO(sort_by="date"), 0, 10)
+    with pytest.raises(InvalidCursorError):
+        index.search_page(SearchDTO(sort_by="salary"), 0, 10, last)
+    with pytest.raises(InvalidCursorError):
+        index.search_page(SearchDTO(sort_by="date"), 0, 10, {"o": "date", "k": "soon", "i": 1})
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not a cursor")
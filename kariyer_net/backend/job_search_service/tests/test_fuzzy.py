@@ -0,0 +1,46 @@
+import pytest
+from app.dto.search_dto import SearchDTO
+from app.index.job_index import FUZZY_FALLBACK_BELOW, JobIndex
+from app.utils.deadline import Deadline
+
+EXTRA_TITLES = ["Yazılım Uzmanı", "Makine Mühendisi", "Satış Temsilcisi", "İnsan Kaynakları Uzmanı"]
+
+@pytest.fixture
+def fuzzy_index(jobs):
+    catalog = jobs + [dict(jobs[i], id=10 ** 6 + i, title=title) for i, title in enumerate(EXTRA_TITLES)]
+    index = JobIndex()
+    index.load(catalog)
+    return index
+
+@pytest.mark.parametrize("query, corrected", [
+    ("devloper", "developer"),
+    ("pyhton developer", "python developer"),
+    ("makina muhendisi", "Makine Mühendisi"),
+    ("satis temsilcisi", "Satış Temsilcisi"),
+])
+def test_typo_is_corrected(fuzzy_index, query, corrected):
+    page, total, _, _, shown = fuzzy_index.search_page(SearchDTO(query=query), 0, 5)
+    assert shown is not None and shown.casefold() == corrected.casefold()
+    assert total > 0
+    assert all(any(word in job["title"].casefold() for word in shown.casefold().split()) for job in page)
+
+def test_exact_and_unknown_queries_are_not_corrected(fuzzy_index):
+    page, total, _, _, shown = fuzzy_index.search_page(SearchDTO(query="python"), 0, 5)
+    assert shown is None and total >= FUZZY_FALLBACK_BELOW
+    assert fuzzy_index.search_page(SearchDTO(query="xqzv"), 0, 5)[1:] == (0, False, None, None)
+
+def test_later_pages_stay_fuzzy(fuzzy_index):
+    search = SearchDTO(query="devloper", sort_by="date")
+    first, total, _, after, _ = fuzzy_index.search_page(search, 0, 100)
+    seen = [job["id"] for job in first]
+    while after is not None:
+        page, _, _, after, shown = fuzzy_index.search_page(search, 0, 100, after)
+        assert shown == "developer"
+        seen += [job["id"] for job in page]
+    assert len(seen) == len(set(seen)) == total
+
+def test_expired_deadline_skips_fallback(fuzzy_index):
+    deadline = Deadline(0)
+    _, total, _, _, shown = fuzzy_index.search_page(SearchDTO(query="devloper"), 0, 5, deadline=deadline)
+    assert (total, shown) == (0, None)
+    assert "fuzzy" in deadline.skipped
@@ -0,0 +1,37 @@
+import random
+from collections import Counter
+from app.analytics.heavy_hitters import SearchWindow
+
+def test_window_counts_stay_within_the_bound():
+    rng = random.Random(15)
+    # Zipf-like keywords: a few heavy hitters and a long tail
+    keywords = [f"kw{i}" for i in range(400)]
+    weights = [1 / (rank + 1) for rank in range(len(keywords))]
+    window = SearchWindow(span=100, buckets=10, capacity=32)
+    history = []
+    for timestamp in range(0, 300):
+        for _ in range(20):
+            keyword = rng.choices(keywords, weights)[0]
+            window.record(keyword, None, 1, float(timestamp))
+            history.append((timestamp, keyword))
+
+        # The window covers the live buckets: the last ten 10-second slices
+        since = (timestamp // 10 - 9) * 10
+        exact = Counter(keyword for seen, keyword in history if seen >= since)
+        assert window.searches == sum(exact.values())
+        bound = window.searches / window.capacity
+        for keyword, count in window.keywords.top(10):
+            assert abs(count - exact[keyword]) <= bound
+        for keyword, count in exact.most_common(3):
+            if count > 2 * bound:
+                assert keyword in dict(window.keywords.top(window.capacity))
+
+def test_expired_buckets_drop_out():
+    window = SearchWindow(span=60, buckets=6, capacity=8)
+    window.record("python", "istanbul", 5, 0.0)
+    window.record("java", None, 3, 30.0)
+    assert dict(window.keywords.top(5)) == {"python": 1, "java": 1}
+    window.expire(6)
+    assert dict(window.keywords.top(5)) == {"java": 1}
+    assert window.locations.top(5) == []
+    assert (window.searches, window.results) == (1, 3)
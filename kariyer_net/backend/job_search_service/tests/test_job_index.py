@@ -0,0 +1,126 @@
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pytest
+from app.dto.search_dto import SearchDTO
+from app.index.job_index import JobIndex, count_matches
+from app.utils.search_utils import job_matches
+
+TITLES = ["İstanbul Python Developer", "ISPARTA Şoför", "ışık Görevlisi", "Python Developer",
+          "Senior python  dev", "Java Engineer", "Data Scientist", "Backend Dev (Go)", None]
+LOCATIONS = ["İSTANBUL, Şişli", "Istanbul, Kadikoy", "Ankara", "İzmir", "istanbul", "Bursa, Nilufer", None]
+WORK_MODES = ["Remote", "Hybrid", "On-site", "remote", None]
+COMPANIES = ["Acme", "Şahin Yazılım", "Globex", None]
+
+QUERIES = [None, "python", "dev", "python dev", "n d", "go)", "x", "i", "İst", "ist", "ıspa", "şoF", "ŞOFÖR"]
+LOCATION_FILTERS = [None, "istanbul", "ist", "izmir", "kad"]
+WORK_MODE_FILTERS = [None, "remote", "remote,hybrid", "site"]
+DATE_FILTERS = [None, "today", "3hours", "8hours", "bogus"]
+SALARY_FILTERS = [(None, None), (6000, None), (None, 4000), (9000, 25000)]
+
+def created_at(rng: random.Random):
+    """Naive, UTC and offset timestamps around now, plus missing and unparsable ones"""
+    r = rng.random()
+    if r < 0.1:
+        return None
+    if r < 0.15:
+        return "garbage"
+    if r < 0.5:
+        return (datetime.now() - timedelta(minutes=rng.randint(-60, 60 * 48))).isoformat()
+    if r < 0.8:
+        moment = datetime.now(timezone.utc) - timedelta(minutes=rng.randint(0, 60 * 48))
+        return moment.isoformat().replace("+00:00", "Z")
+    return datetime.now(timezone(timedelta(hours=3))).replace(microsecond=0).isoformat()
+
+def messy_jobs(count: int, seed: int):
+    rng = random.Random(seed)
+    return [{
+        "id": job_id,
+        "title": rng.choice(TITLES) or "",
+        "location": rng.choice(LOCATIONS) or "",
+        "work_mode": rng.choice(WORK_MODES) or "",
+        "company_name": rng.choice(COMPANIES),
+        "created_at": created_at(rng),
+        "salary_min": rng.choice([None, 1000, 5000, 20000]),
+        "salary_max": rng.choice([None, 8000, 30000]),
+    } for job_id in range(1, count + 1)]
+
+@pytest.fixture(scope="module")
+def churned():
+    """An index loaded, then partly removed and re-upserted, with the jobs it should hold"""
+    rng = random.Random(1)
+    jobs = messy_jobs(600, seed=1)
+    index = JobIndex()
+    index.load(rng.sample(jobs, len(jobs)))
+    for job in rng.sample(jobs, 100):
+        index.remove(job["id"])
+    for job in rng.sample(jobs, 150):
+        index.upsert(dict(job, title=rng.choice(TITLES) or "", location=rng.choice(LOCATIONS) or ""))
+    live = [index.get(job["id"]) for job in jobs if index.get(job["id"]) is not None]
+    return index, live
+
+def searches(count: int, seed: int):
+    rng = random.Random(seed)
+    combinations = list(itertools.product(QUERIES, LOCATION_FILTERS, WORK_MODE_FILTERS, DATE_FILTERS, SALARY_FILTERS))
+    for query, location, work_mode, date_filter, (salary_min, salary_max) in rng.sample(combinations, count):
+        yield SearchDTO(query=query, location=location, work_mode=work_mode, date_filter=date_filter,
+                        company=rng.choice([None, "acme", "şah"]), salary_min=salary_min, salary_max=salary_max)
+
+def test_index_matches_linear_scan_under_churn(churned):
+    index, live = churned
+    for search in searches(400, seed=2):
+        expected = sorted(job["id"] for job in live if job_matches(job, search))
+        assert [job["id"] for job in index.search(search)] == expected, search
+        page, total, capped, _, corrected = index.search_page(
+            SearchDTO(**dict(search.model_dump(), sort_by="date")), 0, 10
+        )
+        assert not capped, search
+        if corrected is None:
+            assert total == len(expected), search
+            assert {job["id"] for job in page} <= set(expected)
+            assert len(page) == min(10, len(expected))
+        else:
+            # Sparse queries also match titles with words close to their terms
+            assert total >= len(expected), search
+
+def test_facets_match_linear_scan(churned):
+    index, live = churned
+    for search in searches(60, seed=3):
+        facets = index.facets(search, limit=100)
+        assert facets["total"] == sum(job_matches(job, search) for job in live), search
+        without_company = [job for job in live if job_matches(job, search.model_copy(update={"company": None}))]
+        expected = {}
+        for job in without_company:
+            if job["company_name"]:
+                expected[job["company_name"]] = expected.get(job["company_name"], 0) + 1
+        assert {facet["value"]: facet["count"] for facet in facets["companies"]} == expected, search
+        undated = search.model_copy(update={"date_filter": None})
+        for bucket, count in facets["date_buckets"].items():
+            bucketed = undated if bucket == "all" else undated.model_copy(update={"date_filter": bucket})
+            assert count == sum(job_matches(job, bucketed) for job in live), (search, bucket)
+
+def test_removed_jobs_are_gone(churned):
+    index, live = churned
+    assert len(index) == len(live)
+    assert index.get(10 ** 6) is None
+    index.remove(10 ** 6)
+    assert len(index) == len(live)
+
+def test_count_cap_stops_at_the_cap(index, monkeypatch):
+    monkeypatch.setattr("app.index.job_index.COUNT_CHUNK", 64)
+    search = SearchDTO(query="developer", sort_by="date")
+    page, exact, capped, _, _ = index.search_page(search, 0, 10)
+    assert not capped and exact > 100
+    assert index.search_page(search, 0, 10, count_cap=100)[:3] == (page, 100, True)
+    # The page itself always counts, so a deep page still reports a full total
+    assert index.search_page(search, 95, 10, count_cap=100)[1:3] == (105, True)
+    assert index.search_page(search, 0, 10, count_cap=exact + 1)[1:3] == (exact, False)
+
+def test_count_matches_chunks(monkeypatch):
+    monkeypatch.setattr("app.index.job_index.COUNT_CHUNK", 4)
+    mask = np.zeros(40, dtype=bool)
+    mask[[1, 5, 9, 30]] = True
+    assert count_matches(mask) == (4, False)
+    assert count_matches(mask, 3) == (3, True)
+    assert count_matches(mask, 5) == (4, False)
@@ -0,0 +1,54 @@
+import random
+from app.dto.search_dto import SearchDTO
+from app.index.job_index import JobIndex
+from app.services.cache_service import ANY_LOCATION_SCOPE, PLACE_SCOPE_PREFIX, search_scope
+from app.utils.gazetteer import get_gazetteer
+from app.utils.search_utils import fold_text, job_matches, job_places
+
+LOCATIONS = ["Kadıköy, İstanbul", "Istanbul, Turkey", "ISTANBUL", "Kadikoy", "Ankara - Çankaya", "Çankaya",
+             "Berlin, Germany", "Remote", "İzmir/Bornova", "Bornova", "Turkey", "Istanbul Beşiktaş", "Yenişehir, Bursa"]
+PLACES = [None, "istanbul", "İSTANBUL", "kadıköy", "Kadikoy", "ankara", "çankaya", "turkey", "germany", "ist", "bursa"]
+
+def place_jobs(count: int, seed: int):
+    """Jobs with free-text locations, half parsed at ingest and half posted before parsing existed"""
+    rng = random.Random(seed)
+    gazetteer = get_gazetteer()
+    jobs = []
+    for job_id in range(count):
+        job = {"id": job_id, "title": "python dev", "location": rng.choice(LOCATIONS), "work_mode": "remote"}
+        if rng.random() < 0.5:
+            job.update(gazetteer.parse(job["location"]))
+        jobs.append(job)
+    return jobs
+
+def test_place_filters_match_linear_scan():
+    rng = random.Random(5)
+    jobs = {job["id"]: job for job in place_jobs(600, seed=5)}
+    index = JobIndex()
+    index.load(jobs.values())
+    for job_id in rng.sample(sorted(jobs), 100):
+        del jobs[job_id]
+        index.remove(job_id)
+    for job in place_jobs(700, seed=6)[600:]:
+        jobs[job["id"]] = job
+        index.upsert(job)
+    scope_keys = {
+        job_id: [fold_text(job["location"])] + [PLACE_SCOPE_PREFIX + place for place in job_places(job)]
+        for job_id, job in jobs.items()
+    }
+    for _ in range(150):
+        search = SearchDTO(country=rng.choice([None, "turkey", "türkiye", "germany", "tur"]), city=rng.choice(PLACES),
+                           district=rng.choice(PLACES), location=rng.choice([None, None, "ist", "berlin"]))
+        expected = sorted(job_id for job_id, job in jobs.items() if job_matches(job, search))
+        assert [job["id"] for job in index.search(search)] == expected, search
+        # The cache scope of a search covers every job it can return
+        scope = search_scope(search)
+        if scope != ANY_LOCATION_SCOPE:
+            assert all(any(scope in key for key in scope_keys[job_id]) for job_id in expected), (search, scope)
+
+def test_city_finds_its_districts():
+    index = JobIndex()
+    index.load(place_jobs(300, seed=1))
+    locations = {job["location"] for job in index.search(SearchDTO(city="istanbul"))}
+    assert {"Kadıköy, İstanbul", "Kadikoy", "Istanbul Beşiktaş"} <= locations
+    assert not locations & {"Ankara - Çankaya", "Berlin, Germany", "Remote"}
@@ -0,0 +1,55 @@
+import math
+import pytest
+from app.dto.search_dto import SearchDTO
+from app.index.job_index import _wall_micros
+from app.index.ranking import B, K1, RECENCY_HALF_LIFE_HOURS, RECENCY_WEIGHT, job_terms, tokenize
+from app.utils.search_utils import job_matches, parse_job_date
+
+def bm25_scores(jobs, query, now):
+    """BM25 plus recency of every job, computed directly from the formula"""
+    terms = {job["id"]: job_terms(job) for job in jobs}
+    lengths = {job_id: sum(counts.values()) for job_id, counts in terms.items()}
+    average = sum(lengths.values()) / len(jobs)
+    query_terms = set(tokenize(query))
+    frequencies = {term: sum(1 for counts in terms.values() if term in counts) for term in query_terms}
+    scores = {}
+    for job in jobs:
+        score = 0.0
+        for term in query_terms:
+            frequency = frequencies[term]
+            f = terms[job["id"]][term]
+            if frequency and f:
+                idf = math.log(1 + (len(jobs) - frequency + 0.5) / (frequency + 0.5))
+                score += idf * f * (K1 + 1) / (f + K1 * (1 - B + B * lengths[job["id"]] / average))
+        created = parse_job_date(job.get("created_at"))
+        if created is not None:
+            age_hours = max(_wall_micros(now) - _wall_micros(created), 0) / 3.6e9
+            score += RECENCY_WEIGHT * 2 ** (-age_hours / RECENCY_HALF_LIFE_HOURS)
+        scores[job["id"]] = score
+    return scores
+
+@pytest.mark.parametrize("query", ["python developer", "senior data", "engineer", "lead qa specialist"])
+def test_relevance_order_follows_bm25(index, jobs, frozen_clock, query):
+    search = SearchDTO(query=query, sort_by="relevance")
+    page, total, _, _, _ = index.search_page(search, 0, 10 ** 6)
+    matching = [job for job in jobs if job_matches(job, search)]
+    assert sorted(job["id"] for job in page) == sorted(job["id"] for job in matching)
+    scores = bm25_scores(jobs, query, frozen_clock.replace(tzinfo=None))
+    ranked = [scores[job["id"]] for job in page]
+    assert all(a >= b - 1e-4 for a, b in zip(ranked, ranked[1:]))
+    # The first page is the best ten
+    assert min(ranked[:10]) >= max(ranked[10:], default=0) - 1e-4
+
+def test_date_and_salary_orders(index, jobs):
+    by_date = index.search_page(SearchDTO(sort_by="date"), 0, 10 ** 6)[0]
+    keys = [_wall_micros(parse_job_date(job["created_at"])) for job in by_date]
+    assert keys == sorted(keys, reverse=True)
+    by_salary = index.search_page(SearchDTO(sort_by="salary"), 0, 10 ** 6)[0]
+    salaries = [(-(job["salary_max"] or job["salary_min"] or -1), job["id"]) for job in by_salary]
+    assert salaries == sorted(salaries)
+    assert len(by_date) == len(by_salary) == len(jobs)
+
+def test_query_without_terms_sorts_by_date(index):
+    relevance = index.search_page(SearchDTO(sort_by="relevance"), 0, 20)[0]
+    date = index.search_page(SearchDTO(sort_by="date"), 0, 20)[0]
+    assert relevance == date
@@ -0,0 +1,31 @@
+from app.dto.search_dto import SearchDTO
+from app.index.job_index import JobIndex
+from app.index.salary import SALARY_RANGES
+from app.utils.search_utils import job_matches
+
+INVERTED = {"id": 1, "title": "Backend Developer", "location": "Istanbul", "work_mode": "remote",
+            "salary_min": 120000, "salary_max": 20000}
+
+def bucket_matches(jobs, low, high):
+    search = SearchDTO(salary_min=low, salary_max=high)
+    return sum(job_matches(job, search) for job in jobs)
+
+def test_inverted_salary_range_is_counted_like_the_filter():
+    index = JobIndex()
+    index.load([INVERTED])
+    counts = [bucket["count"] for bucket in index.facets(SearchDTO())["salary_ranges"]]
+    assert min(counts) >= 0
+    assert counts == [bucket_matches([INVERTED], low, high) for low, high, _ in SALARY_RANGES]
+    # 20K-120K overlaps every bucket
+    assert counts == [1, 1, 1, 1]
+    page = index.search_page(SearchDTO(salary_min=30000, salary_max=40000), 0, 10)
+    assert page[1] == 1
+
+def test_salary_buckets_match_the_filter(jobs):
+    catalog = jobs + [dict(INVERTED, id=len(jobs) + 1)]
+    index = JobIndex()
+    index.load(catalog)
+    for search in (SearchDTO(), SearchDTO(query="engineer"), SearchDTO(work_mode="remote")):
+        matching = [job for job in catalog if job_matches(job, search)]
+        counts = [bucket["count"] for bucket in index.facets(search)["salary_ranges"]]
+        assert counts == [bucket_matches(matching, low, high) for low, high, _ in SALARY_RANGES]
@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+from app.services.search_service import SearchService
+
+fakeredis = pytest.importorskip("fakeredis.aioredis")
+
+@pytest.fixture
+def client(index):
+    def search_service():
+        service = SearchService()
+        service.index = index
+        service.cache_service.cache = fakeredis.FakeRedis(decode_responses=True)
+        return service
+
+    app.dependency_overrides[SearchService] = search_service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def test_search_total_is_exact_below_the_cap(client, index):
+    body = client.get("/api/v1/search", params={"query": "engineer"}).json()
+    assert body["total_results"] < settings.SEARCH_COUNT_CAP
+    assert body["total_is_capped"] is False
+    assert body["total_results_label"] == str(body["total_results"])
+    assert body["total_results"] > 100
+
+def test_search_total_cap(client, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_COUNT_CAP", 100)
+    body = client.get("/api/v1/search", params={"query": "engineer"}).json()
+    assert body["total_is_capped"] is True
+    assert body["total_results"] == 100
+    assert body["total_results_label"] == "100+"
+    assert body["total_pages"] == 10
+    assert len(body["jobs"]) == 10
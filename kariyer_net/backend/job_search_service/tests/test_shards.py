@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from app.dto.search_dto import SearchDTO
+from app.index.job_index import JobIndex
+from app.index.shards import ShardPool, ShardPoolError
+
+SEARCHES = [
+    SearchDTO(), SearchDTO(query="engineer"), SearchDTO(query="developer", sort_by="date"),
+    SearchDTO(query="enginer"), SearchDTO(sort_by="salary"), SearchDTO(query="manager", city="Istanbul"),
+    SearchDTO(company="a", salary_min=20000), SearchDTO(work_mode="remote", query="data"),
+]
+
+@pytest.fixture(scope="module")
+def sharded(jobs):
+    index = JobIndex()
+    index.load(jobs)
+    pool = ShardPool(3)
+    asyncio.run(pool.load(index))
+    yield index, pool
+    pool.close()
+
+def ids(result):
+    return [job["id"] for job in result[0]]
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_pages_match_main_index(sharded, frozen_clock, search):
+    index, pool = sharded
+
+    async def run():
+        for skip, limit, cap in ((0, 10, 0), (5, 7, 0), (0, 0, 0), (30, 20, 0), (0, 10, 25), (0, 0, 3)):
+            expected = index.search_page(search, skip, limit, count_cap=cap)
+            actual = await pool.search_page(index, search, skip, limit, count_cap=cap)
+            assert ids(actual) == ids(expected)
+            assert actual[1:] == expected[1:]
+            if expected[3]:
+                following = await pool.search_page(index, search, 0, 10, actual[3])
+                assert ids(following) == ids(index.search_page(search, 0, 10, expected[3]))
+
+    asyncio.run(run())
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_facets_match_main_index(sharded, search):
+    index, pool = sharded
+    expected = index.facets(search)
+    actual = asyncio.run(pool.facets(search))
+    assert (actual["total"], actual["date_buckets"], actual["salary_ranges"]) == \
+        (expected["total"], expected["date_buckets"], expected["salary_ranges"])
+    for facet in ("cities", "companies", "work_modes"):
+        assert [value["count"] for value in actual[facet]] == [value["count"] for value in expected[facet]]
+
+def test_changes_reach_their_shard(sharded, jobs):
+    index, pool = sharded
+    job = dict(jobs[0], id=10 ** 6, title="Zebra Keeper")
+
+    async def run():
+        index.upsert(job)
+        pool.upsert(job)
+        assert ids(await pool.search_page(index, SearchDTO(query="zebra"), 0, 10)) == [job["id"]]
+        index.remove(job["id"])
+        pool.remove(job["id"])
+        assert (await pool.search_page(index, SearchDTO(query="zebra"), 0, 10))[1] == 0
+
+    asyncio.run(run())
+
+def test_dead_shard_disables_pool(jobs):
+    index = JobIndex()
+    index.load(jobs[:100])
+    pool = ShardPool(2)
+
+    async def run():
+        await pool.load(index)
+        assert pool.usable
+        pool._shards[0].process.kill()
+        pool._shards[0].process.join()
+        with pytest.raises(ShardPoolError):
+            await pool.search_page(index, SearchDTO(), 0, 10)
+        assert not pool.usable
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.close()
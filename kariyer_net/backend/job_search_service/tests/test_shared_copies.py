@@ -0,0 +1,17 @@
+from pathlib import Path
+import pytest
+
+SERVICES = Path(__file__).resolve().parents[2]
+
+# Modules both services carry a copy of; they have to stay identical
+SHARED = [
+    "app/utils/cursor.py",
+    "app/utils/gazetteer.py",
+    "app/utils/gazetteer_data.py",
+]
+
+@pytest.mark.parametrize("module", SHARED)
+def test_copies_are_identical(module):
+    ours = SERVICES / "job_search_service" / module
+    theirs = SERVICES / "job_posting_service" / module
+    assert ours.read_text() == theirs.read_text(), f"{module} differs between the services"
@@ -0,0 +1,75 @@
+import os
+import random
+import pytest
+from app.dto.search_dto import SearchDTO
+from app.index import snapshot
+from app.index.job_index import JobIndex
+from app.index.snapshot import SnapshotError, SnapshotReader, SnapshotWriter, latest_snapshot, snapshot_lock
+from benchmark_search_filters import make_jobs
+
+SEARCHES = [SearchDTO(), SearchDTO(query="developer"), SearchDTO(query="devloper"), SearchDTO(location="İstanbul"),
+            SearchDTO(city="Ankara", sort_by="date"), SearchDTO(salary_min=50000, sort_by="salary"),
+            SearchDTO(work_mode="remote", query="senior data")]
+
+def assert_same(expected: JobIndex, actual: JobIndex):
+    assert len(actual) == len(expected)
+    for search in SEARCHES:
+        page, total, capped, last, corrected = expected.search_page(search, 0, 20)
+        restored = actual.search_page(search, 0, 20)
+        assert [job["id"] for job in restored[0]] == [job["id"] for job in page], search
+        assert restored[1:] == (total, capped, last, corrected), search
+        assert actual.facets(search) == expected.facets(search), search
+
+def write_snapshot(index: JobIndex, root) -> str:
+    writer = SnapshotWriter(str(root), index.seq)
+    index.save(writer)
+    return writer.write(keep=2)
+
+def test_round_trip(jobs, frozen_clock, tmp_path):
+    original = JobIndex()
+    original.load(jobs, seq=41)
+    for job in jobs[:100]:
+        original.remove(job["id"])
+    write_snapshot(original, tmp_path)
+    restored = JobIndex()
+    restored.restore(latest_snapshot(str(tmp_path)))
+    assert restored.seq == 41 and restored.ready
+    assert_same(original, restored)
+    assert sorted(restored.title_counts()) == sorted(original.title_counts())
+
+def test_restored_index_takes_changes(jobs, frozen_clock, tmp_path):
+    original = JobIndex()
+    original.load(jobs, seq=1)
+    write_snapshot(original, tmp_path)
+    restored = JobIndex()
+    restored.restore(latest_snapshot(str(tmp_path)))
+    rng = random.Random(3)
+    changes = [("upsert", job) for job in make_jobs(len(jobs) + 200, seed=9)[len(jobs):]]
+    changes += [("remove", job["id"]) for job in rng.sample(jobs, 150)]
+    changes += [("upsert", dict(job, title=job["title"] + " senior")) for job in rng.sample(jobs, 150)]
+    for op, value in changes:
+        getattr(original, op)(value)
+        getattr(restored, op)(value)
+    assert_same(original, restored)
+    # A snapshot of the restored index restores the same again
+    restored.seq = 2
+    write_snapshot(restored, tmp_path)
+    again = JobIndex()
+    again.restore(latest_snapshot(str(tmp_path)))
+    assert again.seq == 2
+    assert_same(original, again)
+    assert sorted(os.listdir(tmp_path)) == [snapshot.snapshot_name(1), snapshot.snapshot_name(2)]
+
+def test_other_formats_are_skipped(jobs, tmp_path, monkeypatch):
+    index = JobIndex()
+    index.load(jobs[:50], seq=5)
+    path = write_snapshot(index, tmp_path)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_FORMAT", snapshot.SNAPSHOT_FORMAT + 1)
+    assert latest_snapshot(str(tmp_path)) is None
+    with pytest.raises(SnapshotError):
+        SnapshotReader(path)
+
+def test_snapshot_lock_is_exclusive(tmp_path):
+    with snapshot_lock(str(tmp_path)) as first:
+        with snapshot_lock(str(tmp_path)) as second:
+            assert (first, second) == (True, False)
@@ -0,0 +1,34 @@
+import asyncio
+from app.index.suggestions import SuggestionIndex
+
+TITLES = ["Python Developer", "Senior Python Developer", "Java Developer", "Data Engineer", "Data Scientist"]
+SEARCHES = [("python", 5), ("data engineer", 3), ("devops", 2)]
+
+def test_rebuild_matches_load():
+    loaded = SuggestionIndex()
+    loaded.load_titles(TITLES)
+    loaded.load_searches(SEARCHES)
+    rebuilt = SuggestionIndex()
+
+    async def run():
+        await rebuilt.rebuild(titles=[(title, 1) for title in TITLES])
+        await rebuilt.rebuild(searches=SEARCHES)
+
+    asyncio.run(run())
+    for prefix in ("p", "dev", "data", "java", "s"):
+        assert rebuilt.suggest(prefix) == loaded.suggest(prefix)
+
+def test_changes_during_rebuild_are_kept():
+    suggestions = SuggestionIndex()
+    suggestions.load_titles(TITLES)
+
+    async def run():
+        rebuild = asyncio.create_task(suggestions.rebuild(searches=SEARCHES))
+        await asyncio.sleep(0)
+        suggestions.add_title("Rust Developer")
+        suggestions.add_search("rust")
+        await rebuild
+
+    asyncio.run(run())
+    assert suggestions.suggest("rust") == ["rust", "Rust Developer"]
+    assert suggestions.suggest("devops") == ["devops"]
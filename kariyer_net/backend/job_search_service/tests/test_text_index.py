@@ -0,0 +1,29 @@
+import random
+import numpy as np
+from app.index.categories import TextCategories
+from app.utils.search_utils import fold_text
+
+VALUES = ["İstanbul Python Developer", "ISPARTA Şoför", "ışık Görevlisi", "Backend Dev (Go)",
+          "Senior python  dev", "Data Scientist", "", "ii", "a"]
+
+def test_turkish_case_folding():
+    assert fold_text("İSTANBUL") == fold_text("istanbul") == fold_text("Istanbul")
+    assert fold_text("ışık") == fold_text("IŞIK")
+    assert fold_text("i̇stanbul") == "istanbul"
+    assert fold_text(None) == ""
+
+def test_containing_matches_substring_scan():
+    categories = TextCategories()
+    for value in VALUES:
+        categories.code(fold_text(value))
+    rng = random.Random(3)
+    needles = ["", "i", "go)", "python", "n d", "şoF", "xyz", "ii", "dev", "İst"]
+    # Every substring of every value, short and long
+    for value in categories.values:
+        for _ in range(5):
+            start = rng.randrange(len(value) + 1)
+            needles.append(value[start:start + rng.randint(1, 6)])
+    for needle in needles:
+        needle = fold_text(needle)
+        expected = np.array([needle in value for value in categories.values])
+        assert (categories.containing(needle) == expected).all(), needle
@@ -14,14 +14,11 @@ JOB_SERVICE_URL = "http://job_posting_service:8000/api/v1/jobs/"
 async def fetch_user_searches():
     client = AsyncIOMotorClient(MONGODB_URL)
     db     = client["job_search"]
-    user_ids = await db.search_history.distinct("user_id")
+    # job_search_service keeps one recent_searches document per user (newest
+    # first), so one pass over it replaces a distinct plus a query per user
     searches = {}
-    for uid in user_ids:
-        history = await db.search_history\
-                          .find({"user_id": uid})\
-                          .sort("created_at", -1)\
-                          .to_list(length=5)
-        searches[uid] = history
+    async for doc in db.recent_searches.find({}, {"searches": {"$slice": 5}}):
+        searches[doc["_id"]] = doc.get("searches", [])
     client.close()
     return searches
 